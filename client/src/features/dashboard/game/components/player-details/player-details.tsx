@@ -1,11 +1,12 @@
 import { useAuth } from "@/features/auth/contexts/context";
 import {
 	useAddPlayerBuyIn,
+	useGameLedgerQuery,
 	usePlayerCashOut,
 } from "@/features/dashboard/game/hooks/game.queries";
 import { BuyInsProps } from "@/features/dashboard/game/types/games.types";
 import { PlayerDetailsProps } from "@/features/dashboard/game/types/player-details.types";
-import { useState } from "react";
+import { useMemo, useState } from "react";
 import styles from "./styles.module.css";
 
 const PlayerDetails: React.FC<PlayerDetailsProps> = ({
@@ -20,11 +21,20 @@ const PlayerDetails: React.FC<PlayerDetailsProps> = ({
 	const { user } = useAuth();
 	const isPlayer = player.user_id === user._id;
 
-	const [playerBuyIns, setPlayerBuyIns] = useState<BuyInsProps[]>(
-		player.buy_ins
-	);
+	const [totalBuyIn, setTotalBuyIn] = useState<number>(player.buy_in_total);
+	// The game only carries the totals: the buy-ins are read from its ledger when shown
+	const ledgerQuery = useGameLedgerQuery(gameId, activeTab === "buyins");
+	const playerBuyIns = useMemo<BuyInsProps[]>(() => {
+		const entries = ledgerQuery.data?.pages.flat() ?? [];
+		// Buy-ins recorded before the ledger are still embedded in the player
+		return [
+			...player.buy_ins,
+			...entries.filter(
+				(entry) => entry.user_id === player.user_id && entry.type === "buy_in"
+			),
+		];
+	}, [ledgerQuery.data, player]);
 
-	const totalBuyIn = playerBuyIns.reduce((sum, buyIn) => sum + buyIn.amount, 0);
 	const [newBuyIn, setNewBuyIn] = useState<number>(0);
 	const [newCashOut, setNewCashOut] = useState<number>(
 		totalBuyIn + player.net_profit
@@ -44,8 +54,11 @@ const PlayerDetails: React.FC<PlayerDetailsProps> = ({
 				amount: newBuyIn,
 				time: new Date(),
 			};
-			addPlayerBuyInMutation.mutate({ gameId, buyIn });
-			setPlayerBuyIns([...playerBuyIns, buyIn]);
+			addPlayerBuyInMutation.mutate(
+				{ gameId, buyIn },
+				{ onSuccess: () => ledgerQuery.refetch() }
+			);
+			setTotalBuyIn(totalBuyIn + buyIn.amount);
 			setNewBuyIn(0);
 		} catch {
 			alert("Failed To Updated Buy In");
@@ -201,6 +214,15 @@ const PlayerDetails: React.FC<PlayerDetailsProps> = ({
 										))}
 									</ul>
 								)}
+								{ledgerQuery.hasNextPage && (
+									<button
+										className={styles.button}
+										onClick={() => ledgerQuery.fetchNextPage()}
+										disabled={ledgerQuery.isFetchingNextPage}
+									>
+										{ledgerQuery.isFetchingNextPage ? "Loading..." : "Load more"}
+									</button>
+								)}
 							</div>
 
 							<div className={styles.addBuyInContainer}>
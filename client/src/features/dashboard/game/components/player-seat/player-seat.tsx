@@ -1,6 +1,5 @@
 import Chip from "@/features/dashboard/game/components/player-chip/player-chip";
 import { PlayerSeatProps } from "@/features/dashboard/game/types/player-seat.types";
-import { useMemo } from "react";
 import styles from "./styles.module.css";
 
 const PlayerSeat: React.FC<PlayerSeatProps> = ({
@@ -9,10 +8,6 @@ const PlayerSeat: React.FC<PlayerSeatProps> = ({
 	position,
 	onClick,
 }) => {
-	const totalBuyIn = useMemo(() => {
-		return player.buy_ins.reduce((sum, buyIn) => sum + buyIn.amount, 0);
-	}, [player]);
-
 	return (
 		<div
 			className={`${styles.playerSeat} ${
@@ -30,7 +25,7 @@ const PlayerSeat: React.FC<PlayerSeatProps> = ({
 					<div className={styles.chipIcon}>
 						<Chip value={0} mini />
 					</div>
-					<div className={styles.chipInfo}>${totalBuyIn}</div>
+					<div className={styles.chipInfo}>${player.buy_in_total}</div>
 				</div>
 				<div
 					className={styles.netProfit}
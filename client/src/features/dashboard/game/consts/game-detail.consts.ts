@@ -9,10 +9,8 @@ export const PLAYER_COLUMNS: ColumnDefinition<GamePlayerProps>[] = [
     header: "Username",
   },
   {
-    key: "buy_ins",
+    key: "buy_in_total",
     header: "Total Buy Ins",
-    render: (player) =>
-      player.buy_ins.reduce((sum, buyin) => sum + buyin.amount, 0),
   },
   {
     key: "cash_out",
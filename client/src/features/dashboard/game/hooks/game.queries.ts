@@ -1,11 +1,11 @@
 import { BASE_URL } from "@/app/consts";
 import { gameService } from "@/features/dashboard/game/services/game.service";
-import { GameProps } from "@/features/dashboard/game/types/games.types";
+import { GameProps, LedgerEntryProps } from "@/features/dashboard/game/types/games.types";
 import {
 	BuyInProps,
 	CashOutProps
 } from "@/features/dashboard/game/types/player-details.types";
-import { useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
+import { useInfiniteQuery, useMutation, useQuery, useQueryClient } from "@tanstack/react-query";
 import { useEffect } from "react";
 
 export const useGameQuery = (game_id: string) => {
@@ -15,6 +15,20 @@ export const useGameQuery = (game_id: string) => {
 	});
 };
 
+const LEDGER_PAGE_SIZE = 100;
+
+// Buy-ins and cash-outs of a game, a page at a time; only fetched while enabled
+export const useGameLedgerQuery = (gameId: string, enabled: boolean) => {
+	return useInfiniteQuery<LedgerEntryProps[]>({
+		queryKey: ["game-ledger", gameId],
+		queryFn: ({ pageParam }) => gameService.getGameLedger(gameId, pageParam as number, LEDGER_PAGE_SIZE),
+		initialPageParam: 0,
+		getNextPageParam: (lastPage) =>
+			lastPage.length === LEDGER_PAGE_SIZE ? lastPage[lastPage.length - 1].seq : undefined,
+		enabled,
+	});
+};
+
 export const useTotalGamesCountQuery = () => {
 	return useQuery({
 		queryKey: ["total-games-count"],
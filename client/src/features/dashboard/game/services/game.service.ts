@@ -1,5 +1,5 @@
 import { api } from "@/clients/api-client";
-import { GameProps } from "@/features/dashboard/game/types/games.types";
+import { GameProps, LedgerEntryProps } from "@/features/dashboard/game/types/games.types";
 import { PlayerChangeProps } from "@/features/dashboard/game/types/player-details.types";
 
 class GameService {
@@ -7,6 +7,13 @@ class GameService {
         return api.getData<GameProps>(`/games/${gameId}`)
     }
 
+    async getGameLedger(gameId: string, afterSeq: number, limit: number): Promise<LedgerEntryProps[]> {
+        return api.getData<LedgerEntryProps[]>(`/games/${gameId}/ledger`, {
+            after_seq: afterSeq,
+            limit: limit,
+          })
+    }
+
     async getGames(limit: number, skip: number): Promise<GameProps[]> {
         return api.getData<GameProps[]>("/games/", {
             limit: limit,
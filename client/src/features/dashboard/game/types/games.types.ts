@@ -10,6 +10,18 @@ export interface BuyInsProps {
   time: Date;
 }
 
+export type LedgerEntryTypeEnum = "buy_in" | "cash_out";
+
+export interface LedgerEntryProps {
+  _id: string;
+  game_id: string;
+  seq: number;
+  user_id: string;
+  type: LedgerEntryTypeEnum;
+  amount: number;
+  time: Date;
+}
+
 export interface NotableHandProps {
   hand_id?: string;
   description: string;
@@ -20,6 +32,7 @@ export interface GamePlayerProps {
   user_id: string;
   username: string;
   buy_ins: BuyInsProps[];
+  buy_in_total: number;
   cash_out: number;
   net_profit: number;
   notable_hands: NotableHandProps[];
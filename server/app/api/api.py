@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.views import auth, users, friends, tables, games, statistics, trends, sse
+from app.api.views import auth, users, friends, tables, games, statistics, trends, sse, ws, metrics
 
 api_router = APIRouter()
 
@@ -12,3 +12,5 @@ api_router.include_router(games.router, prefix="/games", tags=["Games"])
 api_router.include_router(statistics.router, prefix="/statistics", tags=["Statistics"])
 api_router.include_router(trends.router, prefix="/trends", tags=["Trends"])
 api_router.include_router(sse.router, prefix="/events", tags=["Events"])
+api_router.include_router(ws.router, prefix="/ws", tags=["WebSockets"])
+api_router.include_router(metrics.router, prefix="/metrics", tags=["Metrics"])
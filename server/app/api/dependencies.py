@@ -1,19 +1,25 @@
-from fastapi import Request, Depends, HTTPException
+from typing import Optional
+
+from fastapi import Depends, HTTPException, WebSocketException
+from fastapi.requests import HTTPConnection
 from jose import jwt, JWTError
 from motor.motor_asyncio import AsyncIOMotorClient
 from starlette import status
 
 from app.core.config import settings
-from app.core.security import oauth2_scheme
+from app.core.exceptions import AuthorizationException
+from app.core.security import oauth2_scheme, oauth2_scheme_optional
 from app.db.mongo_client import MongoDB
 from app.repositories.game_repository import GameRepository
 from app.repositories.statistics_repository import StatisticsRepository
 from app.repositories.table_repository import TableRepository
 from app.repositories.user_repository import UserRepository
+from app.schemas.table import TableDBOutput
 from app.schemas.user import UserResponse
 from app.services.auth_service import AuthService
 from app.services.friends_service import FriendsService
 from app.services.game_service import GameService
+from app.services.loader import EntityLoader
 from app.services.sse_service import SSEService
 from app.services.statistics_service import StatisticsService
 from app.services.table_service import TableService
@@ -35,12 +41,49 @@ def get_user_service(user_repo: UserRepository = Depends(get_user_repository)) -
 async def get_current_user(token: str = Depends(oauth2_scheme),
                            user_service: UserService = Depends(get_user_service),
                            db_client: AsyncIOMotorClient = Depends(get_database)) -> UserResponse:
+    return await _get_user_from_token(token, user_service)
+
+
+async def get_ops_user(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
+    if current_user.email not in settings.OPS_USER_EMAILS:
+        raise AuthorizationException(detail="Operator access required")
+    return current_user
+
+
+async def get_stream_user(header_token: Optional[str] = Depends(oauth2_scheme_optional),
+                          token: Optional[str] = None,
+                          user_service: UserService = Depends(get_user_service)) -> UserResponse:
+    return await _get_user_from_token(header_token or token, user_service)
+
+
+async def get_optional_stream_user(header_token: Optional[str] = Depends(oauth2_scheme_optional),
+                                   token: Optional[str] = None,
+                                   user_service: UserService = Depends(get_user_service)) -> Optional[UserResponse]:
+    if not (header_token or token):
+        return None
+    return await _get_user_from_token(header_token or token, user_service)
+
+
+async def get_optional_socket_user(token: Optional[str] = None,
+                                   user_service: UserService = Depends(get_user_service)) -> Optional[UserResponse]:
+    if not token:
+        return None
+    try:
+        return await _get_user_from_token(token, user_service)
+    except HTTPException as e:
+        raise WebSocketException(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+
+
+async def _get_user_from_token(token: Optional[str], user_service: UserService) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
 
+    if not token:
+        raise credentials_exception
+
     try:
         payload = jwt.decode(
             token,
@@ -70,6 +113,10 @@ def get_table_service(table_repo: TableRepository = Depends(get_table_repository
     return TableService(table_repo)
 
 
+def get_table_loader(table_service: TableService = Depends(get_table_service)) -> EntityLoader[TableDBOutput]:
+    return EntityLoader(table_service)
+
+
 def get_game_repository(db_client: AsyncIOMotorClient = Depends(get_database)) -> GameRepository:
     return GameRepository(db_client)
 
@@ -90,14 +137,15 @@ def get_auth_service() -> AuthService:
     return AuthService(settings.ACCESS_TOKEN_EXPIRE_MINUTES)
 
 
-def get_sse_service(
-        request: Request,
+async def get_sse_service(
+        request: HTTPConnection,
         table_service: TableService = Depends(get_table_service),
         game_service: GameService = Depends(get_game_service),
 ) -> SSEService:
     app = request.app
     if not hasattr(app.state, "sse_service"):
         app.state.sse_service = SSEService(table_service=table_service, game_service=game_service)
+        await app.state.sse_service.start()
     return app.state.sse_service
 
 
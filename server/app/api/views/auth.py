@@ -5,6 +5,7 @@ from fastapi.security import OAuth2PasswordRequestForm
 
 from app.api.dependencies import get_user_service, get_auth_service
 from app.core.exceptions import AuthenticationException
+from app.core.query_budget import query_budget
 from app.core.security import verify_password
 from app.schemas.auth import LoginResponse
 from app.schemas.user import UserInput
@@ -16,6 +17,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/signup", response_model=LoginResponse, status_code=status.HTTP_201_CREATED)
+@query_budget(3)
 async def register_user(
         user_data: UserInput,
         user_service: UserService = Depends(get_user_service),
@@ -38,6 +40,7 @@ async def register_user(
 
 
 @router.post("/login", response_model=LoginResponse)
+@query_budget(1)
 async def login(
         form_data: OAuth2PasswordRequestForm = Depends(),
         user_service: UserService = Depends(get_user_service),
@@ -5,6 +5,7 @@ from fastapi import APIRouter, Depends, status
 
 from app.api.dependencies import get_current_user, get_user_service, get_friends_service
 from app.core.exceptions import ValidationException
+from app.core.query_budget import query_budget
 from app.schemas.friends import FriendsResponse
 from app.schemas.user import UserResponse
 from app.services.friends_service import FriendsService
@@ -14,6 +15,7 @@ router = APIRouter()
 
 
 @router.get("/", response_model=FriendsResponse)
+@query_budget(4)
 async def get_friends(
         current_user: UserResponse = Depends(get_current_user),
         user_service: UserService = Depends(get_user_service),
@@ -36,6 +38,7 @@ async def get_friends(
 
 
 @router.post("/friends/{friend_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(4)
 async def add_friend(
         friend_id: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -59,6 +62,7 @@ async def add_friend(
 
 
 @router.delete("/friends/{friend_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(3)
 async def remove_friend(
         friend_id: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -78,6 +82,7 @@ async def remove_friend(
 
 
 @router.get("/search/{friend_regex}", response_model=List[UserResponse])
+@query_budget(2)
 async def search_users(
         friend_regex: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -1,13 +1,14 @@
 from typing import List, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, status
+from fastapi import APIRouter, Depends, Response, status
 
 from app.api.dependencies import get_current_user, get_sse_service, get_table_service, get_game_service, \
     get_statistics_service
 from app.core.exceptions import ValidationException, NotFoundException, PermissionDeniedException
-from app.schemas.game import GameUpdate, GameDBInput, GameBase, GameStatusEnum, GameDBOutput, BuyIn, CashOut, Duration
-from app.schemas.statistics import Stats, MonthlyStats
+from app.core.query_budget import query_budget
+from app.schemas.game import GameUpdate, GameDBInput, GameBase, GameStatusEnum, GameDBOutput, BuyIn, CashOut
+from app.schemas.ledger import LedgerEntryDBOutput
 from app.schemas.user import UserResponse
 from app.services.game_service import GameService
 from app.services.sse_service import SSEService
@@ -18,11 +19,13 @@ router = APIRouter()
 
 
 @router.post("/", status_code=status.HTTP_201_CREATED, response_model=GameDBOutput)
+@query_budget(5)
 async def create_game(
         game: GameBase,
         current_user: UserResponse = Depends(get_current_user),
         table_service: TableService = Depends(get_table_service),
-        game_service: GameService = Depends(get_game_service)
+        game_service: GameService = Depends(get_game_service),
+        sse_service: SSEService = Depends(get_sse_service)
 ) -> GameDBOutput:
     """
     Create a new game.
@@ -32,6 +35,7 @@ async def create_game(
         current_user: The current authenticated user
         table_service: The table service
         game_service: The game service
+        sse_service: The SSE service
         
     Returns:
         The created game
@@ -45,37 +49,57 @@ async def create_game(
 
     game = await game_service.create_game(game, current_user)
     updated_data = {"game_id": str(game.id), "status": GameStatusEnum.IN_PROGRESS}
-    await table_service.update_table(str(game.table_id), updated_data)
+    updated_table = await table_service.update_table(str(game.table_id), updated_data)
+
+    try:
+        await sse_service.send_game_update(game_id=str(game.id), data=game)
+        await sse_service.send_table_update(table_id=str(game.table_id), data=updated_table)
+    except Exception:
+        pass  # SSE errors are not critical
+
     return game
 
 
 @router.get("/", response_model=List[GameDBOutput])
+@query_budget(2)
 async def get_games(
         table_id: str = None,
         status: str = None,
         limit: int = None,
         skip: int = None,
+        cursor: str = None,
+        response: Response = None,
         current_user: UserResponse = Depends(get_current_user),
         game_service: GameService = Depends(get_game_service)
 ) -> List[GameDBOutput]:
     """
-    Get games for the current user.
+    Get games for the current user, newest first.
+    
+    The cursor of the next page, if any, is returned in the X-Next-Cursor header.
     
     Args:
         table_id: Optional table ID to filter by
         status: Optional status to filter by
         limit: Optional limit for pagination
         skip: Optional skip for pagination
+        cursor: Optional cursor of the previous page, from its X-Next-Cursor header
+        response: The response, carrying the next page cursor
         current_user: The current authenticated user
         game_service: The game service
         
     Returns:
         List of games
     """
-    return await game_service.get_games_for_player(current_user, table_id, status, skip, limit)
+    games, next_cursor = await game_service.get_games_page_for_player(
+        current_user, table_id, status, skip, limit, cursor
+    )
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return games
 
 
 @router.get("/count", response_model=int)
+@query_budget(2)
 async def get_games_count(
         current_user: UserResponse = Depends(get_current_user),
         game_service: GameService = Depends(get_game_service)
@@ -94,6 +118,7 @@ async def get_games_count(
 
 
 @router.get("/{game_id}", response_model=GameDBInput)
+@query_budget(2)
 async def get_game(
         game_id: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -126,7 +151,53 @@ async def get_game(
     return game
 
 
+@router.get("/{game_id}/ledger", response_model=List[LedgerEntryDBOutput])
+@query_budget(3)
+async def get_game_ledger(
+        game_id: str,
+        after_seq: int = 0,
+        limit: int = 100,
+        response: Response = None,
+        current_user: UserResponse = Depends(get_current_user),
+        game_service: GameService = Depends(get_game_service)
+) -> List[LedgerEntryDBOutput]:
+    """
+    Get the buy-ins and cash-outs of a game, in the order they were recorded.
+
+    The `after_seq` of the next page, if any, is returned in the X-Next-Cursor header.
+
+    Args:
+        game_id: ID of the game
+        after_seq: Optional `seq` of the last entry of the previous page, from its X-Next-Cursor header
+        limit: Optional maximum number of entries, at most 500
+        response: The response, carrying the next page cursor
+        current_user: The current authenticated user
+        game_service: The game service
+
+    Returns:
+        The entries of the page
+    """
+    if not ObjectId.is_valid(game_id):
+        raise ValidationException(detail="Invalid game ID")
+    if not 0 < limit <= 500:
+        raise ValidationException(detail="Limit must be between 1 and 500")
+
+    game = await game_service.get_by_id(game_id)
+    if not game:
+        raise NotFoundException(detail="Game not found")
+
+    user_is_player = any(str(player.user_id) == str(current_user.id) for player in game.players)
+    if not (user_is_player or str(game.creator_id) == str(current_user.id)):
+        raise PermissionDeniedException(detail="Access denied")
+
+    entries, next_seq = await game_service.get_ledger(game_id, after_seq, limit)
+    if next_seq is not None:
+        response.headers["X-Next-Cursor"] = str(next_seq)
+    return entries
+
+
 @router.put("/{game_id}", response_model=Optional[GameDBOutput])
+@query_budget(10)
 async def update_game(
         game_id: str,
         game_update: GameUpdate,
@@ -168,38 +239,7 @@ async def update_game(
     was_not_completed = (game.status != GameStatusEnum.COMPLETED)
     if is_completing and was_not_completed:
         await table_service.update_table(str(game.table_id), {"status": GameStatusEnum.COMPLETED.value})
-
-        for player in game.players:
-            user_id = str(player.user_id)
-            profit = player.net_profit
-            duration = game.duration or Duration()
-            hours_played = duration.hours + (duration.minutes / 60)
-
-            won = 1 if profit > 0 else 0
-            loss = 1 if profit <= 0 else 0
-
-            user_stats = Stats(total_profit=profit, games_won=won, games_lost=loss, tables_played=1,
-                               hours_played=hours_played)
-            await statistics_service.update_user_stats(user_id, user_stats)
-
-            month_str = game.date.strftime("%b %Y")
-            user_monthly = MonthlyStats(
-                month=month_str,
-                profit=profit,
-                games_won=won,
-                games_lost=loss,
-                tables_played=1,
-                hours_played=hours_played
-            )
-            await statistics_service.update_user_monthly_stats(user_id, month_str, user_monthly)
-
-            # win_rate = await game_service.get_user_win_rate(user_id)
-            # if win_rate:
-            #     await statistics_service.update_win_rate(user_id, win_rate)
-            #
-            # monthly_rates = await game_service.get_user_monthly_win_rates(user_id)
-            # if monthly_rates:
-            #     await statistics_service.update_monthly_win_rates(user_id, monthly_rates)
+        await statistics_service.apply_game_results(updated)
 
     try:
         await sse_service.send_game_update(game_id=game_id, data=updated)
@@ -210,6 +250,7 @@ async def update_game(
 
 
 @router.put("/{game_id}/buyin", response_model=Optional[GameDBOutput])
+@query_budget(4)
 async def update_player_buyin(
         game_id: str,
         buyin: BuyIn,
@@ -233,10 +274,6 @@ async def update_player_buyin(
     if not ObjectId.is_valid(game_id):
         raise ValidationException(detail="Invalid game ID")
 
-    game = await game_service.get_by_id(game_id)
-    if not game:
-        raise NotFoundException(detail="Game not found")
-
     updated_game = await game_service.update_player_buyin(game_id, current_user, buyin)
 
     try:
@@ -248,6 +285,7 @@ async def update_player_buyin(
 
 
 @router.put("/{game_id}/cashout", response_model=Optional[GameDBOutput])
+@query_budget(4)
 async def update_player_cashout(
         game_id: str,
         cash_out: CashOut,
@@ -271,10 +309,6 @@ async def update_player_cashout(
     if not ObjectId.is_valid(game_id):
         raise ValidationException(detail="Invalid game ID")
 
-    game = await game_service.get_by_id(game_id)
-    if not game:
-        raise NotFoundException(detail="Game not found")
-
     updated_game = await game_service.update_player_cashout(game_id, current_user, cash_out)
 
     try:
@@ -286,6 +320,7 @@ async def update_player_cashout(
 
 
 @router.post("/{game_id}/end", response_model=Optional[GameDBOutput])
+@query_budget(10)
 async def update_end_game(
         game_id: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -321,29 +356,7 @@ async def update_end_game(
     updated_game = await game_service.end_game(game_id)
     await table_service.update_table(str(updated_game.table_id), {"status": GameStatusEnum.COMPLETED})
 
-    for player in game.players:
-        user_id = str(player.user_id)
-        profit = player.net_profit
-        duration = game.duration or Duration()
-        hours_played = duration.hours + (duration.minutes / 60)
-
-        won = 1 if profit > 0 else 0
-        loss = 1 if profit <= 0 else 0
-
-        user_stats = Stats(total_profit=profit, games_won=won, games_lost=loss, tables_played=1,
-                           hours_played=hours_played)
-        await statistics_service.update_user_stats(user_id, user_stats)
-
-        month_str = game.date.strftime("%b %Y")
-        user_monthly = MonthlyStats(
-            month=month_str,
-            profit=profit,
-            games_won=won,
-            games_lost=loss,
-            tables_played=1,
-            hours_played=hours_played
-        )
-        await statistics_service.update_user_monthly_stats(user_id, month_str, user_monthly)
+    await statistics_service.apply_game_results(updated_game)
 
     try:
         await sse_service.send_game_update(game_id=game_id, data=updated_game)
@@ -0,0 +1,72 @@
+from typing import Dict
+
+from fastapi import APIRouter, Depends
+
+from app.api.dependencies import get_ops_user
+from app.db.pool_metrics import pool_metrics
+from app.db.query_profiler import query_profiler
+from app.repositories.base import BaseRepository
+from app.schemas.metrics import CacheStatsResponse, PoolStatsResponse, QueryStatsResponse
+from app.schemas.user import UserResponse
+
+router = APIRouter()
+
+
+@router.get("/cache", response_model=Dict[str, CacheStatsResponse])
+async def cache_stats(current_user: UserResponse = Depends(get_ops_user)) -> Dict[str, CacheStatsResponse]:
+    """
+    Get the hit/miss counters of the repository caches of this worker.
+
+    Args:
+        current_user: The current user, who must be an operator (OPS_USER_EMAILS)
+
+    Returns:
+        Dict[str, CacheStatsResponse]: Dictionary mapping collection names to their cache statistics
+
+    Raises:
+        AuthorizationException: If the current user is not an operator
+    """
+    return BaseRepository.get_cache_stats()
+
+
+@router.get("/pool", response_model=Dict[str, PoolStatsResponse])
+async def pool_stats(current_user: UserResponse = Depends(get_ops_user)) -> Dict[str, PoolStatsResponse]:
+    """
+    Get the MongoDB connection pool metrics of this worker.
+
+    Peaks of checked out connections or of the wait queue close to the
+    pool size, or a growing checkout latency, mean the pool is too small
+    for the load this worker takes.
+
+    Args:
+        current_user: The current user, who must be an operator (OPS_USER_EMAILS)
+
+    Returns:
+        Dict[str, PoolStatsResponse]: Dictionary mapping server addresses to their pool metrics
+
+    Raises:
+        AuthorizationException: If the current user is not an operator
+    """
+    return pool_metrics.get_stats()
+
+
+@router.get("/queries", response_model=Dict[str, QueryStatsResponse])
+async def query_stats(current_user: UserResponse = Depends(get_ops_user)) -> Dict[str, QueryStatsResponse]:
+    """
+    Get the MongoDB commands issued per route by this worker.
+
+    A high number of commands per request points at N+1 query patterns;
+    the shape of the slowest command (its filter without the values) tells
+    which query to look at. Commands issued outside of any request are
+    reported under "(background)".
+
+    Args:
+        current_user: The current user, who must be an operator (OPS_USER_EMAILS)
+
+    Returns:
+        Dict[str, QueryStatsResponse]: Dictionary mapping routes to their command statistics
+
+    Raises:
+        AuthorizationException: If the current user is not an operator
+    """
+    return query_profiler.get_report()
@@ -1,18 +1,95 @@
-from fastapi import APIRouter, Depends
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header
 from starlette.requests import Request
 from starlette.responses import StreamingResponse
 
-from app.api.dependencies import get_sse_service
+from app.api.dependencies import get_ops_user, get_optional_stream_user, get_sse_service, get_stream_user
 from app.core.exceptions import ValidationException
+from app.schemas.events import ConnectionsResponse, StreamMetricsResponse, StreamModeEnum
+from app.schemas.user import UserResponse
 from app.services.sse_service import SSEService
 
 router = APIRouter()
 
 
+@router.get("/me")
+async def user_events(
+        request: Request,
+        current_user: UserResponse = Depends(get_stream_user),
+        sse_service: SSEService = Depends(get_sse_service)
+) -> StreamingResponse:
+    """
+    Stream server-sent events for every table and game of the current user.
+
+    Events are tagged `table`, `game` or `invite`, so a single connection
+    replaces one stream per table and per game.
+
+    Args:
+        request: The incoming request
+        current_user: The current authenticated user (bearer header or `token` query parameter)
+        sse_service: The SSE service
+
+    Returns:
+        A streaming response with the user's events
+    """
+    return await sse_service.user_event_stream(request, current_user)
+
+
+@router.get("/metrics", response_model=StreamMetricsResponse)
+async def stream_metrics(
+        current_user: UserResponse = Depends(get_ops_user),
+        sse_service: SSEService = Depends(get_sse_service)
+) -> StreamMetricsResponse:
+    """
+    Get the delivery metrics of the event streams served by this worker.
+
+    `coalesced` counts pending states superseded by a newer state before a
+    slow client read them; `dropped` counts messages discarded when a client
+    was disconnected for falling too far behind, and `disconnected` counts
+    those clients.
+
+    Args:
+        current_user: The current user, who must be an operator (OPS_USER_EMAILS)
+        sse_service: The SSE service
+
+    Returns:
+        StreamMetricsResponse: The stream metrics
+
+    Raises:
+        AuthorizationException: If the current user is not an operator
+    """
+    return sse_service.get_metrics()
+
+
+@router.get("/connections", response_model=ConnectionsResponse)
+async def stream_connections(
+        current_user: UserResponse = Depends(get_ops_user),
+        sse_service: SSEService = Depends(get_sse_service)
+) -> ConnectionsResponse:
+    """
+    List the live event stream connections of this worker, per topic.
+
+    Args:
+        current_user: The current user, who must be an operator (OPS_USER_EMAILS)
+        sse_service: The SSE service
+
+    Returns:
+        ConnectionsResponse: Total live connections, and live connections per topic
+
+    Raises:
+        AuthorizationException: If the current user is not an operator
+    """
+    return sse_service.get_connections()
+
+
 @router.get("/tables/{table_id}")
 async def table_events(
         request: Request,
         table_id: str,
+        mode: StreamModeEnum = StreamModeEnum.FULL,
+        last_event_id: Optional[str] = Header(None),
+        current_user: Optional[UserResponse] = Depends(get_optional_stream_user),
         sse_service: SSEService = Depends(get_sse_service)
 ) -> StreamingResponse:
     """
@@ -21,6 +98,9 @@ async def table_events(
     Args:
         request: The incoming request
         table_id: ID of the table to stream events for
+        mode: "full" for complete states, "patch" for a snapshot followed by JSON patches
+        last_event_id: The Last-Event-ID header sent by a reconnecting client
+        current_user: The current user if a token is given, streams are otherwise counted per client address
         sse_service: The SSE service
         
     Returns:
@@ -32,13 +112,16 @@ async def table_events(
     if not table_id:
         raise ValidationException(detail="Table ID is required")
 
-    return await sse_service.table_event_stream(request, table_id)
+    return await sse_service.table_event_stream(request, table_id, mode, last_event_id, current_user)
 
 
 @router.get("/games/{game_id}")
 async def game_events(
         request: Request,
         game_id: str,
+        mode: StreamModeEnum = StreamModeEnum.FULL,
+        last_event_id: Optional[str] = Header(None),
+        current_user: Optional[UserResponse] = Depends(get_optional_stream_user),
         sse_service: SSEService = Depends(get_sse_service)
 ) -> StreamingResponse:
     """
@@ -47,6 +130,9 @@ async def game_events(
     Args:
         request: The incoming request
         game_id: ID of the game to stream events for
+        mode: "full" for complete states, "patch" for a snapshot followed by JSON patches
+        last_event_id: The Last-Event-ID header sent by a reconnecting client
+        current_user: The current user if a token is given, streams are otherwise counted per client address
         sse_service: The SSE service
         
     Returns:
@@ -58,4 +144,4 @@ async def game_events(
     if not game_id:
         raise ValidationException(detail="Game ID is required")
 
-    return await sse_service.game_event_stream(request, game_id)
+    return await sse_service.game_event_stream(request, game_id, mode, last_event_id, current_user)
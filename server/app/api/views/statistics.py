@@ -3,20 +3,23 @@ from fastapi import APIRouter, Depends
 from app.api.dependencies import (
     get_current_user,
     get_game_service,
-    get_table_service,
+    get_table_loader,
     get_statistics_service
 )
 from app.core.exceptions import NotFoundException
+from app.core.query_budget import query_budget
 from app.schemas.statistics import DashboardStats, StatisticsDBOutput
+from app.schemas.table import TableDBOutput
 from app.schemas.user import UserResponse
 from app.services.game_service import GameService
+from app.services.loader import EntityLoader
 from app.services.statistics_service import StatisticsService
-from app.services.table_service import TableService
 
 router = APIRouter()
 
 
 @router.get("/", response_model=StatisticsDBOutput)
+@query_budget(2)
 async def get_user_stats(
         current_user: UserResponse = Depends(get_current_user),
         statistics_service: StatisticsService = Depends(get_statistics_service)):
@@ -38,10 +41,11 @@ async def get_user_stats(
 
 
 @router.get("/dashboard", response_model=DashboardStats)
+@query_budget(4)
 async def get_dashboard_stats(
         current_user: UserResponse = Depends(get_current_user),
         game_service: GameService = Depends(get_game_service),
-        table_service: TableService = Depends(get_table_service),
+        table_loader: EntityLoader[TableDBOutput] = Depends(get_table_loader),
         statistics_service: StatisticsService = Depends(get_statistics_service)
 ) -> DashboardStats:
     """
@@ -50,7 +54,7 @@ async def get_dashboard_stats(
     Args:
         current_user: The current authenticated user
         game_service: The game service
-        table_service: The table service
+        table_loader: Batching loader for the tables of the recent games
         statistics_service: The statistics service
         
     Returns:
@@ -66,9 +70,10 @@ async def get_dashboard_stats(
 
     recent_games = await game_service.get_recent_games(current_user, 5)
 
+    tables = await table_loader.load_many([str(game.table_id) for game in recent_games])
+
     formatted_games = []
-    for game in recent_games:
-        table = await table_service.get_by_id(str(game.table_id))
+    for game, table in zip(recent_games, tables):
         recent_game_stats = statistics_service.get_formatted_recent_game(current_user.id, game, table)
         formatted_games.append(recent_game_stats)
 
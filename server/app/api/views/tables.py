@@ -1,20 +1,23 @@
 from typing import List, Dict, Optional
 
 from bson import ObjectId
-from fastapi import APIRouter, Depends, status, Body
+from fastapi import APIRouter, Depends, Response, status, Body
 
-from app.api.dependencies import get_current_user, get_game_service, get_table_service
+from app.api.dependencies import get_current_user, get_game_service, get_table_service, get_sse_service
 from app.core.exceptions import ValidationException, NotFoundException, PermissionDeniedException
+from app.core.query_budget import query_budget
 from app.schemas.game import GameStatusEnum
 from app.schemas.table import TableUpdate, TableBase, PlayerStatusEnum, TableDBOutput, TableCountResponse
 from app.schemas.user import UserResponse
 from app.services.game_service import GameService
+from app.services.sse_service import SSEService
 from app.services.table_service import TableService
 
 router = APIRouter()
 
 
 @router.post("/create", status_code=status.HTTP_201_CREATED, response_model=Optional[TableDBOutput])
+@query_budget(2)
 async def create_table(
         table: TableBase,
         current_user: UserResponse = Depends(get_current_user),
@@ -35,34 +38,46 @@ async def create_table(
 
 
 @router.get("/", response_model=List[TableDBOutput])
+@query_budget(2)
 async def get_tables(
         status: str = None,
         limit: int = 10,
         skip: int = 0,
+        cursor: str = None,
+        response: Response = None,
         current_user: UserResponse = Depends(get_current_user),
         table_service: TableService = Depends(get_table_service)
 ) -> List[TableDBOutput]:
     """
-    Get tables for the current user.
+    Get tables for the current user, in creation order.
+    
+    The cursor of the next page, if any, is returned in the X-Next-Cursor header.
     
     Args:
         status: Optional status to filter by
         limit: Optional limit for pagination
         skip: Optional skip for pagination
+        cursor: Optional cursor of the previous page, from its X-Next-Cursor header
+        response: The response, carrying the next page cursor
         current_user: The current authenticated user
         table_service: The table service
         
     Returns:
         List of tables
     """
-    return await table_service.get_tables(current_user, status, skip, limit)
+    tables, next_cursor = await table_service.get_tables_page(current_user, status, skip, limit, cursor)
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return tables
 
 
 @router.get("/created", response_model=TableCountResponse)
+@query_budget(3)
 async def get_created_tables(
         status: str = None,
         limit: int = 10,
         skip: int = 0,
+        cursor: str = None,
         current_user: UserResponse = Depends(get_current_user),
         table_service: TableService = Depends(get_table_service)):
     """
@@ -72,20 +87,23 @@ async def get_created_tables(
         status: Optional status to filter by
         limit: Optional limit for pagination
         skip: Optional skip for pagination
+        cursor: Optional `next_cursor` of the previous page
         current_user: The current authenticated user
         table_service: The table service
 
     Returns:
-        List of tables
+        List and count of tables, and the cursor of the next page
     """
-    return await table_service.get_created_tables(current_user, status, skip, limit)
+    return await table_service.get_created_tables(current_user, status, skip, limit, cursor)
 
 
 @router.get("/invited", response_model=TableCountResponse)
+@query_budget(3)
 async def get_invited_tables(
         status: str = None,
         limit: int = 10,
         skip: int = 0,
+        cursor: str = None,
         current_user: UserResponse = Depends(get_current_user),
         table_service: TableService = Depends(get_table_service)
 ):
@@ -96,15 +114,17 @@ async def get_invited_tables(
         status: Optional status to filter by
         limit: Optional limit for pagination
         skip: Optional skip for pagination
+        cursor: Optional `next_cursor` of the previous page
         current_user: The current authenticated user
         table_service: The table service
 
     Returns:
-        List of tables
+        List and count of tables, and the cursor of the next page
     """
-    return await table_service.get_invited_tables(current_user, status, skip, limit)
+    return await table_service.get_invited_tables(current_user, status, skip, limit, cursor)
 
 @router.get("/{table_id}", response_model=TableDBOutput)
+@query_budget(2)
 async def get_table(
         table_id: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -136,11 +156,13 @@ async def get_table(
 
 
 @router.put("/{table_id}", response_model=Optional[TableDBOutput])
+@query_budget(4)
 async def update_table(
         table_id: str,
         table_update: TableUpdate,
         current_user: UserResponse = Depends(get_current_user),
-        table_service: TableService = Depends(get_table_service)
+        table_service: TableService = Depends(get_table_service),
+        sse_service: SSEService = Depends(get_sse_service)
 ) -> TableDBOutput:
     """
     Update a table.
@@ -150,6 +172,7 @@ async def update_table(
         table_update: Updated table data
         current_user: The current authenticated user
         table_service: The table service
+        sse_service: The SSE service
         
     Returns:
         The updated table
@@ -165,10 +188,19 @@ async def update_table(
         raise PermissionDeniedException(detail="Only the creator can modify the table")
 
     update_data = {k: v for k, v in table_update.model_dump(exclude_unset=True).items() if v is not None}
-    return await table_service.update_table(table_id, update_data)
+    updated_table = await table_service.update_table(table_id, update_data)
+
+    if updated_table:
+        try:
+            await sse_service.send_table_update(table_id=table_id, data=updated_table)
+        except Exception:
+            pass  # SSE errors are not critical
+
+    return updated_table
 
 
 @router.delete("/{table_id}", status_code=status.HTTP_204_NO_CONTENT)
+@query_budget(5)
 async def delete_table(
         table_id: str,
         current_user: UserResponse = Depends(get_current_user),
@@ -199,11 +231,13 @@ async def delete_table(
 
 
 @router.put("/{table_id}/invite", status_code=status.HTTP_200_OK, response_model=Optional[TableDBOutput])
+@query_budget(3)
 async def invite_user(
         table_id: str,
         friends: List[Dict] = Body(...),
         current_user: UserResponse = Depends(get_current_user),
-        table_service: TableService = Depends(get_table_service)
+        table_service: TableService = Depends(get_table_service),
+        sse_service: SSEService = Depends(get_sse_service)
 ) -> TableDBOutput:
     """
     Invite users to a table.
@@ -213,6 +247,7 @@ async def invite_user(
         friends: List of friends to invite
         current_user: The current authenticated user
         table_service: The table service
+        sse_service: The SSE service
         
     Returns:
         The updated table
@@ -220,16 +255,26 @@ async def invite_user(
     if not ObjectId.is_valid(table_id) or any(not ObjectId.is_valid(friend.get("user_id")) for friend in friends):
         raise ValidationException(detail="Invalid table or friends ID")
 
-    return await table_service.invite_players(table_id, current_user, friends)
+    updated_table = await table_service.invite_players(table_id, current_user, friends)
+
+    try:
+        await sse_service.send_table_update(table_id=table_id, data=updated_table)
+        await sse_service.send_table_invites(updated_table, [friend.get("user_id") for friend in friends])
+    except Exception:
+        pass  # SSE errors are not critical
+
+    return updated_table
 
 
 @router.put("/{table_id}/{player_status}", status_code=status.HTTP_200_OK, response_model=Optional[TableDBOutput])
+@query_budget(7)
 async def respond_to_invite(
         table_id: str,
         player_status: PlayerStatusEnum,
         current_user: UserResponse = Depends(get_current_user),
         table_service: TableService = Depends(get_table_service),
-        game_service: GameService = Depends(get_game_service)
+        game_service: GameService = Depends(get_game_service),
+        sse_service: SSEService = Depends(get_sse_service)
 ) -> TableDBOutput:
     """
     Respond to a table invite.
@@ -240,6 +285,7 @@ async def respond_to_invite(
         current_user: The current authenticated user
         table_service: The table service
         game_service: The game service
+        sse_service: The SSE service
         
     Returns:
         The updated table
@@ -257,7 +303,15 @@ async def respond_to_invite(
 
     updated_table = await table_service.respond_to_invite(table_id, str(current_user.id), player_status)
 
+    updated_game = None
     if table.game_id and table.status == GameStatusEnum.IN_PROGRESS:
-        await game_service.update_game_invite(table.game_id, current_user, player_status)
+        updated_game = await game_service.update_game_invite(table.game_id, current_user, player_status)
+
+    try:
+        await sse_service.send_table_update(table_id=table_id, data=updated_table)
+        if updated_game:
+            await sse_service.send_game_update(game_id=table.game_id, data=updated_game)
+    except Exception:
+        pass  # SSE errors are not critical
 
     return updated_table
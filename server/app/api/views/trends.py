@@ -1,18 +1,21 @@
 from fastapi import APIRouter, Depends
 
-from app.api.dependencies import get_current_user, get_game_service, get_table_service
+from app.api.dependencies import get_current_user, get_game_service, get_table_loader
+from app.core.query_budget import query_budget
+from app.schemas.table import TableDBOutput
 from app.schemas.trends import TrendsResponse
 from app.schemas.user import UserResponse
 from app.services.game_service import GameService
-from app.services.table_service import TableService
+from app.services.loader import EntityLoader
 
 router = APIRouter()
 
 
 @router.get("/", response_model=TrendsResponse)
+@query_budget(12)
 async def get_trends(
         current_user: UserResponse = Depends(get_current_user),
-        table_service: TableService = Depends(get_table_service),
+        table_loader: EntityLoader[TableDBOutput] = Depends(get_table_loader),
         game_service: GameService = Depends(get_game_service)
 ) -> TrendsResponse:
     """
@@ -20,7 +23,7 @@ async def get_trends(
     
     Args:
         current_user: The current authenticated user
-        table_service: The table service
+        table_loader: Batching loader for the tables of the games
         game_service: The game service
         
     Returns:
@@ -38,10 +41,6 @@ async def get_trends(
     Raises:
         DatabaseException: If any database operation fails
     """
-    games = await game_service.get_games_for_player(current_user)
-    games.sort(key=lambda game: game.date)
-    tables = {game.id: await table_service.get_by_id(str(game.table_id)) for game in games}
-
     # Initialize trend data dictionaries
     pot_data = {}
     duration_data = {}
@@ -51,49 +50,54 @@ async def get_trends(
     players_data = {}
 
     # Initialize totals
+    num_of_games = 0
     total_pot = 0
     total_hours = 0
     total_players = 0
     wins = 0
 
-    # Calculate trends for each game
-    for game in games:
-        table_name = tables[game.id].name
+    # Games arrive oldest first, one batch at a time, so memory stays bounded by the batch size
+    async for games in game_service.stream_games_for_player(current_user):
+        tables = await table_loader.load_many([str(game.table_id) for game in games])
+
+        # Calculate trends for each game
+        for game, table in zip(games, tables):
+            table_name = table.name
+            num_of_games += 1
 
-        # Update pot statistics
-        total_pot += game.total_pot
-        pot_data[table_name] = game.total_pot
+            # Update pot statistics
+            total_pot += game.total_pot
+            pot_data[table_name] = game.total_pot
 
-        # Update duration statistics
-        game_time = game.duration.hours + (game.duration.minutes / 60)
-        duration_data[table_name] = game_time
-        total_hours += game_time
+            # Update duration statistics
+            game_time = game.duration.hours + (game.duration.minutes / 60)
+            duration_data[table_name] = game_time
+            total_hours += game_time
 
-        # Update player statistics
-        game_num_of_players = len(game.players)
-        players_data[table_name] = game_num_of_players
-        total_players += game_num_of_players
+            # Update player statistics
+            game_num_of_players = len(game.players)
+            players_data[table_name] = game_num_of_players
+            total_players += game_num_of_players
 
-        # Calculate profit and buy-in data
-        game_profit = {}
-        game_buy_in = {}
-        max_player = ""
-        max_win = 0
+            # Calculate profit and buy-in data
+            game_profit = {}
+            game_buy_in = {}
+            max_player = ""
+            max_win = 0
 
-        for player in game.players:
-            game_profit[player.username] = player.net_profit
-            if player.net_profit > max_win:
-                max_player = player.username
-                max_win = player.net_profit
-            game_buy_in[player.username] = sum(buyin.amount for buyin in player.buy_ins)
+            for player in game.players:
+                game_profit[player.username] = player.net_profit
+                if player.net_profit > max_win:
+                    max_player = player.username
+                    max_win = player.net_profit
+                game_buy_in[player.username] = player.buy_in_total
 
-        if max_player == current_user.username:
-            wins += 1
+            if max_player == current_user.username:
+                wins += 1
 
-        profit_data[table_name] = game_profit
-        buy_in_data[table_name] = game_buy_in
+            profit_data[table_name] = game_profit
+            buy_in_data[table_name] = game_buy_in
 
-    num_of_games = len(games)
     average_win_rate = wins / num_of_games if num_of_games > 0 else 0
     average_pot_size = total_pot / num_of_games if num_of_games > 0 else 0
     average_hours_played = total_hours / num_of_games if num_of_games > 0 else 0
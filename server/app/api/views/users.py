@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends
 
 from app.api.dependencies import get_current_user, get_user_service
+from app.core.query_budget import query_budget
 from app.core.security import get_password_hash
 from app.schemas.user import UserUpdate, UserResponse, UserDBOutput
 from app.services.user_service import UserService
@@ -9,6 +10,7 @@ router = APIRouter()
 
 
 @router.get("/me", response_model=UserResponse)
+@query_budget(1)
 async def get_current_user_profile(
         current_user: UserResponse = Depends(get_current_user)
 ) -> UserResponse:
@@ -25,6 +27,7 @@ async def get_current_user_profile(
 
 
 @router.put("/me", response_model=UserDBOutput)
+@query_budget(4)
 async def update_user_profile(
         user_update: UserUpdate,
         current_user: UserResponse = Depends(get_current_user),
@@ -0,0 +1,63 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, WebSocket
+from starlette import status
+
+from app.api.dependencies import get_optional_socket_user, get_sse_service
+from app.core.exceptions import NotFoundException, TooManyConnectionsException
+from app.schemas.user import UserResponse
+from app.services.sse_service import SSEService
+
+router = APIRouter()
+
+
+@router.websocket("/tables/{table_id}")
+async def table_socket(
+        websocket: WebSocket,
+        table_id: str,
+        acks: bool = False,
+        current_user: Optional[UserResponse] = Depends(get_optional_socket_user),
+        sse_service: SSEService = Depends(get_sse_service)
+) -> None:
+    """
+    Stream the states of a table as binary MessagePack frames.
+
+    Args:
+        websocket: The client WebSocket
+        table_id: ID of the table to stream
+        acks: Send the next state only once the client acknowledged the previous one
+        current_user: The current user if a `token` is given, sockets are otherwise counted per client address
+        sse_service: The SSE service
+    """
+    try:
+        await sse_service.table_socket(websocket, table_id, acks, current_user)
+    except NotFoundException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+    except TooManyConnectionsException as e:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=e.detail)
+
+
+@router.websocket("/games/{game_id}")
+async def game_socket(
+        websocket: WebSocket,
+        game_id: str,
+        acks: bool = False,
+        current_user: Optional[UserResponse] = Depends(get_optional_socket_user),
+        sse_service: SSEService = Depends(get_sse_service)
+) -> None:
+    """
+    Stream the states of a game as binary MessagePack frames.
+
+    Args:
+        websocket: The client WebSocket
+        game_id: ID of the game to stream
+        acks: Send the next state only once the client acknowledged the previous one
+        current_user: The current user if a `token` is given, sockets are otherwise counted per client address
+        sse_service: The SSE service
+    """
+    try:
+        await sse_service.game_socket(websocket, game_id, acks, current_user)
+    except NotFoundException as e:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION, reason=e.detail)
+    except TooManyConnectionsException as e:
+        await websocket.close(code=status.WS_1013_TRY_AGAIN_LATER, reason=e.detail)
@@ -1,4 +1,4 @@
-from typing import List
+from typing import List, Optional
 
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
@@ -13,12 +13,49 @@ class Settings(BaseSettings):
 
     MONGODB_URL: str
     MONGODB_DB_NAME: str
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None
+    # zstd needs the zstandard package (in requirements.txt); snappy is optional and needs python-snappy
+    MONGODB_COMPRESSORS: str = "zstd,zlib"
 
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
 
     CORS_ORIGINS: List[str]
+    # Users allowed on the operational endpoints (stream connections and metrics), by email
+    OPS_USER_EMAILS: List[str] = []
+
+    SSE_PATCH_RESYNC_INTERVAL: int = 20
+    SSE_REPLAY_BUFFER_SIZE: int = 64
+    SSE_TOPIC_RETENTION_SECONDS: int = 60
+    SSE_BROADCAST_BACKEND: str = "memory"
+    SSE_BROADCAST_SOCKET: str = "/tmp/pokertracker-sse.sock"
+    SSE_SUBSCRIBER_QUEUE_SIZE: int = 32
+    SSE_SUBSCRIBER_MAX_LAG_SECONDS: float = 30.0
+    SSE_HEARTBEAT_SECONDS: float = 15.0
+    SSE_CONNECTION_TIMEOUT_SECONDS: float = 60.0
+    SSE_MAX_CONNECTIONS: int = 10000
+    SSE_MAX_CONNECTIONS_PER_USER: int = 10
+
+    # Writes invalidate the cache of every worker through the SSE broadcast backend;
+    # the TTL bounds staleness when an invalidation is lost
+    REPOSITORY_CACHE_SIZE: int = 1024
+    REPOSITORY_CACHE_TTL_SECONDS: float = 5.0
+    TABLE_COUNT_CACHE_TTL_SECONDS: float = 0.0
+
+    # Buy-ins and cash-outs left pending on their game (the ledger insert failed) are
+    # written to the ledger once older than the grace period, by the SSE broadcast hub; 0 disables the task
+    LEDGER_RECONCILE_INTERVAL_SECONDS: float = 60.0
+    LEDGER_PENDING_GRACE_SECONDS: float = 30.0
+
+    ENSURE_INDEXES_ON_STARTUP: bool = True
+    # Unset means enabled in DEBUG or when QUERY_BUDGET_MODE is set, else disabled
+    QUERY_PROFILER_ENABLED: Optional[bool] = None
+    # "off", "warn" or "raise" when a route goes over its query budget; unset means "warn" in DEBUG, else "off"
+    QUERY_BUDGET_MODE: Optional[str] = None
 
     class Config:
         env_file = ".env"
@@ -95,3 +95,23 @@ class StreamException(AppException):
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=detail
         )
+
+
+class TooManyConnectionsException(AppException):
+    """Raised when a client opens more event streams than allowed."""
+
+    def __init__(self, detail: str = "Too many open connections"):
+        super().__init__(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=detail
+        )
+
+
+class QueryBudgetExceededException(Exception):
+    """
+    Raised when a route issues more MongoDB queries than its declared budget.
+
+    Not an AppException: it flags a regression in the code (typically a
+    query per row), not a client error, and is only raised when
+    QUERY_BUDGET_MODE is "raise", as in tests.
+    """
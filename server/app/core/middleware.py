@@ -0,0 +1,79 @@
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.query_budget import check_query_budget, query_budget_mode
+from app.db.query_profiler import QueryProfiler, RequestProfile, current_profile, query_profiler
+
+
+def route_template(scope: Scope) -> Optional[str]:
+    """
+    Rebuild the path template of the route a request matched.
+
+    Routes of included routers only know their path relative to the router
+    ("/{game_id}"), so the template is rebuilt from the request path by
+    putting back the name of each path parameter in place of its value.
+
+    Args:
+        scope: The ASGI scope of the request, once routed
+
+    Returns:
+        Optional[str]: The template, e.g. "/api/games/{game_id}", or None if no route matched
+    """
+    if scope.get("route") is None:
+        return None
+    segments = scope["path"].split("/")
+    end = len(segments)
+    # Parameters appear in the path in the order of the dict; match them from the right
+    for name, value in reversed(list(scope.get("path_params", {}).items())):
+        for i in range(end - 1, 0, -1):
+            if segments[i] == str(value):
+                segments[i], end = f"{{{name}}}", i
+                break
+    return "/".join(segments)
+
+
+class QueryProfilerMiddleware:
+    """
+    Attributes the MongoDB commands of each HTTP request to its route.
+
+    Makes a fresh `RequestProfile` current while the request is served,
+    reports its database time in a `Server-Timing` header, and once the
+    response is sent folds it into the statistics of the matched route
+    ("GET /api/games/{game_id}"). Requests matching no route are not
+    recorded. Views declaring a `query_budget` are checked against it when
+    their response starts, according to QUERY_BUDGET_MODE. Written as a
+    plain ASGI middleware so that streamed responses (the SSE endpoints)
+    are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp, profiler: QueryProfiler = query_profiler):
+        self.app = app
+        self.profiler = profiler
+        self.budget_mode = query_budget_mode()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile()
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                template = route_template(scope)
+                if template is not None:
+                    route = f"{scope['method']} {template}"
+                    check_query_budget(route, getattr(scope["route"], "endpoint", None), profile, self.budget_mode)
+                MutableHeaders(scope=message).append("Server-Timing", profile.server_timing())
+            await send(message)
+
+        token = current_profile.set(profile)
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            template = route_template(scope)
+            if template is not None:
+                self.profiler.record_request(f"{scope['method']} {template}", profile)
@@ -0,0 +1,98 @@
+import logging
+from typing import Callable, Optional, TypeVar
+
+from app.core.config import settings
+from app.core.exceptions import QueryBudgetExceededException
+from app.db.query_profiler import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+QUERY_BUDGET_ATTRIBUTE = "__query_budget__"
+QUERY_BUDGET_MODES = ("off", "warn", "raise")
+
+Endpoint = TypeVar("Endpoint", bound=Callable)
+
+
+def query_budget(max_queries: int) -> Callable[[Endpoint], Endpoint]:
+    """
+    Declare the number of MongoDB queries a view may issue per request.
+
+    Placed under the router decorator, it marks the view function itself,
+    leaving its signature untouched for FastAPI:
+
+        @router.get("/dashboard")
+        @query_budget(4)
+        async def get_dashboard_stats(...):
+
+    Every command counts, the lookup of the current user included, except
+    the getMore commands fetching further batches of a query. Budgets are
+    worst cases, with the repository caches cold. Routes streaming a
+    collection in batches budget a handful of batches: a query per document
+    goes over it as soon as there are a few documents.
+
+    Args:
+        max_queries: The number of queries the view may issue
+
+    Returns:
+        Callable[[Endpoint], Endpoint]: The decorator
+    """
+    def decorator(endpoint: Endpoint) -> Endpoint:
+        setattr(endpoint, QUERY_BUDGET_ATTRIBUTE, max_queries)
+        return endpoint
+    return decorator
+
+
+def query_budget_mode() -> str:
+    """
+    Resolve what going over a query budget does.
+
+    Returns:
+        str: "off", "warn" or "raise"
+
+    Raises:
+        ValueError: If QUERY_BUDGET_MODE is not one of the modes
+    """
+    mode = settings.QUERY_BUDGET_MODE or ("warn" if settings.DEBUG else "off")
+    if mode not in QUERY_BUDGET_MODES:
+        raise ValueError(f"QUERY_BUDGET_MODE must be one of {', '.join(QUERY_BUDGET_MODES)}, not {mode!r}")
+    return mode
+
+
+def query_profiler_enabled() -> bool:
+    """
+    Resolve whether MongoDB commands are profiled per route.
+
+    Unset, the profiler runs in DEBUG and wherever query budgets are
+    enforced, which need it.
+
+    Returns:
+        bool: True if the profiler is enabled
+    """
+    if settings.QUERY_PROFILER_ENABLED is not None:
+        return settings.QUERY_PROFILER_ENABLED
+    return settings.DEBUG or query_budget_mode() != "off"
+
+
+def check_query_budget(route: str, endpoint: Optional[Callable], profile: RequestProfile, mode: str) -> None:
+    """
+    Compare the queries of a request with the budget of its view.
+
+    Args:
+        route: The method and path template of the route, for the report
+        endpoint: The view function of the route
+        profile: The profile of the request
+        mode: "warn" logs a warning, "raise" raises; "off" does nothing
+
+    Raises:
+        QueryBudgetExceededException: If the budget is exceeded in "raise" mode
+    """
+    budget = getattr(endpoint, QUERY_BUDGET_ATTRIBUTE, None)
+    if mode == "off" or budget is None or profile.queries <= budget:
+        return
+    message = (
+        f"{route} issued {profile.queries} MongoDB queries, over its budget of {budget}; "
+        f"most repeated: {'; '.join(profile.most_repeated())}"
+    )
+    if mode == "raise":
+        raise QueryBudgetExceededException(message)
+    logger.warning(message)
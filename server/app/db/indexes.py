@@ -0,0 +1,44 @@
+import logging
+from typing import Dict, List
+
+from app.repositories.game_repository import GameRepository
+from app.repositories.ledger_repository import LedgerRepository
+from app.repositories.statistics_repository import StatisticsRepository
+from app.repositories.table_repository import TableRepository
+from app.repositories.user_repository import UserRepository
+
+logger = logging.getLogger(__name__)
+
+REPOSITORIES = (UserRepository, TableRepository, GameRepository, LedgerRepository, StatisticsRepository)
+
+
+async def reconcile_indexes(db) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Reconcile the indexes declared by every repository with the database.
+
+    Missing indexes are created; drifted, undeclared and failed ones are
+    logged as warnings, since they need a decision no startup should take
+    on its own (dropping an index, deduplicating a unique field...).
+
+    Args:
+        db: The MongoDB database
+
+    Returns:
+        Dict[str, Dict[str, List[str]]]: The report of `BaseRepository.ensure_indexes` per collection
+    """
+    reports = {}
+    for repository_class in REPOSITORIES:
+        repository = repository_class(db)
+        name = repository.collection.name
+        try:
+            report = await repository.ensure_indexes()
+        except Exception as e:
+            logger.error(f"Failed to reconcile indexes of {name}: {e}")
+            continue
+        reports[name] = report
+        if report["created"]:
+            logger.info(f"Created indexes on {name}: {', '.join(report['created'])}")
+        for kind in ("drifted", "failed", "undeclared"):
+            if report[kind]:
+                logger.warning(f"{kind.capitalize()} indexes on {name}: {', '.join(report[kind])}")
+    return reports
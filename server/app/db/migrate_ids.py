@@ -0,0 +1,170 @@
+"""
+Rewrites the references between documents into their canonical form.
+
+A document's own `_id` is an ObjectId; every field referring to another
+document stores that `_id` as a lowercase hex string (see
+`app.schemas.py_object_id.canonical_id`). Documents written before this was
+enforced may hold ObjectIds (statistics.user_id, users.friends) or
+uppercase strings instead, which the repository queries no longer match.
+
+Collections are migrated in `_id` order, one batch at a time, while the
+application keeps running. Each batch is written with a single unordered
+bulk write whose filters pin the values that were read, so a document
+modified in the meantime is read again and retried instead of being
+overwritten. The last migrated `_id` of each collection is checkpointed in
+the `migrations` collection: an interrupted run resumes where it stopped.
+
+Usage (from the server directory):
+    python -m app.db.migrate_ids --batch-size 500
+"""
+import argparse
+import asyncio
+import sys
+from datetime import datetime, UTC
+from typing import Any, Dict, List, Optional, Tuple
+
+from bson import ObjectId
+from pymongo import ASCENDING, UpdateOne
+
+from app.schemas.py_object_id import canonical_id
+
+MIGRATION_ID = "canonical_ids"
+MAX_ATTEMPTS = 5
+
+# Fields holding references, by collection; dotted paths descend into embedded documents and arrays
+REFERENCE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "games": ("table_id", "creator_id", "players.user_id"),
+    "tables": ("creator_id", "game_id", "players.user_id"),
+    "users": ("friends",),
+    "statistics": ("user_id",),
+}
+
+
+def _canonical(value: Any, path: List[str]) -> Any:
+    """Canonicalize the references found at `path` under `value`, returning a new value."""
+    if isinstance(value, list):
+        return [_canonical(item, path) for item in value]
+    if not path:
+        return canonical_id(value) if isinstance(value, (ObjectId, str)) and ObjectId.is_valid(value) else value
+    if isinstance(value, dict) and path[0] in value:
+        return {**value, path[0]: _canonical(value[path[0]], path[1:])}
+    return value
+
+
+def rewrite(doc: dict, fields: Tuple[str, ...]) -> Optional[UpdateOne]:
+    """
+    Build the update canonicalizing the references of a document.
+
+    Args:
+        doc: The document as read
+        fields: The reference fields of its collection
+
+    Returns:
+        Optional[UpdateOne]: The update, or None if the document is already canonical
+    """
+    changed = {}
+    for field in fields:
+        top, *rest = field.split(".")
+        if top not in doc:
+            continue
+        value = changed.get(top, doc[top])
+        canonical = _canonical(value, rest)
+        if canonical != doc[top]:
+            changed[top] = canonical
+    if not changed:
+        return None
+    # Only matches while the rewritten fields still hold the values read
+    pinned = {"_id": doc["_id"], **{top: doc[top] for top in changed}}
+    return UpdateOne(pinned, {"$set": changed})
+
+
+async def migrate_collection(db, name: str, batch_size: int) -> Dict[str, int]:
+    """
+    Migrate one collection from its checkpoint on.
+
+    Args:
+        db: The MongoDB database
+        name: The collection to migrate
+        batch_size: Number of documents read and written per batch
+
+    Returns:
+        Dict[str, int]: Number of documents "scanned", "rewritten" and "retried"
+    """
+    collection, fields = db[name], REFERENCE_FIELDS[name]
+    checkpoint_id = f"{MIGRATION_ID}:{name}"
+    checkpoint = await db.migrations.find_one({"_id": checkpoint_id}) or {}
+    last_id = checkpoint.get("last_id")
+    counts = {"scanned": 0, "rewritten": 0, "retried": 0}
+
+    while True:
+        query = {"_id": {"$gt": last_id}} if last_id is not None else {}
+        docs = await collection.find(query).sort("_id", ASCENDING).limit(batch_size).to_list(length=batch_size)
+        if not docs:
+            break
+        counts["scanned"] += len(docs)
+
+        pending = docs
+        for attempt in range(MAX_ATTEMPTS):
+            updates = {doc["_id"]: update for doc in pending if (update := rewrite(doc, fields)) is not None}
+            if not updates:
+                break
+            result = await collection.bulk_write(list(updates.values()), ordered=False)
+            counts["rewritten"] += result.modified_count
+            if result.matched_count == len(updates):
+                break
+            # Some documents changed since they were read: read them again, the canonical ones drop out
+            ids = list(updates)
+            reread = await collection.find({"_id": {"$in": ids}}).to_list(length=len(ids))
+            pending = [doc for doc in reread if rewrite(doc, fields) is not None]
+            counts["retried"] += len(pending)
+        else:
+            raise RuntimeError(f"{name}: documents kept changing during the migration, run it again")
+
+        last_id = docs[-1]["_id"]
+        await db.migrations.update_one(
+            {"_id": checkpoint_id},
+            {"$set": {"last_id": last_id, "updated_at": datetime.now(UTC)}},
+            upsert=True
+        )
+    return counts
+
+
+async def migrate_ids(db, collections: List[str], batch_size: int = 500, restart: bool = False) -> Dict[str, Dict[str, int]]:
+    """
+    Migrate the references of several collections.
+
+    Args:
+        db: The MongoDB database
+        collections: The collections to migrate, keys of REFERENCE_FIELDS
+        batch_size: Number of documents read and written per batch
+        restart: Drop the checkpoints and scan the collections from the start
+
+    Returns:
+        Dict[str, Dict[str, int]]: The counts of `migrate_collection` per collection
+    """
+    if restart:
+        await db.migrations.delete_many({"_id": {"$in": [f"{MIGRATION_ID}:{name}" for name in collections]}})
+    return {name: await migrate_collection(db, name, batch_size) for name in collections}
+
+
+async def main(args: argparse.Namespace) -> int:
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    from app.core.config import settings
+
+    client = AsyncIOMotorClient(settings.MONGODB_URL, tz_aware=True)
+    try:
+        results = await migrate_ids(client[settings.MONGODB_DB_NAME], args.collections, args.batch_size, args.restart)
+    finally:
+        client.close()
+    for name, counts in results.items():
+        print(f"{name}: {counts['scanned']} scanned, {counts['rewritten']} rewritten, {counts['retried']} retried")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--collections", nargs="+", choices=list(REFERENCE_FIELDS), default=list(REFERENCE_FIELDS))
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoints of a previous run")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -4,6 +4,9 @@ from motor.motor_asyncio import AsyncIOMotorClient
 
 from app.core.config import settings
 from app.core.exceptions import DatabaseException
+from app.core.query_budget import query_profiler_enabled
+from app.db.pool_metrics import available_compressors, pool_metrics
+from app.db.query_profiler import query_profiler
 
 
 class MongoDB:
@@ -26,17 +29,36 @@ async def connect_to_mongo() -> None:
     Establish connection to MongoDB.
     
     This function initializes the MongoDB client and database connection
-    using the configuration from settings.
+    using the configuration from settings, including the connection pool
+    bounds and the wire compressors, and registers the pool metrics and
+    query profiler listeners. A client installed beforehand (such as the in-memory
+    stand-in used by the load test) is kept.
     
     Raises:
         DatabaseException: If connection to MongoDB fails
     """
     try:
-        MongoDB.client = AsyncIOMotorClient(
-            settings.MONGODB_URL,
-            tz_aware=True,
-            serverSelectionTimeoutMS=5000  # 5 second timeout
-        )
+        if MongoDB.client is None:
+            pool_options = {
+                "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+                "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+                "maxIdleTimeMS": settings.MONGODB_MAX_IDLE_TIME_MS,
+                "waitQueueTimeoutMS": settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            }
+            compressors = available_compressors(settings.MONGODB_COMPRESSORS)
+            if compressors:
+                # The first one the server also supports is used
+                pool_options["compressors"] = compressors
+            event_listeners = [pool_metrics]
+            if query_profiler_enabled():
+                event_listeners.append(query_profiler)
+            MongoDB.client = AsyncIOMotorClient(
+                settings.MONGODB_URL,
+                tz_aware=True,
+                serverSelectionTimeoutMS=5000,  # 5 second timeout
+                event_listeners=event_listeners,
+                **{option: value for option, value in pool_options.items() if value is not None}
+            )
         MongoDB.db = MongoDB.client[settings.MONGODB_DB_NAME]
 
         # Verify connection
@@ -57,6 +79,7 @@ async def close_mongo_connection() -> None:
     if MongoDB.client:
         try:
             MongoDB.client.close()
+            MongoDB.client = None
         except Exception as e:
             raise DatabaseException(
                 detail=f"Failed to close MongoDB connection: {str(e)}"
@@ -0,0 +1,169 @@
+import importlib.util
+import logging
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, List
+
+from pymongo import monitoring
+
+logger = logging.getLogger(__name__)
+
+# Python module each wire compressor needs; zlib ships with Python
+COMPRESSOR_MODULES = {"zstd": "zstandard", "snappy": "snappy", "zlib": "zlib"}
+# The package to install for each module
+COMPRESSOR_PACKAGES = {"zstandard": "zstandard", "snappy": "python-snappy"}
+
+
+def available_compressors(requested: str) -> List[str]:
+    """
+    Keep the requested wire compressors whose Python module is installed.
+
+    Args:
+        requested: Comma separated compressors, in order of preference (e.g. "zstd,snappy,zlib")
+
+    Returns:
+        List[str]: The usable compressors, in the same order
+    """
+    compressors = []
+    for name in (part.strip() for part in requested.split(",")):
+        if not name:
+            continue
+        module = COMPRESSOR_MODULES.get(name)
+        if module is None:
+            logger.warning(f"Unknown MongoDB wire compressor {name}, skipping it")
+            continue
+        if importlib.util.find_spec(module) is None:
+            logger.warning(
+                f"MongoDB wire compressor {name} needs the {COMPRESSOR_PACKAGES[module]} package, skipping it"
+            )
+            continue
+        compressors.append(name)
+    return compressors
+
+
+class _ServerPoolStats:
+    """Counters of the connection pool of one server."""
+
+    def __init__(self, latency_window: int):
+        self.connections = 0
+        self.checked_out = 0
+        self.waiting = 0
+        self.max_checked_out = 0
+        self.max_waiting = 0
+        self.checkouts = 0
+        self.failed_checkouts = 0
+        self.cleared = 0
+        self.latencies: Deque[float] = deque(maxlen=latency_window)
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+
+        def percentile(p: float) -> float:
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+
+        return {
+            "connections": self.connections,
+            "checked_out": self.checked_out,
+            "waiting": self.waiting,
+            "max_checked_out": self.max_checked_out,
+            "max_waiting": self.max_waiting,
+            "checkouts": self.checkouts,
+            "failed_checkouts": self.failed_checkouts,
+            "cleared": self.cleared,
+            "checkout_ms_p50": percentile(0.5),
+            "checkout_ms_p99": percentile(0.99),
+            "checkout_ms_max": latencies[-1] * 1000 if latencies else 0.0,
+        }
+
+
+class PoolMetrics(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener keeping saturation metrics per server.
+
+    Tracks the open and checked out connections, the operations waiting for
+    a connection (the wait queue), their peaks, and the latency of the last
+    checkouts. Motor runs pymongo on worker threads, so events may arrive
+    concurrently and updates are made under a lock.
+    """
+
+    def __init__(self, latency_window: int = 1024):
+        """
+        Initialize the listener.
+
+        Args:
+            latency_window: Number of recent checkouts the latency percentiles are computed over
+        """
+        self.latency_window = latency_window
+        self._servers: Dict[str, _ServerPoolStats] = {}
+        self._lock = threading.Lock()
+
+    def _server(self, address) -> _ServerPoolStats:
+        key = f"{address[0]}:{address[1]}"
+        stats = self._servers.get(key)
+        if stats is None:
+            stats = self._servers[key] = _ServerPoolStats(self.latency_window)
+        return stats
+
+    def get_stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the pool metrics of every server.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Dictionary mapping server addresses to their pool metrics
+        """
+        with self._lock:
+            return {address: stats.snapshot() for address, stats in self._servers.items()}
+
+    def pool_created(self, event):
+        with self._lock:
+            self._server(event.address)
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self._server(event.address).cleared += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self._server(event.address).connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self._server(event.address).connections -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            stats = self._server(event.address)
+            stats.waiting += 1
+            stats.max_waiting = max(stats.max_waiting, stats.waiting)
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            stats = self._server(event.address)
+            stats.waiting -= 1
+            stats.failed_checkouts += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            stats = self._server(event.address)
+            stats.waiting -= 1
+            stats.checked_out += 1
+            stats.checkouts += 1
+            stats.max_checked_out = max(stats.max_checked_out, stats.checked_out)
+            if event.duration is not None:
+                stats.latencies.append(event.duration)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self._server(event.address).checked_out -= 1
+
+
+pool_metrics = PoolMetrics()
@@ -0,0 +1,212 @@
+import json
+import threading
+from collections import Counter
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional, Tuple
+
+from pymongo import monitoring
+
+BACKGROUND_ROUTE = "(background)"
+
+# Fetches further batches of a query already counted, not a query of its own
+GET_MORE = "getMore"
+
+# Where each command keeps the query its shape is taken from
+_FILTER_FIELDS = {"find": "filter", "count": "query", "distinct": "query", "findAndModify": "query"}
+_STATEMENT_FIELDS = {"update": "updates", "delete": "deletes"}
+
+
+def _shape(value: Any) -> Any:
+    """Replace the values of a query by "?", keeping its fields and operators."""
+    if isinstance(value, dict):
+        return {key: _shape(item) for key, item in value.items()}
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        return [_shape(item) for item in value]
+    return "?"
+
+
+def query_shape(command_name: str, command: dict) -> str:
+    """
+    Describe the query of a command without its values.
+
+    Args:
+        command_name: The name of the command, e.g. "find"
+        command: The command document
+
+    Returns:
+        str: The query shape as compact JSON, "" for commands without a query
+    """
+    if command_name in _FILTER_FIELDS:
+        shape = _shape(command.get(_FILTER_FIELDS[command_name], {}))
+    elif command_name in _STATEMENT_FIELDS:
+        statements = command.get(_STATEMENT_FIELDS[command_name]) or [{}]
+        shape = _shape(statements[0].get("q", {}))
+    elif command_name == "aggregate":
+        shape = [
+            {"$match": _shape(stage["$match"])} if "$match" in stage else next(iter(stage), "?")
+            for stage in command.get("pipeline", [])
+        ]
+    else:
+        return ""
+    return json.dumps(shape, separators=(",", ":"), default=str)
+
+
+class RequestProfile:
+    """
+    Database commands issued while serving one HTTP request.
+
+    Motor runs the commands on worker threads, which see the profile of the
+    request through `current_profile`; updates are made under a lock.
+    """
+
+    def __init__(self):
+        self.commands = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slowest: Optional[Tuple[float, str, str, str]] = None
+        self._shapes: Counter = Counter()
+        self._started: Dict[int, Tuple[str, str, str]] = {}
+        self._lock = threading.Lock()
+
+    def command_started(self, request_id: int, command_name: str, collection: str, shape: str) -> None:
+        with self._lock:
+            self._started[request_id] = (command_name, collection, shape)
+
+    def command_finished(self, request_id: int, seconds: float) -> None:
+        with self._lock:
+            command_name, collection, shape = self._started.pop(request_id, ("?", "", ""))
+            self.commands += 1
+            self.db_seconds += seconds
+            if command_name != GET_MORE:
+                self.queries += 1
+                self._shapes[(command_name, collection, shape)] += 1
+            if self.slowest is None or seconds > self.slowest[0]:
+                self.slowest = (seconds, command_name, collection, shape)
+
+    def most_repeated(self, count: int = 3) -> List[str]:
+        """
+        Describe the queries issued the most times, the usual sign of a per-row query.
+
+        Args:
+            count: Number of queries to describe
+
+        Returns:
+            List[str]: Descriptions such as "12x find users {"_id":"?"}"
+        """
+        with self._lock:
+            return [
+                f"{times}x {command_name} {collection} {shape}".rstrip()
+                for (command_name, collection, shape), times in self._shapes.most_common(count)
+            ]
+
+    def server_timing(self) -> str:
+        """The Server-Timing header value reporting the database time of the request."""
+        return f'db;dur={self.db_seconds * 1000:.2f};desc="{self.commands} queries"'
+
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+
+
+class _RouteStats:
+    """Commands issued by the requests of one route."""
+
+    def __init__(self):
+        self.requests = 0
+        self.commands = 0
+        self.max_commands = 0
+        self.db_seconds = 0.0
+        self.slowest: Optional[Tuple[float, str, str, str]] = None
+
+    def add(self, profile: RequestProfile, requests: int = 1) -> None:
+        self.requests += requests
+        self.commands += profile.commands
+        self.max_commands = max(self.max_commands, profile.commands)
+        self.db_seconds += profile.db_seconds
+        if profile.slowest is not None and (self.slowest is None or profile.slowest[0] > self.slowest[0]):
+            self.slowest = profile.slowest
+
+    def snapshot(self) -> Dict[str, Any]:
+        seconds, command_name, collection, shape = self.slowest or (0.0, "", "", "")
+        return {
+            "requests": self.requests,
+            "commands": self.commands,
+            "commands_per_request": self.commands / self.requests if self.requests else 0.0,
+            "max_commands": self.max_commands,
+            "db_ms": self.db_seconds * 1000,
+            "db_ms_per_request": self.db_seconds * 1000 / self.requests if self.requests else 0.0,
+            "slowest_ms": seconds * 1000,
+            "slowest_command": command_name,
+            "slowest_collection": collection,
+            "slowest_shape": shape,
+        }
+
+
+class QueryProfiler(monitoring.CommandListener):
+    """
+    Command listener attributing MongoDB commands to the HTTP route being served.
+
+    Commands issued while a `RequestProfile` is current are added to it, and
+    the profile is folded into the statistics of its route once the request
+    is over. Commands issued outside of a request (the SSE poller, startup
+    tasks...) are counted under BACKGROUND_ROUTE.
+    """
+
+    def __init__(self):
+        """
+        Initialize the profiler.
+        """
+        self._routes: Dict[str, _RouteStats] = {}
+        self._background = RequestProfile()
+        self._lock = threading.Lock()
+
+    def record_request(self, route: str, profile: RequestProfile) -> None:
+        """
+        Add the commands of a finished request to the statistics of its route.
+
+        Args:
+            route: The method and path template of the route, e.g. "GET /api/games/{game_id}"
+            profile: The profile of the request
+        """
+        with self._lock:
+            self._routes.setdefault(route, _RouteStats()).add(profile)
+
+    def get_report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the command statistics of every route.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Dictionary mapping routes to their command statistics
+        """
+        with self._lock:
+            report = {route: stats.snapshot() for route, stats in self._routes.items()}
+            if self._background.commands:
+                background = _RouteStats()
+                background.add(self._background, requests=0)
+                report[BACKGROUND_ROUTE] = background.snapshot()
+            return report
+
+    def reset(self) -> None:
+        """
+        Drop the statistics gathered so far.
+        """
+        with self._lock:
+            self._routes.clear()
+            self._background = RequestProfile()
+
+    def started(self, event):
+        collection = event.command.get(event.command_name)
+        (current_profile.get() or self._background).command_started(
+            event.request_id,
+            event.command_name,
+            collection if isinstance(collection, str) else "",
+            query_shape(event.command_name, event.command)
+        )
+
+    def succeeded(self, event):
+        (current_profile.get() or self._background).command_finished(event.request_id, event.duration_micros / 1e6)
+
+    def failed(self, event):
+        (current_profile.get() or self._background).command_finished(event.request_id, event.duration_micros / 1e6)
+
+
+query_profiler = QueryProfiler()
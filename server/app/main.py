@@ -1,3 +1,5 @@
+import asyncio
+import logging
 from contextlib import asynccontextmanager
 
 import uvicorn
@@ -15,13 +17,60 @@ from app.core.error_handlers import (
     general_exception_handler
 )
 from app.core.exceptions import AppException
-from app.db.mongo_client import connect_to_mongo, close_mongo_connection
+from app.core.middleware import QueryProfilerMiddleware
+from app.core.query_budget import query_profiler_enabled
+from app.db.indexes import reconcile_indexes
+from app.db.mongo_client import MongoDB, connect_to_mongo, close_mongo_connection
+from app.repositories.game_repository import GameRepository
+from app.repositories.table_repository import TableRepository
+from app.services.broadcast import BroadcastBackend, create_broadcast_backend
+from app.services.game_service import GameService
+from app.services.sse_service import SSEService
+from app.services.table_service import TableService
+
+
+logger = logging.getLogger(__name__)
+
+
+async def reconcile_ledger_periodically(game_service: GameService, backend: BroadcastBackend) -> None:
+    """
+    Write the buy-ins and cash-outs left pending on their game to the ledger, at startup and then periodically.
+
+    Only the hub of the broadcast backend reconciles, so the workers of a
+    host do not all scan the games; the check is repeated every period
+    since another worker takes over when the hub exits. With the "memory"
+    backend, or several hosts, each hub reconciles: entries are written
+    under their own `seq`, so concurrent reconciliations are harmless.
+    """
+    while True:
+        if backend.is_hub:
+            try:
+                await game_service.reconcile_ledger()
+            except Exception as e:
+                logger.warning(f"Ledger reconciliation failed: {e}")
+        await asyncio.sleep(settings.LEDGER_RECONCILE_INTERVAL_SECONDS)
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await connect_to_mongo()
+    # Index builds run alongside the server instead of holding up startup
+    index_task = asyncio.create_task(reconcile_indexes(MongoDB.db)) if settings.ENSURE_INDEXES_ON_STARTUP else None
+    app.state.sse_service = SSEService(
+        table_service=TableService(TableRepository(MongoDB.db)),
+        game_service=GameService(GameRepository(MongoDB.db)),
+        backend=create_broadcast_backend()
+    )
+    await app.state.sse_service.start()
+    ledger_task = asyncio.create_task(
+        reconcile_ledger_periodically(GameService(GameRepository(MongoDB.db)), app.state.sse_service.backend)
+    ) if settings.LEDGER_RECONCILE_INTERVAL_SECONDS > 0 else None
     yield
+    if ledger_task is not None:
+        ledger_task.cancel()
+    await app.state.sse_service.stop()
+    if index_task is not None and not index_task.done():
+        index_task.cancel()
     await close_mongo_connection()
 
 
@@ -46,8 +95,12 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Server-Timing"],
 )
 
+if query_profiler_enabled():
+    app.add_middleware(QueryProfilerMiddleware)
+
 app.include_router(api_router, prefix=settings.API_PREFIX)
 
 
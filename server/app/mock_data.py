@@ -33,7 +33,8 @@ def get_recent_months():
     return list(reversed(months))  # Oldest to newest
 
 
-def main():
+def generate_data():
+    """Generate users, statistics, tables and games, keyed by collection name"""
     # Create users
     users = []
     for i in range(1, NUM_USERS + 1):
@@ -373,7 +374,7 @@ def main():
         # Create statistics record with updated schema
         stat_record = {
             "_id": ObjectId(),
-            "user_id": user["_id"],
+            "user_id": str(user["_id"]),
             "updated_at": datetime.now(UTC),
             "stats": {
                 "total_profit": total_profit,
@@ -387,6 +388,14 @@ def main():
 
         statistics.append(stat_record)
 
+    return {"users": users, "statistics": statistics, "tables": tables, "games": games}
+
+
+def print_summary(data):
+    """Print an overview of generated data"""
+    users, statistics, tables, games = data["users"], data["statistics"], data["tables"], data["games"]
+    recent_months = get_recent_months()
+
     # Print summary
     print(f"\nGenerated:")
     print(f"- {len(users)} users")
@@ -425,30 +434,31 @@ def main():
             print(
                 f"Game {game['_id']}: Buy-ins=${total_buy_ins}, Cash-outs=${total_cash_outs}, Balanced: {total_buy_ins == total_cash_outs}")
 
-    def insert_data_to_mongodb():
-        from pymongo import MongoClient
 
-        # Connect to MongoDB
-        client = MongoClient("mongodb://localhost:27017/", tz_aware=True)
-        db = client["PokerTracker"]
+def insert_data(db, data):
+    """Replace the contents of the collections in a (pymongo) database with generated data"""
+    # Delete existing data
+    for collection in data:
+        db[collection].delete_many({})
+
+    print("\nExisting data deleted from MongoDB.")
 
-        # Delete existing data
-        db.users.delete_many({})
-        db.statistics.delete_many({})
-        db.tables.delete_many({})
-        db.games.delete_many({})
+    # Insert new data
+    for collection, documents in data.items():
+        db[collection].insert_many(documents)
 
-        print("\nExisting data deleted from MongoDB.")
+    print("New data inserted into MongoDB successfully!")
 
-        # Insert new data
-        db.users.insert_many(users)
-        db.statistics.insert_many(statistics)
-        db.tables.insert_many(tables)
-        db.games.insert_many(games)
 
-        print("New data inserted into MongoDB successfully!")
+def main():
+    from pymongo import MongoClient
+
+    data = generate_data()
+    print_summary(data)
 
-    insert_data_to_mongodb()
+    # Connect to MongoDB
+    client = MongoClient("mongodb://localhost:27017/", tz_aware=True)
+    insert_data(client["PokerTracker"], data)
 
 
 if __name__ == "__main__":
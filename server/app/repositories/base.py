@@ -1,16 +1,131 @@
 import logging
-from typing import Generic, TypeVar, Optional, List, Type, Any, Dict
+import time
+from collections import OrderedDict
+from typing import Generic, TypeVar, Optional, List, Type, Any, Dict, AsyncIterator, Tuple, Union, Callable, Awaitable
 
 from bson import ObjectId
 from pydantic import BaseModel
+from pymongo import DESCENDING, IndexModel, ReturnDocument
+from pymongo.results import BulkWriteResult
 
-from app.core.exceptions import DatabaseException
+from app.core.exceptions import DatabaseException, ValidationException
+from app.repositories.cursor import decode_cursor, encode_cursor
 
 # TCreate: model used for create (no _id)
 # TRead: model used for read/response (includes _id)
 TCreate = TypeVar("TCreate", bound=BaseModel)
 TRead = TypeVar("TRead", bound=BaseModel)
 
+# Tells the other workers that a document changed: called with (collection, id), id None for every document
+InvalidationPublisher = Callable[[str, Optional[str]], Awaitable[None]]
+
+
+def _after_cursor(sort_field: str, direction: int, cursor: str) -> dict:
+    """The condition selecting the documents ordered after the one a cursor points to."""
+    value, last_id = decode_cursor(cursor)
+    operator = "$lt" if direction == DESCENDING else "$gt"
+    return {"$or": [{sort_field: {operator: value}}, {sort_field: value, "_id": {operator: last_id}}]}
+
+
+def _index_key(key) -> Tuple[Tuple[str, Any], ...]:
+    """Normalize an index key pattern, as declared or as listed by the server, for comparison."""
+    return tuple((field, int(direction) if isinstance(direction, float) else direction) for field, direction in key)
+
+
+class EntityCache:
+    """
+    LRU cache of documents by ID, with a time to live.
+
+    Entries are stored and returned as deep copies, so callers may mutate the
+    models they get without corrupting the cache. Every invalidation bumps a
+    generation counter; a read that started before an invalidation does not
+    store its (possibly stale) result.
+
+    Attributes:
+        max_size: Maximum number of cached documents
+        ttl: Seconds a cached document stays valid
+        generation: Incremented on every invalidation
+        metrics: Counters of hits, misses, evictions and invalidations
+    """
+
+    def __init__(self, max_size: int, ttl: float):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached documents
+            ttl: Seconds a cached document stays valid
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.generation = 0
+        self.metrics: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "invalidations": 0}
+        self._entries: OrderedDict[str, tuple] = OrderedDict()
+
+    def get(self, key: str) -> Optional[BaseModel]:
+        """
+        Get a cached document, counting the hit or miss.
+
+        Args:
+            key: The document ID
+
+        Returns:
+            Optional[BaseModel]: A copy of the cached document, or None if missing or expired
+        """
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.metrics["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.metrics["hits"] += 1
+        return entry[0].model_copy(deep=True)
+
+    def set(self, key: str, value: BaseModel, generation: int) -> None:
+        """
+        Cache a document read from the database.
+
+        Args:
+            key: The document ID
+            value: The document
+            generation: The cache generation when the read started
+        """
+        if generation != self.generation:
+            return
+        self._entries[key] = (value.model_copy(deep=True), time.monotonic() + self.ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.metrics["evictions"] += 1
+
+    def invalidate(self, key: str) -> None:
+        """
+        Drop a document from the cache.
+
+        Args:
+            key: The document ID
+        """
+        self.generation += 1
+        self.metrics["invalidations"] += 1
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """
+        Drop every cached document.
+        """
+        self.generation += 1
+        self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get the cache size, configuration and counters.
+
+        Returns:
+            Dict[str, Any]: The cache statistics
+        """
+        return {"size": len(self._entries), "max_size": self.max_size, "ttl": self.ttl, **self.metrics}
+
 
 class BaseRepository(Generic[TCreate, TRead]):
     """
@@ -22,13 +137,37 @@ class BaseRepository(Generic[TCreate, TRead]):
     Type Parameters:
         TCreate: Pydantic model class for input/insertion (e.g., UserDBInput)
         TRead: Pydantic model class for reading/response (e.g., UserDBResponse)
+
+    Repositories are created per request, so the optional `get_by_id` cache
+    is shared by every repository of the same collection. Methods writing a
+    document go through `_find_one_and_update`, which returns the updated
+    document in the same round trip and refreshes the cache.
+
+    The cache is per process. With several workers, invalidations are sent
+    to the other workers through the publisher installed with
+    `set_invalidation_publisher` (the SSE broadcast backend), which apply
+    them with `apply_invalidation`. Another worker may serve the previous
+    version of a document until the invalidation reaches it, usually
+    within milliseconds. If the message is lost (relay restarting),
+    staleness is bounded by the cache TTL.
+
+    Subclasses declare the indexes their queries need in `indexes`, which
+    `ensure_indexes` reconciles with the collection.
     """
 
+    _caches: Dict[str, EntityCache] = {}
+    _invalidation_publisher: Optional[InvalidationPublisher] = None
+    _count_caches: Dict[str, OrderedDict] = {}
+    COUNT_CACHE_SIZE = 1024
+    indexes: List[IndexModel] = []
+
     def __init__(
             self,
             collection,
             create_model: Type[TCreate],
-            read_model: Type[TRead]
+            read_model: Type[TRead],
+            cache_size: int = 0,
+            cache_ttl: float = 0.0
     ):
         """
         Initialize the repository with MongoDB collection and Pydantic models.
@@ -37,11 +176,169 @@ class BaseRepository(Generic[TCreate, TRead]):
             collection: Motor MongoDB collection instance (e.g., db.users)
             create_model: Pydantic class for insertion (no _id)
             read_model: Pydantic class for reading/response (with _id alias)
+            cache_size: Maximum number of documents cached by `get_by_id`, 0 disables the cache
+            cache_ttl: Seconds a cached document stays valid, 0 disables the cache
         """
         self.collection = collection
         self.create_model = create_model
         self.read_model = read_model
         self.logger = logging.getLogger(self.__class__.__name__)
+        self.cache: Optional[EntityCache] = None
+        self.cache_key = getattr(collection, "full_name", None) or collection.name
+        if cache_size > 0 and cache_ttl > 0:
+            self.cache = self._caches.setdefault(self.cache_key, EntityCache(cache_size, cache_ttl))
+
+    def _to_models(self, docs: List[dict]) -> List[Optional[TRead]]:
+        """
+        Validate a batch of documents, one document at a time so one bad document does not fail the rest.
+
+        Args:
+            docs: The documents read from the collection
+
+        Returns:
+            List[Optional[TRead]]: The documents as Pydantic models, None for the invalid ones
+        """
+        models: List[Optional[TRead]] = []
+        for doc in docs:
+            try:
+                models.append(self.read_model.model_validate(doc))
+            except Exception as e:
+                self.logger.error(f"Error parsing document to {self.read_model}: {e}")
+                models.append(None)
+        return models
+
+    @classmethod
+    def get_cache_stats(cls) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the statistics of every repository cache.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Dictionary mapping collection names to their cache statistics
+        """
+        return {name: cache.get_stats() for name, cache in cls._caches.items()}
+
+    @classmethod
+    def set_invalidation_publisher(cls, publisher: Optional[InvalidationPublisher]) -> None:
+        """
+        Install the coroutine sending the invalidations of this worker to the other workers.
+
+        Args:
+            publisher: The publisher, or None to keep invalidations local
+        """
+        BaseRepository._invalidation_publisher = publisher
+
+    @classmethod
+    def apply_invalidation(cls, collection: str, id_str: Optional[str]) -> None:
+        """
+        Drop a document that another worker wrote from the cache of this worker.
+
+        Args:
+            collection: The cache key of the collection (its full name)
+            id_str: The ID of the document, or None to drop every document of the collection
+        """
+        cache = cls._caches.get(collection)
+        if cache is None:
+            return
+        if id_str is None:
+            cache.clear()
+        else:
+            cache.invalidate(id_str)
+
+    async def ensure_indexes(self) -> Dict[str, List[str]]:
+        """
+        Reconcile the declared indexes with the ones of the collection.
+
+        Missing indexes are created. Existing indexes are never dropped or
+        rebuilt: an index whose name or options differ from its declaration
+        is reported as drifted, and an index nobody declared as undeclared,
+        to be dealt with by hand.
+
+        Returns:
+            Dict[str, List[str]]: Names of the indexes "created", "drifted", "failed" and "undeclared"
+
+        Raises:
+            DatabaseException: If the existing indexes cannot be read
+        """
+        try:
+            existing = await self.collection.index_information()
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to read indexes: {str(e)}")
+
+        by_key = {_index_key(info["key"]): name for name, info in existing.items()}
+        report: Dict[str, List[str]] = {"created": [], "drifted": [], "failed": [], "undeclared": []}
+        matched = set()
+        for index in self.indexes:
+            spec = index.document
+            name, key = spec["name"], _index_key(spec["key"].items())
+            current_name = name if name in existing else by_key.get(key)
+            if current_name is None:
+                try:
+                    await self.collection.create_indexes([index])
+                    report["created"].append(name)
+                except Exception as e:
+                    self.logger.error(f"Failed to create index {name}: {e}")
+                    report["failed"].append(name)
+                continue
+            matched.add(current_name)
+            current = existing[current_name]
+            if (
+                    current_name != name
+                    or _index_key(current["key"]) != key
+                    or bool(current.get("unique")) != bool(spec.get("unique"))
+            ):
+                report["drifted"].append(name)
+        report["undeclared"] = [name for name in existing if name != "_id_" and name not in matched]
+        return report
+
+    async def _invalidate(self, id_str: Optional[str]) -> None:
+        """
+        Drop a document from the cache after writing it, on this worker and the others.
+
+        Args:
+            id_str: The string representation of the document's _id, or None for every document
+        """
+        if self.cache is None:
+            return
+        if id_str is None:
+            self.cache.clear()
+        else:
+            self.cache.invalidate(id_str)
+        publisher = BaseRepository._invalidation_publisher
+        if publisher is None:
+            return
+        try:
+            await publisher(self.cache_key, id_str)
+        except Exception as e:
+            # The other workers fall back to the cache TTL
+            self.logger.warning(f"Failed to publish cache invalidation for {self.cache_key}: {e}")
+
+    async def _find_one_and_update(self, filter_: dict, update: Union[dict, List[dict]]) -> Optional[TRead]:
+        """
+        Apply an update to the first matching document and return it as updated, in a single round trip.
+
+        Args:
+            filter_: MongoDB query dictionary
+            update: MongoDB update document, or update pipeline
+
+        Returns:
+            Optional[TRead]: The updated document as a Pydantic model, or None if no document matched
+        """
+        generation = self.cache.generation if self.cache is not None else None
+        doc = await self.collection.find_one_and_update(filter_, update, return_document=ReturnDocument.AFTER)
+        if not doc:
+            return None
+        id_str = str(doc["_id"])
+        await self._invalidate(id_str)
+        try:
+            model = self.read_model.model_validate(doc)
+        except Exception as e:
+            self.logger.error(f"Error parsing document to {self.read_model}: {e}")
+            return None
+        if self.cache is not None:
+            # Only stored if no other write was invalidated meanwhile: with concurrent
+            # writes to a document, the result of an older one may come back last
+            self.cache.set(id_str, model, generation + 1)
+        return model
 
     async def get_by_id(self, id_str: str) -> Optional[TRead]:
         """
@@ -59,11 +356,20 @@ class BaseRepository(Generic[TCreate, TRead]):
         try:
             if not ObjectId.is_valid(id_str):
                 return None
+            generation = None
+            if self.cache is not None:
+                cached = self.cache.get(id_str)
+                if cached is not None:
+                    return cached
+                generation = self.cache.generation
             doc = await self.collection.find_one({"_id": ObjectId(id_str)})
             if not doc:
                 return None
             try:
-                return self.read_model(**doc)
+                model = self.read_model.model_validate(doc)
+                if self.cache is not None:
+                    self.cache.set(id_str, model, generation)
+                return model
             except Exception as e:
                 self.logger.error(f"Error parsing document to {self.read_model}: {e}")
                 return None
@@ -71,6 +377,46 @@ class BaseRepository(Generic[TCreate, TRead]):
             self.logger.error(f"Database error in get_by_id: {e}")
             raise DatabaseException(detail=f"Failed to fetch document by ID: {str(e)}")
 
+    async def get_many_by_ids(self, id_strs: List[str]) -> Dict[str, TRead]:
+        """
+        Fetch several documents by their IDs in a single query.
+        
+        Args:
+            id_strs: The string representations of the documents' _id
+            
+        Returns:
+            Dict[str, TRead]: Dictionary mapping the IDs found to their documents as Pydantic models
+            
+        Raises:
+            DatabaseException: If there's an error accessing the database
+        """
+        try:
+            found: Dict[str, TRead] = {}
+            missing = []
+            for id_str in dict.fromkeys(id_strs):
+                if not ObjectId.is_valid(id_str):
+                    continue
+                cached = self.cache.get(id_str) if self.cache is not None else None
+                if cached is not None:
+                    found[id_str] = cached
+                else:
+                    missing.append(ObjectId(id_str))
+            if not missing:
+                return found
+            generation = self.cache.generation if self.cache is not None else None
+            docs = await self.collection.find({"_id": {"$in": missing}}).to_list(length=len(missing))
+            for doc, model in zip(docs, self._to_models(docs)):
+                if model is None:
+                    continue
+                id_str = str(doc["_id"])
+                found[id_str] = model
+                if self.cache is not None:
+                    self.cache.set(id_str, model, generation)
+            return found
+        except Exception as e:
+            self.logger.error(f"Database error in get_many_by_ids: {e}")
+            raise DatabaseException(detail=f"Failed to fetch documents by IDs: {str(e)}")
+
     async def get_one_by_query(self, query: dict, projection: dict = None, dump_model: bool = True) -> Optional[TRead]:
         """
         Fetch a single document matching the query.
@@ -93,7 +439,7 @@ class BaseRepository(Generic[TCreate, TRead]):
             if not dump_model:
                 return doc
             try:
-                return self.read_model(**doc)
+                return self.read_model.model_validate(doc)
             except Exception as e:
                 self.logger.error(f"Error parsing document to {self.read_model}: {e}")
                 return None
@@ -149,18 +495,36 @@ class BaseRepository(Generic[TCreate, TRead]):
         try:
             if not ObjectId.is_valid(id_str) or not update_data:
                 return None
-            result = await self.collection.update_one(
-                {"_id": ObjectId(id_str)},
-                {"$set": update_data}
-            )
-            if not result.acknowledged:
-                self.logger.error(f"Update not acknowledged for id {id_str}")
-                return None
-            return await self.get_by_id(id_str)
+            return await self._find_one_and_update({"_id": ObjectId(id_str)}, {"$set": update_data})
         except Exception as e:
             self.logger.error(f"Database error in update: {e}")
             raise DatabaseException(detail=f"Failed to update document: {str(e)}")
 
+    async def bulk_write(self, requests: List[Any], ordered: bool = False) -> BulkWriteResult:
+        """
+        Send several write operations to the collection in a single round trip.
+
+        The write filters need not name the documents by _id, so the whole
+        `get_by_id` cache of the collection is dropped afterwards.
+
+        Args:
+            requests: pymongo write operations (UpdateOne, InsertOne, ...)
+            ordered: Stop at the first failing operation, and apply them in order
+
+        Returns:
+            BulkWriteResult: The counts of matched, modified and upserted documents
+
+        Raises:
+            DatabaseException: If there's an error writing the documents
+        """
+        try:
+            return await self.collection.bulk_write(requests, ordered=ordered)
+        except Exception as e:
+            self.logger.error(f"Database error in bulk_write: {e}")
+            raise DatabaseException(detail=f"Failed to write documents: {str(e)}")
+        finally:
+            await self._invalidate(None)
+
     async def delete(self, id_str: str) -> bool:
         """
         Delete a document by its ID.
@@ -178,6 +542,7 @@ class BaseRepository(Generic[TCreate, TRead]):
             if not ObjectId.is_valid(id_str):
                 return False
             result = await self.collection.delete_one({"_id": ObjectId(id_str)})
+            await self._invalidate(id_str)
             if result.deleted_count != 1:
                 self.logger.error(f"Delete not acknowledged for id {id_str}")
                 return False
@@ -219,17 +584,181 @@ class BaseRepository(Generic[TCreate, TRead]):
             if limit:
                 cursor = cursor.limit(limit)
             docs = await cursor.to_list(length=limit)
-            results: List[TRead] = []
-            for doc in docs:
-                try:
-                    results.append(self.read_model(**doc))
-                except Exception as e:
-                    self.logger.error(f"Error parsing document in list to {self.read_model}: {e}")
-            return results
+            return [model for model in self._to_models(docs) if model is not None]
         except Exception as e:
             self.logger.error(f"Database error in list: {e}")
             raise DatabaseException(detail=f"Failed to list documents: {str(e)}")
 
+    async def list_page(
+            self,
+            filter_: dict,
+            sort_field: str,
+            direction: int = DESCENDING,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[TRead], Optional[str]]:
+        """
+        List one page of documents ordered by a field, with keyset pagination.
+        
+        Documents are ordered by (sort_field, _id). Given a cursor, the page
+        starts right after the document the cursor points to, through an
+        index range rather than by scanning and discarding `skip` documents.
+        `skip` still works, with or without a cursor.
+        
+        Args:
+            filter_: MongoDB query dictionary
+            sort_field: The date field to order by
+            direction: ASCENDING or DESCENDING
+            skip: Number of documents to skip
+            limit: Maximum number of documents to return, 0 or None for all
+            cursor: The `next_cursor` of the previous page
+            
+        Returns:
+            Tuple[List[TRead], Optional[str]]: The documents, and the cursor of the next page (None on the last page)
+            
+        Raises:
+            ValidationException: If the cursor is malformed
+            DatabaseException: If there's an error listing documents
+        """
+        try:
+            if cursor:
+                filter_ = {"$and": [filter_, _after_cursor(sort_field, direction, cursor)]}
+            find = self.collection.find(filter_).sort([(sort_field, direction), ("_id", direction)])
+            if skip:
+                find = find.skip(skip)
+            if limit:
+                # One extra document tells whether there is a next page
+                find = find.limit(limit + 1)
+            docs = await find.to_list(length=limit + 1 if limit else None)
+            return self._page(docs, sort_field, limit)
+        except ValidationException:
+            raise
+        except Exception as e:
+            self.logger.error(f"Database error in list_page: {e}")
+            raise DatabaseException(detail=f"Failed to list documents: {str(e)}")
+
+    async def list_with_count(
+            self,
+            filter_: dict,
+            sort_field: str,
+            direction: int = DESCENDING,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None,
+            count_ttl: float = 0.0
+    ) -> Tuple[List[TRead], int, Optional[str]]:
+        """
+        List one page of documents, like `list_page`, along with the number of documents matching the filter.
+
+        The page is fetched by `list_page`, through an index range bounded by
+        the cursor and the limit, and the total by a separate
+        `count_documents` on the filter. With `count_ttl`, the count of a
+        filter is reused for that many seconds (it may then lag behind recent
+        writes) and the page alone is fetched.
+
+        Args:
+            filter_: MongoDB query dictionary
+            sort_field: The date field to order by
+            direction: ASCENDING or DESCENDING
+            skip: Number of documents to skip
+            limit: Maximum number of documents to return, at least 1
+            cursor: The `next_cursor` of the previous page
+            count_ttl: Seconds a count may be reused, 0 to always count
+
+        Returns:
+            Tuple[List[TRead], int, Optional[str]]: The documents, the total count, and the cursor of the next page
+
+        Raises:
+            ValidationException: If the limit is missing or the cursor is malformed
+            DatabaseException: If there's an error listing documents
+        """
+        if not limit or limit < 1:
+            raise ValidationException(detail="Limit must be at least 1")
+        items, next_cursor = await self.list_page(filter_, sort_field, direction, skip, limit, cursor)
+
+        count_key = repr(sorted(filter_.items(), key=lambda item: item[0]))
+        collection_key = getattr(self.collection, "full_name", None) or self.collection.name
+        counts = self._count_caches.setdefault(collection_key, OrderedDict())
+        cached = counts.get(count_key) if count_ttl > 0 else None
+        if cached is not None and cached[1] >= time.monotonic():
+            return items, cached[0], next_cursor
+        try:
+            total = await self.collection.count_documents(filter_)
+        except Exception as e:
+            self.logger.error(f"Database error in list_with_count: {e}")
+            raise DatabaseException(detail=f"Failed to count documents: {str(e)}")
+        if count_ttl > 0:
+            counts[count_key] = (total, time.monotonic() + count_ttl)
+            counts.move_to_end(count_key)
+            while len(counts) > self.COUNT_CACHE_SIZE:
+                counts.popitem(last=False)
+        return items, total, next_cursor
+
+    def _page(self, docs: List[dict], sort_field: str, limit: Optional[int]) -> Tuple[List[TRead], Optional[str]]:
+        """
+        Turn the documents fetched for a page, one more than the limit if there is a next page, into the page.
+
+        Args:
+            docs: The documents, in page order
+            sort_field: The field the documents are ordered by
+            limit: Maximum number of documents of the page
+
+        Returns:
+            Tuple[List[TRead], Optional[str]]: The documents as Pydantic models, and the cursor of the next page
+        """
+        next_cursor = None
+        if limit and len(docs) > limit:
+            docs = docs[:limit]
+            next_cursor = encode_cursor(docs[-1][sort_field], docs[-1]["_id"])
+        return [model for model in self._to_models(docs) if model is not None], next_cursor
+
+    async def stream(
+            self,
+            filter_: dict = None,
+            projection: dict = None,
+            batch_size: int = 100,
+            sort: List = None
+    ) -> AsyncIterator[List[TRead]]:
+        """
+        Iterate over the documents matching the filter, one batch at a time.
+        
+        Only one batch of documents is held in memory at once, however many
+        documents match, so this suits exports and analytics over whole
+        collections where `list` would materialize every document.
+        
+        Args:
+            filter_: MongoDB query dictionary
+            projection: Optional projection dictionary
+            batch_size: Number of documents fetched and yielded per batch
+            sort: Optional sort specification [field, direction]
+            
+        Yields:
+            List[TRead]: The next batch of documents as Pydantic models
+            
+        Raises:
+            DatabaseException: If there's an error reading documents
+        """
+        try:
+            cursor = self.collection.find(filter_ or {}, projection or {}, batch_size=batch_size)
+            if sort:
+                cursor = cursor.sort(sort[0], sort[1])
+            docs = []
+            async for doc in cursor:
+                docs.append(doc)
+                if len(docs) < batch_size:
+                    continue
+                models = [model for model in self._to_models(docs) if model is not None]
+                docs = []
+                if models:
+                    yield models
+            models = [model for model in self._to_models(docs) if model is not None]
+            if models:
+                yield models
+        except Exception as e:
+            self.logger.error(f"Database error in stream: {e}")
+            raise DatabaseException(detail=f"Failed to stream documents: {str(e)}")
+
     async def count(self, filter_: dict = None) -> int:
         """
         Count documents matching the filter.
@@ -0,0 +1,46 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from app.core.exceptions import ValidationException
+
+
+def encode_cursor(value: datetime, id_: ObjectId) -> str:
+    """
+    Encode the sort key of the last document of a page into an opaque cursor.
+
+    Args:
+        value: The value of the sort field
+        id_: The document's _id, breaking ties between equal sort values
+
+    Returns:
+        str: URL-safe cursor token
+    """
+    raw = json.dumps([value.isoformat(), str(id_)], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """
+    Decode a cursor produced by `encode_cursor`.
+
+    Args:
+        cursor: The cursor token
+
+    Returns:
+        Tuple[datetime, ObjectId]: The sort value and _id of the last document of the previous page
+
+    Raises:
+        ValidationException: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        value, id_str = json.loads(raw)
+        return datetime.fromisoformat(value), ObjectId(id_str)
+    except (binascii.Error, InvalidId, ValueError, TypeError) as e:
+        raise ValidationException(detail=f"Invalid cursor: {str(e)}")
@@ -1,14 +1,18 @@
 import logging
 from datetime import datetime, UTC
-from typing import Optional, List
+from typing import Optional, List, AsyncIterator, Tuple, Union
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
-from pymongo import DESCENDING
+from pymongo import ASCENDING, DESCENDING, IndexModel
 
-from app.core.exceptions import DatabaseException
+from app.core.config import settings
+from app.core.exceptions import DatabaseException, ValidationException
 from app.repositories.base import BaseRepository
-from app.schemas.game import GameDBInput, GameDBOutput, GameBase, BuyIn, GameStatusEnum
+from app.repositories.ledger_repository import LedgerRepository
+from app.schemas.game import GameDBInput, GameDBOutput, GameBase, BuyIn, CashOut, GameStatusEnum
+from app.schemas.ledger import LedgerEntryDBInput, LedgerEntryTypeEnum
+from app.schemas.py_object_id import canonical_id
 
 
 class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
@@ -26,6 +30,14 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         GameDBOutput: Pydantic model for game responses
     """
 
+    indexes = [
+        # Games of a player, newest first: listings, keyset pages, streams, counts and the stats pipelines
+        IndexModel([("players.user_id", ASCENDING), ("date", DESCENDING), ("_id", DESCENDING)]),
+        IndexModel([("table_id", ASCENDING)]),
+        # Ledger entries still pending on their game, for the reconciliation
+        IndexModel([("ledger_pending.recorded_at", ASCENDING)], sparse=True),
+    ]
+
     def __init__(self, db_client: AsyncIOMotorClient):
         """
         Initialize the game repository.
@@ -33,8 +45,15 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         Args:
             db_client: MongoDB client instance
         """
-        super().__init__(db_client.games, GameDBInput, GameDBOutput)
+        super().__init__(
+            db_client.games,
+            GameDBInput,
+            GameDBOutput,
+            cache_size=settings.REPOSITORY_CACHE_SIZE,
+            cache_ttl=settings.REPOSITORY_CACHE_TTL_SECONDS
+        )
         self.db_client = db_client
+        self.ledger = LedgerRepository(db_client)
         self.logger = logging.getLogger(self.__class__.__name__)
 
     async def create_game(self, game_data: GameBase, user_id: str) -> GameDBOutput:
@@ -81,19 +100,70 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         Raises:
             DatabaseException: If there's an error listing games
         """
+        games, _ = await self.page_for_player(player_id, table_id, status, skip, limit)
+        return games
+
+    async def page_for_player(
+            self,
+            player_id: str,
+            table_id: Optional[str] = None,
+            status: Optional[str] = None,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[GameDBOutput], Optional[str]]:
+        """
+        List a page of a player's games, newest first, optionally filtered by table_id and status.
+        
+        Args:
+            player_id: The ID of the player
+            table_id: Optional table ID to filter by
+            status: Optional game status to filter by
+            skip: Number of games to skip
+            limit: Maximum number of games to return
+            cursor: The `next_cursor` of the previous page, encoding its last (date, _id)
+            
+        Returns:
+            Tuple[List[GameDBOutput], Optional[str]]: The games, and the cursor of the next page
+            
+        Raises:
+            ValidationException: If the cursor is malformed
+            DatabaseException: If there's an error listing games
+        """
         try:
             if not ObjectId.is_valid(player_id):
-                return []
+                return [], None
 
-            list_filter = {"players.user_id": player_id}
+            list_filter = {"players.user_id": canonical_id(player_id)}
             if table_id and ObjectId.is_valid(table_id):
-                list_filter["table_id"] = str(table_id)
+                list_filter["table_id"] = canonical_id(table_id)
             if status:
                 list_filter["status"] = status
-            return await self.list(list_filter, skip=skip, limit=limit, sort=["date", DESCENDING])
+            return await self.list_page(list_filter, "date", DESCENDING, skip=skip, limit=limit, cursor=cursor)
+        except ValidationException:
+            raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to list games for player: {str(e)}")
 
+    async def stream_for_player(self, player_id: str, batch_size: int = 100) -> AsyncIterator[List[GameDBOutput]]:
+        """
+        Iterate over every game of a player, oldest first, one batch at a time.
+        
+        Args:
+            player_id: The ID of the player
+            batch_size: Number of games per batch
+            
+        Yields:
+            List[GameDBOutput]: The next batch of games
+            
+        Raises:
+            DatabaseException: If there's an error reading games
+        """
+        if not ObjectId.is_valid(player_id):
+            return
+        async for games in self.stream({"players.user_id": canonical_id(player_id)}, batch_size=batch_size, sort=["date", ASCENDING]):
+            yield games
+
     async def count_for_player(self, player_id: str) -> int:
         """
         Count games for a player.
@@ -110,7 +180,7 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         try:
             if not ObjectId.is_valid(player_id):
                 return 0
-            count_filter = {"players.user_id": player_id}
+            count_filter = {"players.user_id": canonical_id(player_id)}
             return await self.count(count_filter)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to count games for player: {str(e)}")
@@ -131,7 +201,7 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         try:
             if not ObjectId.is_valid(table_id):
                 return 0
-            count_filter = {"table_id": ObjectId(table_id)}
+            count_filter = {"table_id": canonical_id(table_id)}
             return await self.count(count_filter)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to count games for table: {str(e)}")
@@ -157,7 +227,7 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         try:
             if not ObjectId.is_valid(player_id):
                 return []
-            list_filter = {"players.user_id": player_id}
+            list_filter = {"players.user_id": canonical_id(player_id)}
             return await self.list(list_filter, sort=["date", DESCENDING], limit=limit)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to list recent games: {str(e)}")
@@ -185,23 +255,22 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         try:
             if not ObjectId.is_valid(game_id):
                 return None
-            result = await self.collection.update_one(
-                {"_id": ObjectId(game_id), "players.user_id": {"$ne": user_id}},
+            updated = await self._find_one_and_update(
+                {"_id": ObjectId(game_id), "players.user_id": {"$ne": canonical_id(user_id)}},
                 {"$push": {
                     "players": {
-                        "user_id": user_id,
+                        "user_id": canonical_id(user_id),
                         "username": username,
                         "buy_ins": [],
+                        "buy_in_total": 0,
                         "cash_out": 0,
                         "net_profit": 0,
                         "notable_hands": []
                     }
                 }}
             )
-            if not result.acknowledged:
-                self.logger.error(f"Failed to push player invite for game {game_id}, user {user_id}")
-                return None
-            return await self.get_by_id(game_id)
+            # Nothing matched when the player already joined, the game is then unchanged
+            return updated or await self.get_by_id(game_id)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to add player to game: {str(e)}")
 
@@ -226,103 +295,301 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
         try:
             if not ObjectId.is_valid(game_id):
                 return None
-            result = await self.collection.update_one(
+            return await self._find_one_and_update(
                 {"_id": ObjectId(game_id)},
-                {"$pull": {"players": {"user_id": user_id}}}
+                {"$pull": {"players": {"user_id": canonical_id(user_id)}}}
             )
-            if not result.acknowledged:
-                self.logger.error(f"Failed to pull player {user_id} from game {game_id}")
-                return None
-            return await self.get_by_id(game_id)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to remove player from game: {str(e)}")
 
-    async def push_player_buyin(
-            self,
-            game_id: str,
-            player_id: str,
-            buyin: BuyIn,
-            total_pot: float,
-            available_cash_out: float
-    ) -> Optional[GameDBOutput]:
+    async def update_at_ledger_seq(self, game_id: str, ledger_seq: int, update_data: dict) -> Optional[GameDBOutput]:
         """
-        Push a buy-in for player, and update total_pot, available_cash_out.
-        
+        Update fields of a game, provided no buy-in or cash-out was recorded on it since it was read.
+
+        Every buy-in and cash-out increments `ledger_seq`, so a write
+        computed from a game read at `ledger_seq` only applies while the
+        ledger totals are those it read. On a miss, the cached game is
+        dropped so that the caller reads the game again from the database.
+
+        Args:
+            game_id: The ID of the game
+            ledger_seq: The `ledger_seq` of the game the update was computed from
+            update_data: Dictionary of fields to set
+
+        Returns:
+            Optional[GameDBOutput]: The updated game, or None if the game does not exist or its ledger moved on
+
+        Raises:
+            DatabaseException: If there's an error updating the game
+        """
+        try:
+            if not ObjectId.is_valid(game_id):
+                return None
+            # Games stored before the ledger have no ledger_seq, which reads as 0
+            seq_filter = ledger_seq if ledger_seq else {"$in": [0, None]}
+            updated = await self._find_one_and_update(
+                {"_id": ObjectId(game_id), "ledger_seq": seq_filter},
+                {"$set": update_data}
+            )
+            if updated is None:
+                self.apply_invalidation(self.cache_key, game_id)
+            return updated
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to update game: {str(e)}")
+
+    async def push_player_buyin(self, game_id: str, player_id: str, buyin: BuyIn) -> Optional[GameDBOutput]:
+        """
+        Record a buy-in for a player: one entry appended to the ledger, and the totals of the game.
+
+        The game is updated first, in a single atomic update adding the
+        amount to total_pot, available_cash_out and the player's
+        buy_in_total, taking it off their net_profit and allocating the `seq`
+        of the ledger entry, so concurrent buy-ins on the same game are all
+        accounted for without reading the game first. Both writes have a
+        constant size, whatever the number of buy-ins of the game; see
+        `_update_player_totals` for how the ledger entry follows.
+
         Args:
             game_id: The ID of the game
             player_id: The ID of the player
             buyin: The buy-in details
-            total_pot: The current total pot
-            available_cash_out: The current available cash out
-            
+
         Returns:
-            Optional[GameDBOutput]: The updated game if successful, None otherwise
-            
+            Optional[GameDBOutput]: The updated game, or None if the game does not exist or the player is not in it
+
         Raises:
             DatabaseException: If there's an error adding the buy-in
         """
         try:
             if not ObjectId.is_valid(game_id):
                 return None
-            result = await self.collection.update_one(
-                {"_id": ObjectId(game_id), "players.user_id": player_id},
-                {
-                    "$push": {"players.$.buy_ins": buyin.model_dump()},
-                    "$set": {
-                        "total_pot": total_pot + buyin.amount,
-                        "available_cash_out": available_cash_out + buyin.amount
-                    }
-                }
+            return await self._update_player_totals(
+                game_id,
+                canonical_id(player_id),
+                {},
+                {"total_pot": buyin.amount, "available_cash_out": buyin.amount},
+                {"buy_in_total": buyin.amount, "net_profit": -buyin.amount},
+                LedgerEntryTypeEnum.BUY_IN,
+                buyin
             )
-            if not result.acknowledged:
-                self.logger.error(f"Failed to push buyin for player {player_id} in game {game_id}")
-                return None
-            return await self.get_by_id(game_id)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to add buy-in: {str(e)}")
 
-    async def set_player_cashout(
-            self,
-            game_id: str,
-            player_id: str,
-            cashout: float,
-            net_profit: float,
-            available_cash_out: float
-    ) -> Optional[GameDBOutput]:
+    async def set_player_cashout(self, game_id: str, player_id: str, cashout: CashOut) -> Optional[GameDBOutput]:
         """
-        Update player's cash_out, net_profit, available_cash_out, and updated_at.
-        
+        Record a cash-out for a player: one entry appended to the ledger, and the totals of the game.
+
+        The game is updated first, in a single atomic update: the filter only
+        matches while available_cash_out covers the amount, and the update
+        adds the amount to the player's cash_out and net_profit and allocates
+        the `seq` of the ledger entry, so concurrent cash-outs can never
+        overdraw the game.
+
         Args:
             game_id: The ID of the game
             player_id: The ID of the player
-            cashout: The cash out amount
-            net_profit: The net profit amount
-            available_cash_out: The current available cash out
-            
+            cashout: The cash-out details
+
         Returns:
-            Optional[GameDBOutput]: The updated game if successful, None otherwise
-            
+            Optional[GameDBOutput]: The updated game, or None if the game does not exist,
+            the player is not in it or available_cash_out does not cover the amount
+
         Raises:
             DatabaseException: If there's an error updating the cash out
         """
         try:
             if not ObjectId.is_valid(game_id):
                 return None
-            result = await self.collection.update_one(
-                {"_id": ObjectId(game_id), "players.user_id": player_id},
+            return await self._update_player_totals(
+                game_id,
+                canonical_id(player_id),
+                {"available_cash_out": {"$gte": cashout.amount}},
+                {"available_cash_out": -cashout.amount},
+                {"cash_out": cashout.amount, "net_profit": cashout.amount},
+                LedgerEntryTypeEnum.CASH_OUT,
+                cashout
+            )
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to update cash out: {str(e)}")
+
+    async def _update_player_totals(
+            self,
+            game_id: str,
+            player_id: str,
+            conditions: dict,
+            increments: dict,
+            player_increments: dict,
+            entry_type: LedgerEntryTypeEnum,
+            event: Union[BuyIn, CashOut]
+    ) -> Optional[GameDBOutput]:
+        """
+        Increment totals of a game and of one of its players, and append the event to the ledger.
+
+        The update is a pipeline: it increments `ledger_seq` to allocate the
+        `seq` of the ledger entry, then pushes the entry, stamped with that
+        `seq`, to the game's `ledger_pending` outbox, all in the same atomic
+        write, so the event can never be counted in the totals without being
+        recorded. The entry is then written to the ledger and pulled from the
+        outbox; if that fails, `reconcile_pending_ledger` writes it later.
+
+        Only players with a stored buy_in_total are matched, since the
+        increments keep net_profit equal to cash_out minus buy_in_total.
+        A player stored before buy_in_total existed is backfilled once, on
+        their first buy-in or cash-out, and the update retried.
+
+        Args:
+            game_id: The ID of the game
+            player_id: The canonical ID of the player
+            conditions: Further conditions on the game for the update to apply
+            increments: Amounts added to fields of the game, besides `ledger_seq`
+            player_increments: Amounts added to fields of the player
+            entry_type: The type of the ledger entry
+            event: The buy-in or cash-out
+
+        Returns:
+            Optional[GameDBOutput]: The updated game, or None if no game matched
+        """
+        now = datetime.now(UTC)
+        pending = {
+            "_id": ObjectId(),
+            "user_id": player_id,
+            "type": entry_type.value,
+            "amount": event.amount,
+            "time": event.time,
+            "recorded_at": now
+        }
+        filter_ = {
+            "_id": ObjectId(game_id),
+            "players": {"$elemMatch": {"user_id": player_id, "buy_in_total": {"$exists": True}}},
+            **conditions
+        }
+        player = {field: {"$add": [{"$ifNull": [f"$$player.{field}", 0]}, amount]} for field, amount in player_increments.items()}
+        update = [
+            {"$set": {
+                **{field: {"$add": [{"$ifNull": [f"${field}", 0]}, amount]} for field, amount in increments.items()},
+                "ledger_seq": {"$add": [{"$ifNull": ["$ledger_seq", 0]}, 1]},
+                "players": {"$map": {"input": "$players", "as": "player", "in": {"$cond": [
+                    {"$eq": ["$$player.user_id", player_id]},
+                    {"$mergeObjects": ["$$player", player]},
+                    "$$player"
+                ]}}},
+                "updated_at": now
+            }},
+            # This stage reads the ledger_seq the previous one allocated
+            {"$set": {"ledger_pending": {"$concatArrays": [
+                {"$ifNull": ["$ledger_pending", []]},
+                [{**{key: {"$literal": value} for key, value in pending.items()}, "seq": "$ledger_seq"}]
+            ]}}}
+        ]
+        game = await self._find_one_and_update(filter_, update)
+        if game is None and await self._backfill_buy_in_total(game_id, player_id):
+            game = await self._find_one_and_update(filter_, update)
+        if game is not None:
+            try:
+                await self._record_pending(game_id, {**pending, "seq": game.ledger_seq})
+            except Exception as e:
+                # The totals are right; the entry stays in the outbox for the reconciliation
+                self.logger.warning(f"Ledger entry {game.ledger_seq} of game {game_id} left pending: {e}")
+        return game
+
+    async def _backfill_buy_in_total(self, game_id: str, player_id: str) -> bool:
+        """
+        Store the buy_in_total of a player recorded before it existed, and their net_profit to match.
+
+        The player's position is pinned in the filter, along with the
+        absence of buy_in_total, so a concurrent backfill or player removal
+        leaves the game untouched.
+
+        Args:
+            game_id: The ID of the game
+            player_id: The canonical ID of the player
+
+        Returns:
+            bool: True if the player needed a backfill, False if the game or player is missing or up to date
+        """
+        doc = await self.collection.find_one({"_id": ObjectId(game_id)}, {"players": 1})
+        for i, player in enumerate((doc or {}).get("players", [])):
+            if player.get("user_id") != player_id or "buy_in_total" in player:
+                continue
+            buy_in_total = sum(buy_in["amount"] for buy_in in player.get("buy_ins") or [])
+            await self.collection.update_one(
+                {
+                    "_id": ObjectId(game_id),
+                    f"players.{i}.user_id": player_id,
+                    f"players.{i}.buy_in_total": {"$exists": False}
+                },
                 {"$set": {
-                    "players.$.cash_out": cashout,
-                    "players.$.net_profit": net_profit,
-                    "available_cash_out": available_cash_out - cashout,
-                    "updated_at": datetime.now(UTC)
+                    f"players.{i}.buy_in_total": buy_in_total,
+                    f"players.{i}.net_profit": player.get("cash_out", 0) - buy_in_total
                 }}
             )
-            if not result.acknowledged:
-                self.logger.error(f"Failed to set cashout for player {player_id} in game {game_id}")
-                return None
-            return await self.get_by_id(game_id)
+            await self._invalidate(game_id)
+            return True
+        return False
+
+    async def _record_pending(self, game_id: str, pending: dict) -> bool:
+        """
+        Write a pending entry of a game to the ledger under its `seq`, then pull it from the game's outbox.
+
+        Writing is idempotent, so the writer of the event and the
+        reconciliation may both record the same entry.
+
+        Args:
+            game_id: The ID of the game
+            pending: The entry, as pushed to `ledger_pending` with the `seq` the update of the game allocated
+
+        Returns:
+            bool: True if this call wrote the entry, False if it was already recorded
+        """
+        entry = LedgerEntryDBInput(
+            game_id=game_id, **{k: pending[k] for k in ("seq", "user_id", "type", "amount", "time")}
+        )
+        written = await self.ledger.record(entry, pending["_id"])
+        # The outbox is not part of the game model: cached games stay valid
+        await self.collection.update_one(
+            {"_id": ObjectId(game_id)},
+            {"$pull": {"ledger_pending": {"_id": pending["_id"]}}}
+        )
+        return written
+
+    async def reconcile_pending_ledger(self, older_than: datetime, limit: int = 100) -> int:
+        """
+        Write to the ledger the entries left pending on their game since before a given time.
+
+        Every entry carries the `seq` its update allocated, so it is written
+        under that `seq`, whatever happened to the entries around it. Entries
+        pushed after `older_than` are assumed to be in flight and left to
+        their writer. Entries their writer recorded but failed to pull are
+        only pulled.
+
+        Args:
+            older_than: Only entries recorded before this time are written
+            limit: Maximum number of games reconciled
+
+        Returns:
+            int: The number of entries written
+
+        Raises:
+            DatabaseException: If there's an error reconciling the ledger
+        """
+        try:
+            written = 0
+            cursor = self.collection.find(
+                {"ledger_pending.recorded_at": {"$lt": older_than}},
+                {"ledger_pending": 1}
+            ).limit(limit)
+            async for doc in cursor:
+                game_id = str(doc["_id"])
+                for entry in doc["ledger_pending"]:
+                    if entry["recorded_at"] >= older_than:
+                        continue
+                    if "seq" not in entry:
+                        self.logger.error(f"Pending ledger entry {entry['_id']} of game {game_id} has no seq")
+                        continue
+                    written += await self._record_pending(game_id, entry)
+            return written
         except Exception as e:
-            raise DatabaseException(detail=f"Failed to update cash out: {str(e)}")
+            raise DatabaseException(detail=f"Failed to reconcile ledger: {str(e)}")
 
     async def get_user_stats_rate(self, user_id: str) -> List[dict]:
         """
@@ -342,11 +609,11 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
                 return []
             pipeline_overall = [
                 {"$match": {
-                    "players.user_id": ObjectId(user_id),
+                    "players.user_id": canonical_id(user_id),
                     "status": GameStatusEnum.COMPLETED.value
                 }},
                 {"$unwind": "$players"},
-                {"$match": {"players.user_id": ObjectId(user_id)}},
+                {"$match": {"players.user_id": canonical_id(user_id)}},
                 {"$group": {
                     "_id": None,
                     "wins": {"$sum": {"$cond": [{"$gt": ["$players.net_profit", 0]}, 1, 0]}},
@@ -375,11 +642,11 @@ class GameRepository(BaseRepository[GameDBInput, GameDBOutput]):
                 return []
             pipeline_monthly = [
                 {"$match": {
-                    "players.user_id": ObjectId(user_id),
+                    "players.user_id": canonical_id(user_id),
                     "status": GameStatusEnum.COMPLETED.value
                 }},
                 {"$unwind": "$players"},
-                {"$match": {"players.user_id": ObjectId(user_id)}},
+                {"$match": {"players.user_id": canonical_id(user_id)}},
                 {"$group": {
                     "_id": {"$dateToString": {"format": "%Y-%m", "date": "$date"}},
                     "wins": {"$sum": {"$cond": [{"$gt": ["$players.net_profit", 0]}, 1, 0]}},
@@ -0,0 +1,104 @@
+import logging
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import DuplicateKeyError
+
+from app.core.exceptions import DatabaseException
+from app.repositories.base import BaseRepository
+from app.schemas.ledger import LedgerEntryDBInput, LedgerEntryDBOutput
+from app.schemas.py_object_id import canonical_id
+
+
+class LedgerRepository(BaseRepository[LedgerEntryDBInput, LedgerEntryDBOutput]):
+    """
+    Repository for the game_ledger collection.
+
+    The ledger is append-only: every buy-in and cash-out of a game is one
+    small document, numbered by `seq` in the order the game accepted it.
+    Entries are written from the outbox of their game (`ledger_pending`),
+    and only read for the history of a game, a page at a time.
+    The totals of a game (total_pot, available_cash_out, each player's
+    buy_in_total, cash_out and net_profit) are kept up to date on the game
+    document itself by the same write that allocates the `seq`.
+
+    Type Parameters:
+        LedgerEntryDBInput: Pydantic model for entry creation
+        LedgerEntryDBOutput: Pydantic model for entry responses
+    """
+
+    indexes = [
+        # Entries of a game in order; unique, so a sequence number is never used twice
+        IndexModel([("game_id", ASCENDING), ("seq", ASCENDING)], unique=True),
+    ]
+
+    def __init__(self, db_client: AsyncIOMotorClient):
+        """
+        Initialize the ledger repository.
+
+        Args:
+            db_client: MongoDB client instance
+        """
+        super().__init__(db_client.game_ledger, LedgerEntryDBInput, LedgerEntryDBOutput)
+        self.db_client = db_client
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def record(self, entry: LedgerEntryDBInput, pending_id: ObjectId) -> bool:
+        """
+        Write an entry unless its `seq` is already recorded for the game.
+
+        Args:
+            entry: The entry
+            pending_id: The `_id` of the entry in the outbox of its game
+
+        Returns:
+            bool: True if the entry was written, False if its `seq` was already recorded
+
+        Raises:
+            DatabaseException: If there's an error writing the entry
+        """
+        try:
+            result = await self.collection.update_one(
+                {"game_id": canonical_id(entry.game_id), "seq": entry.seq},
+                {"$setOnInsert": {**entry.model_dump(), "pending_id": pending_id}},
+                upsert=True
+            )
+            return result.upserted_id is not None
+        except DuplicateKeyError:
+            # A concurrent upsert of the same entry won
+            return False
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to record ledger entry: {str(e)}")
+
+    async def list_for_game(
+            self,
+            game_id: str,
+            after_seq: int = 0,
+            limit: int = 100
+    ) -> Tuple[List[LedgerEntryDBOutput], Optional[int]]:
+        """
+        Get a page of the entries of a game, in `seq` order.
+
+        Args:
+            game_id: The ID of the game
+            after_seq: The last sequence number of the previous page, 0 for the first page
+            limit: Maximum number of entries to return
+
+        Returns:
+            Tuple[List[LedgerEntryDBOutput], Optional[int]]: The entries, and the `after_seq` of the next page
+
+        Raises:
+            DatabaseException: If there's an error fetching the entries
+        """
+        try:
+            cursor = self.collection.find(
+                {"game_id": canonical_id(game_id), "seq": {"$gt": after_seq}}
+            ).sort("seq", ASCENDING).limit(limit + 1)
+            entries = [entry for entry in self._to_models(await cursor.to_list(length=limit + 1)) if entry]
+            if len(entries) > limit:
+                return entries[:limit], entries[limit - 1].seq
+            return entries, None
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to get ledger entries: {str(e)}")
@@ -1,12 +1,18 @@
 import logging
-from typing import Optional
+from typing import List, Optional
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel, UpdateOne
 
 from app.core.exceptions import DatabaseException
 from app.repositories.base import BaseRepository
-from app.schemas.statistics import StatisticsDBOutput, StatisticsBase, MonthlyStats, Stats
+from app.schemas.game import Duration, GameDBOutput
+from app.schemas.py_object_id import canonical_id
+from app.schemas.statistics import StatisticsDBOutput, StatisticsBase, MonthlyStats
+
+# Most recent games kept in a player's `settled_games`, enough to absorb a retried end of game
+SETTLED_GAMES_KEPT = 50
 
 
 class StatisticsRepository(BaseRepository[StatisticsBase, StatisticsDBOutput]):
@@ -22,6 +28,10 @@ class StatisticsRepository(BaseRepository[StatisticsBase, StatisticsDBOutput]):
         StatisticsDBOutput: Pydantic model for user responses
     """
 
+    indexes = [
+        IndexModel([("user_id", ASCENDING)], unique=True),
+    ]
+
     def __init__(self, db_client: AsyncIOMotorClient):
         """
         Initialize the user repository.
@@ -49,103 +59,97 @@ class StatisticsRepository(BaseRepository[StatisticsBase, StatisticsDBOutput]):
         try:
             if not ObjectId.is_valid(user_id):
                 return None
-            query = {"user_id": ObjectId(user_id)}
+            query = {"user_id": canonical_id(user_id)}
             return await self.get_one_by_query(query)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to get monthly stats: {str(e)}")
 
-    async def increment_user_stats(self, user_id: str, user_inc: Stats) -> Optional[StatisticsDBOutput]:
+    async def apply_game_results(self, game: GameDBOutput) -> int:
         """
-        Increment a user's statistics.
-
-        Args:
-            user_id: The ID of the user to update
-            user_inc: The statistics to increment
-
-        Returns:
-            Optional[UserDBOutput]: The updated user if successful, None otherwise
-
-        Raises:
-            DatabaseException: If there's an error updating the stats
-        """
-        try:
-            if not ObjectId.is_valid(user_id):
-                return None
-            inc_dict = {f"stats.{key}": value for key, value in user_inc.model_dump().items()}
-            result = await self.collection.update_one(
-                {"user_id": ObjectId(user_id)},
-                {"$inc": inc_dict}
-            )
-            if not result.acknowledged:
-                raise DatabaseException(detail="Failed to update user stats")
-            return await self.get_by_id(user_id)
-        except Exception as e:
-            raise DatabaseException(detail=f"Failed to update user stats: {str(e)}")
+        Add the results of a completed game to the statistics of its players.
 
-    async def upsert_monthly_stats(self, user_id: str, month: str, user_inc: MonthlyStats) -> Optional[
-        StatisticsDBOutput]:
-        """
-        Update or insert monthly statistics for a user.
+        Every player's overall and monthly increments go out in a single
+        unordered bulk write. Each update only matches while the game is
+        missing from the player's `settled_games`, and records it there, so
+        applying the same game again changes nothing. `settled_games` only
+        keeps the player's last SETTLED_GAMES_KEPT games, which bounds the
+        document while covering retries of a game just ended.
 
         Args:
-            user_id: The ID of the user
-            month: The month to update stats for
-            user_inc: The statistics to update
+            game: The completed game
 
         Returns:
-            Optional[UserDBOutput]: The updated user if successful, None otherwise
+            int: Number of players whose statistics were updated, 0 if the game was already applied
 
         Raises:
             DatabaseException: If there's an error updating the stats
         """
         try:
-            if not ObjectId.is_valid(user_id):
-                return None
-            user_query = {"user_id": ObjectId(user_id), "monthly_stats.month": month}
-            projection = {"monthly_stats.$": 1}
-            found = await self.collection.get_one_by_query(user_query, projection, dump_model=False)
-            if found and found.get("monthly_stats"):
-                update_fields = ["profit", "tables_played", "hours_played"]
-                inc_dict = {
-                    f"monthly_stats.$.{key}": getattr(user_inc, key)
-                    for key in update_fields
-                    if getattr(user_inc, key, None) is not None
-                }
-                if not inc_dict:
-                    return None
-                result = await self.collection.update_one(user_query, {"$inc": inc_dict})
-            else:
-                data = user_inc.model_dump()
-                result = await self.collection.update_one(
-                    {"user_id": ObjectId(user_id)},
-                    {"$push": {"monthly_stats": data}}
-                )
-            if not result.acknowledged:
-                raise DatabaseException(detail="Failed to update monthly stats")
-            return await self.get_by_id(user_id)
+            user_ids = [canonical_id(player.user_id) for player in game.players]
+            if not user_ids:
+                return 0
+            requests = self._game_results_requests(game)
+            result = await self.bulk_write(requests)
+            modified = result.modified_count
+            if result.matched_count < len(user_ids):
+                # Players without statistics yet, or for whom the game was already applied
+                created = await self.bulk_write([
+                    UpdateOne(
+                        {"user_id": user_id},
+                        {"$setOnInsert": StatisticsBase(user_id=user_id).model_dump(exclude={"user_id"})},
+                        upsert=True
+                    )
+                    for user_id in user_ids
+                ])
+                if created.upserted_count:
+                    modified += (await self.bulk_write(requests)).modified_count
+            return modified
         except Exception as e:
-            raise DatabaseException(detail=f"Failed to update monthly stats: {str(e)}")
+            raise DatabaseException(detail=f"Failed to apply game results: {str(e)}")
 
-    async def update_monthly_stats(self, user_id: str, month_str: str, month_win_rate: float) -> None:
+    @staticmethod
+    def _game_results_requests(game: GameDBOutput) -> List[UpdateOne]:
         """
-        Update a user's monthly win rate.
+        Build the updates adding a game's results to the statistics of its players.
+
+        Each player gets two updates, of which exactly one matches: one
+        increments the game's month when the player already has it, the
+        other appends the month.
 
         Args:
-            user_id: The ID of the user
-            month_str: The month to update
-            month_win_rate: The new win rate
+            game: The completed game
 
-        Raises:
-            DatabaseException: If there's an error updating the stats
+        Returns:
+            List[UpdateOne]: The updates, two per player
         """
-        try:
-            if not ObjectId.is_valid(user_id):
-                raise DatabaseException(detail="Invalid user ID")
-            result = await self.collection.update_one(
-                {"user_id": ObjectId(user_id), "monthly_stats.month": month_str},
-                {"$set": {"monthly_stats.$.win_rate": month_win_rate}}
-            )
-            if not result.acknowledged:
-                raise DatabaseException(detail="Failed to update monthly win rate")
-        except Exception as e:
-            raise DatabaseException(detail=f"Failed to update monthly win rate: {str(e)}")
+        game_id = canonical_id(game.id)
+        duration = game.duration or Duration()
+        hours_played = duration.hours + (duration.minutes / 60)
+        month = game.date.strftime("%b %Y")
+        requests = []
+        for player in game.players:
+            won = 1 if player.net_profit > 0 else 0
+            monthly = MonthlyStats(month=month, profit=player.net_profit, games_won=won, games_lost=1 - won,
+                                   tables_played=1, hours_played=hours_played)
+            stats_inc = {
+                "stats.total_profit": monthly.profit,
+                "stats.games_won": monthly.games_won,
+                "stats.games_lost": monthly.games_lost,
+                "stats.tables_played": monthly.tables_played,
+                "stats.hours_played": monthly.hours_played,
+            }
+            month_inc = {
+                f"monthly_stats.$.{key}": value
+                for key, value in monthly.model_dump(exclude={"month", "win_rate"}).items()
+            }
+            unsettled = {"user_id": canonical_id(player.user_id), "settled_games": {"$ne": game_id}}
+            settled = {"$each": [game_id], "$slice": -SETTLED_GAMES_KEPT}
+            requests.append(UpdateOne(
+                {**unsettled, "monthly_stats.month": month},
+                {"$inc": {**stats_inc, **month_inc}, "$push": {"settled_games": settled}}
+            ))
+            requests.append(UpdateOne(
+                {**unsettled, "monthly_stats.month": {"$ne": month}},
+                {"$inc": stats_inc, "$push": {"monthly_stats": monthly.model_dump(), "settled_games": settled}}
+            ))
+        return requests
@@ -1,13 +1,16 @@
 import logging
 from datetime import datetime, UTC
-from typing import Optional, List
+from typing import Optional, List, Tuple
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
 
-from app.core.exceptions import DatabaseException
+from app.core.config import settings
+from app.core.exceptions import DatabaseException, ValidationException
 from app.repositories.base import BaseRepository
 from app.schemas.game import GameStatusEnum
+from app.schemas.py_object_id import canonical_id
 from app.schemas.table import TableDBInput, TableDBOutput, PlayerStatusEnum, PlayerStatus, TableCountResponse
 
 
@@ -26,6 +29,12 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
         TableDBOutput: Pydantic model for table responses
     """
 
+    indexes = [
+        # Tables of a player in creation order, for the keyset pages of GET /tables and /tables/invited
+        IndexModel([("players.user_id", ASCENDING), ("created_at", ASCENDING), ("_id", ASCENDING)]),
+        IndexModel([("creator_id", ASCENDING), ("status", ASCENDING), ("created_at", ASCENDING)]),
+    ]
+
     def __init__(self, db_client: AsyncIOMotorClient):
         """
         Initialize the table repository.
@@ -33,7 +42,13 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
         Args:
             db_client: MongoDB client instance
         """
-        super().__init__(db_client.tables, TableDBInput, TableDBOutput)
+        super().__init__(
+            db_client.tables,
+            TableDBInput,
+            TableDBOutput,
+            cache_size=settings.REPOSITORY_CACHE_SIZE,
+            cache_ttl=settings.REPOSITORY_CACHE_TTL_SECONDS
+        )
         self.db_client = db_client
         self.logger = logging.getLogger(self.__class__.__name__)
 
@@ -59,13 +74,43 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
         Raises:
             DatabaseException: If there's an error listing tables
         """
+        tables, _ = await self.page_for_user(user_id, status, skip, limit)
+        return tables
+
+    async def page_for_user(
+            self,
+            user_id: str,
+            status: Optional[str] = None,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[TableDBOutput], Optional[str]]:
+        """
+        List a page of the tables where user is a player, in creation order. Optionally filter by status.
+        
+        Args:
+            user_id: The ID of the user
+            status: Optional table status to filter by
+            skip: Number of tables to skip
+            limit: Maximum number of tables to return
+            cursor: The `next_cursor` of the previous page, encoding its last (created_at, _id)
+            
+        Returns:
+            Tuple[List[TableDBOutput], Optional[str]]: The tables, and the cursor of the next page
+            
+        Raises:
+            ValidationException: If the cursor is malformed
+            DatabaseException: If there's an error listing tables
+        """
         try:
             if not ObjectId.is_valid(user_id):
-                return []
-            list_filter = {"players.user_id": user_id}
+                return [], None
+            list_filter = {"players.user_id": canonical_id(user_id)}
             if status:
                 list_filter["status"] = status
-            return await self.list(list_filter, skip=skip, limit=limit)
+            return await self.list_page(list_filter, "created_at", ASCENDING, skip=skip, limit=limit, cursor=cursor)
+        except ValidationException:
+            raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to list tables for user: {str(e)}")
 
@@ -74,32 +119,35 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
             user_id: str,
             status: Optional[str] = None,
             skip: int = 0,
-            limit: int = 100
+            limit: int = 100,
+            cursor: Optional[str] = None
     ) -> TableCountResponse:
         """
-        List tables where user is a player. Optionally filter by status.
+        List tables created by the user, in creation order. Optionally filter by status.
 
         Args:
             user_id: The ID of the user
             status: Optional table status to filter by
             skip: Number of tables to skip
             limit: Maximum number of tables to return
+            cursor: The `next_cursor` of the previous page
 
         Returns:
-            TableCountResponse: List and count of tables
+            TableCountResponse: List and count of tables, and the cursor of the next page
 
         Raises:
+            ValidationException: If the cursor is malformed
             DatabaseException: If there's an error listing tables
         """
         try:
             if not ObjectId.is_valid(user_id):
-                return []
-            list_filter = {"creator_id": user_id}
+                return TableCountResponse(tables=[], count=0)
+            list_filter = {"creator_id": canonical_id(user_id)}
             if status:
                 list_filter["status"] = status
-            tables = await self.list(list_filter, skip=skip, limit=limit)
-            count = await self.count(list_filter)
-            return TableCountResponse(tables=tables, count=count)
+            return await self._page_with_count(list_filter, skip, limit, cursor)
+        except ValidationException:
+            raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to list tables for user: {str(e)}")
 
@@ -108,35 +156,62 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
             user_id: str,
             status: Optional[str] = None,
             skip: int = 0,
-            limit: int = 100
+            limit: int = 100,
+            cursor: Optional[str] = None
     ) -> TableCountResponse:
         """
-        List tables where user is a player. Optionally filter by status.
+        List tables the user was invited to by someone else, in creation order. Optionally filter by status.
 
         Args:
             user_id: The ID of the user
             status: Optional table status to filter by
             skip: Number of tables to skip
             limit: Maximum number of tables to return
+            cursor: The `next_cursor` of the previous page
 
         Returns:
-            TableCountResponse: List and count of tables
+            TableCountResponse: List and count of tables, and the cursor of the next page
 
         Raises:
+            ValidationException: If the cursor is malformed
             DatabaseException: If there's an error listing tables
         """
         try:
             if not ObjectId.is_valid(user_id):
-                return []
-            list_filter = {"creator_id": {"$ne": user_id}, "players.user_id": user_id}
+                return TableCountResponse(tables=[], count=0)
+            list_filter = {"creator_id": {"$ne": canonical_id(user_id)}, "players.user_id": canonical_id(user_id)}
             if status:
                 list_filter["status"] = status
-            tables = await self.list(list_filter, skip=skip, limit=limit)
-            count = await self.count(list_filter)
-            return TableCountResponse(tables=tables, count=count)
+            return await self._page_with_count(list_filter, skip, limit, cursor)
+        except ValidationException:
+            raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to list tables for user: {str(e)}")
 
+    async def _page_with_count(
+            self,
+            list_filter: dict,
+            skip: int,
+            limit: int,
+            cursor: Optional[str]
+    ) -> TableCountResponse:
+        """
+        Fetch a page of tables in creation order along with the total number of matches.
+
+        Args:
+            list_filter: MongoDB query dictionary
+            skip: Number of tables to skip
+            limit: Maximum number of tables to return
+            cursor: The `next_cursor` of the previous page
+
+        Returns:
+            TableCountResponse: List and count of tables, and the cursor of the next page
+        """
+        tables, count, next_cursor = await self.list_with_count(
+            list_filter, "created_at", ASCENDING, skip=skip, limit=limit, cursor=cursor,
+            count_ttl=settings.TABLE_COUNT_CACHE_TTL_SECONDS
+        )
+        return TableCountResponse(tables=tables, count=count, next_cursor=next_cursor)
 
     async def invite_players(self, table_id: str, players: List[dict]) -> Optional[TableDBOutput]:
         """
@@ -160,7 +235,7 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
                 username=player.get("username"),
                 status=PlayerStatusEnum.INVITED
             ).model_dump() for player in players]
-            result = await self.collection.update_one(
+            return await self._find_one_and_update(
                 {"_id": ObjectId(table_id)},
                 {
                     "$push": {
@@ -173,10 +248,6 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
                     }
                 }
             )
-            if not result.acknowledged:
-                self.logger.error(f"Failed to invite players to table {table_id}")
-                return None
-            return await self.get_by_id(table_id)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to invite players: {str(e)}")
 
@@ -203,14 +274,10 @@ class TableRepository(BaseRepository[TableDBInput, TableDBOutput]):
         try:
             if not ObjectId.is_valid(table_id):
                 return None
-            result = await self.collection.update_one(
-                {"_id": ObjectId(table_id), "players.user_id": player_id},
+            return await self._find_one_and_update(
+                {"_id": ObjectId(table_id), "players.user_id": canonical_id(player_id)},
                 {"$set": {"players.$.status": status.value if hasattr(status, "value") else status}}
             )
-            if not result.acknowledged:
-                self.logger.error(f"Failed to update player status for table {table_id}, player {player_id}")
-                return None
-            return await self.get_by_id(table_id)
         except Exception as e:
             raise DatabaseException(detail=f"Failed to update player status: {str(e)}")
 
@@ -4,9 +4,11 @@ from typing import Optional, List
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
 
 from app.core.exceptions import DatabaseException
 from app.repositories.base import BaseRepository
+from app.schemas.py_object_id import canonical_id
 from app.schemas.user import UserDBInput, UserDBOutput, UserDBAuthOutput
 
 
@@ -25,6 +27,13 @@ class UserRepository(BaseRepository[UserDBInput, UserDBOutput]):
         UserDBOutput: Pydantic model for user responses
     """
 
+    indexes = [
+        IndexModel([("username", ASCENDING)], unique=True),
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Users who invited a given user as a friend
+        IndexModel([("friends", ASCENDING)]),
+    ]
+
     def __init__(self, db_client: AsyncIOMotorClient):
         """
         Initialize the user repository.
@@ -138,7 +147,7 @@ class UserRepository(BaseRepository[UserDBInput, UserDBOutput]):
         try:
             if not ObjectId.is_valid(user_id):
                 return []
-            list_filter = {"friends": user_id}
+            list_filter = {"friends": canonical_id(user_id)}
             list_projection = {"password_hash": 0}
             friends_list = await self.list(list_filter, list_projection)
             return friends_list
@@ -159,14 +168,13 @@ class UserRepository(BaseRepository[UserDBInput, UserDBOutput]):
         try:
             if not (ObjectId.is_valid(user_id) and ObjectId.is_valid(friend_id)):
                 raise DatabaseException(detail="Invalid user ID(s)")
-            uid = ObjectId(user_id)
-            fid = ObjectId(friend_id)
+            uid, fid = canonical_id(user_id), canonical_id(friend_id)
             result1 = await self.collection.update_one(
-                {"_id": uid, "friends": {"$ne": fid}},
+                {"_id": ObjectId(uid), "friends": {"$ne": fid}},
                 {"$push": {"friends": fid}}
             )
             result2 = await self.collection.update_one(
-                {"_id": fid, "friends": {"$ne": uid}},
+                {"_id": ObjectId(fid), "friends": {"$ne": uid}},
                 {"$push": {"friends": uid}}
             )
             if not (result1.acknowledged and result2.acknowledged):
@@ -188,10 +196,9 @@ class UserRepository(BaseRepository[UserDBInput, UserDBOutput]):
         try:
             if not (ObjectId.is_valid(user_id) and ObjectId.is_valid(friend_id)):
                 raise DatabaseException(detail="Invalid user ID(s)")
-            uid = ObjectId(user_id)
-            fid = ObjectId(friend_id)
-            result1 = await self.collection.update_one({"_id": uid}, {"$pull": {"friends": fid}})
-            result2 = await self.collection.update_one({"_id": fid}, {"$pull": {"friends": uid}})
+            uid, fid = canonical_id(user_id), canonical_id(friend_id)
+            result1 = await self.collection.update_one({"_id": ObjectId(uid)}, {"$pull": {"friends": fid}})
+            result2 = await self.collection.update_one({"_id": ObjectId(fid)}, {"$pull": {"friends": uid}})
             if not (result1.acknowledged and result2.acknowledged):
                 raise DatabaseException(detail="Failed to remove friend relationship")
         except Exception as e:
@@ -0,0 +1,23 @@
+from enum import Enum
+from typing import Dict
+
+from pydantic import BaseModel
+
+
+class StreamModeEnum(str, Enum):
+    FULL = "full"
+    PATCH = "patch"
+
+
+class StreamMetricsResponse(BaseModel):
+    subscribers: int
+    topics: int
+    published: int
+    coalesced: int
+    dropped: int
+    disconnected: int
+
+
+class ConnectionsResponse(BaseModel):
+    total: int
+    topics: Dict[str, int]
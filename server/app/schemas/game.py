@@ -3,7 +3,7 @@ from enum import Enum
 from typing import List, Optional
 
 from bson import ObjectId
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 from app.schemas.py_object_id import PyObjectId
 
@@ -35,10 +35,20 @@ class GamePlayer(BaseModel):
     user_id: PyObjectId
     username: str
     buy_ins: List[BuyIn] = []
+    buy_in_total: float = 0
     cash_out: float = 0
     net_profit: float = 0
     notable_hands: List[NotableHand] = []
 
+    @model_validator(mode="before")
+    @classmethod
+    def derive_buy_in_total(cls, data):
+        # Players stored before the ledger only have their embedded buy-ins
+        if isinstance(data, dict) and "buy_in_total" not in data:
+            buy_ins = data.get("buy_ins") or []
+            data = {**data, "buy_in_total": sum(b["amount"] if isinstance(b, dict) else b.amount for b in buy_ins)}
+        return data
+
 
 class Duration(BaseModel):
     hours: int = 0
@@ -63,9 +73,10 @@ class GameUpdate(BaseModel):
 
 class GameDBInput(GameBase):
     duration: Duration = Duration()
-    creator_id: str
+    creator_id: PyObjectId
     total_pot: float = 0
     available_cash_out: float = 0
+    ledger_seq: int = 0
     created_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(UTC))
 
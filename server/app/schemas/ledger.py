@@ -0,0 +1,31 @@
+from datetime import datetime, UTC
+from enum import Enum
+
+from bson import ObjectId
+from pydantic import BaseModel, Field
+
+from app.schemas.py_object_id import PyObjectId
+
+
+class LedgerEntryTypeEnum(str, Enum):
+    BUY_IN = "buy_in"
+    CASH_OUT = "cash_out"
+
+
+class LedgerEntryDBInput(BaseModel):
+    game_id: PyObjectId
+    seq: int
+    user_id: PyObjectId
+    type: LedgerEntryTypeEnum
+    amount: float
+    time: datetime = Field(default_factory=lambda: datetime.now(UTC))
+
+
+class LedgerEntryDBOutput(LedgerEntryDBInput):
+    id: PyObjectId = Field(default_factory=PyObjectId, alias="_id")
+
+    model_config = {
+        "populate_by_name": True,
+        "arbitrary_types_allowed": True,
+        "json_encoders": {ObjectId: str}
+    }
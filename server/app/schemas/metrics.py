@@ -0,0 +1,38 @@
+from pydantic import BaseModel
+
+
+class CacheStatsResponse(BaseModel):
+    size: int
+    max_size: int
+    ttl: float
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+
+
+class PoolStatsResponse(BaseModel):
+    connections: int
+    checked_out: int
+    waiting: int
+    max_checked_out: int
+    max_waiting: int
+    checkouts: int
+    failed_checkouts: int
+    cleared: int
+    checkout_ms_p50: float
+    checkout_ms_p99: float
+    checkout_ms_max: float
+
+
+class QueryStatsResponse(BaseModel):
+    requests: int
+    commands: int
+    commands_per_request: float
+    max_commands: int
+    db_ms: float
+    db_ms_per_request: float
+    slowest_ms: float
+    slowest_command: str
+    slowest_collection: str
+    slowest_shape: str
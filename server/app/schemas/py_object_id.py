@@ -1,16 +1,38 @@
+import re
+
 from bson import ObjectId
 from pydantic_core import core_schema, PydanticCustomError
 
+# Same strings ObjectId.is_valid accepts, without building an ObjectId per check
+OBJECT_ID_PATTERN = re.compile(r"[0-9a-fA-F]{24}")
+
+
+def canonical_id(value) -> str:
+    """
+    Get the stored form of a reference to another document.
+
+    A document's own `_id` is an ObjectId, but every field referring to
+    another document (user_id, table_id, creator_id, friends...) stores its
+    `_id` as a lowercase hex string, the form `str(ObjectId)` produces.
+
+    Args:
+        value: An ObjectId, or its hex string in any case
+
+    Returns:
+        str: The canonical string ID
+    """
+    return str(value).lower()
+
 
 class PyObjectId(ObjectId):
     @classmethod
     def __get_pydantic_core_schema__(cls, source_type, handler):
         # Validate input, then produce a string
         def validate_to_str(v):
+            if isinstance(v, str) and OBJECT_ID_PATTERN.fullmatch(v):
+                return v.lower()
             if isinstance(v, ObjectId):
                 return str(v)
-            if isinstance(v, str) and ObjectId.is_valid(v):
-                return v
             raise PydanticCustomError("value_error", "Invalid ObjectId")
 
         # After validation, the field’s Python type is str; so schema is str
@@ -87,3 +87,4 @@ class TableDBOutput(TableDBInput):
 class TableCountResponse(BaseModel):
     tables: List[TableDBOutput]
     count: int
+    next_cursor: Optional[str] = None
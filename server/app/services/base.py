@@ -1,5 +1,5 @@
 import logging
-from typing import Generic, TypeVar, Optional, List
+from typing import Generic, TypeVar, Optional, List, Dict
 
 from pydantic import BaseModel
 
@@ -25,6 +25,9 @@ class BaseService(Generic[TCreate, TRead]):
     async def get_by_id(self, id_str: str) -> Optional[TRead]:
         return await self.repository.get_by_id(id_str)
 
+    async def get_many_by_ids(self, id_strs: List[str]) -> Dict[str, TRead]:
+        return await self.repository.get_many_by_ids(id_strs)
+
     async def list(
             self,
             filter_: dict = None,
@@ -0,0 +1,333 @@
+import asyncio
+import fcntl
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable, Optional, Set
+
+from pydantic_core import to_jsonable_python
+
+from app.core.config import settings
+
+# Called with (topic, data, event) for every message published by any worker
+MessageHandler = Callable[[str, Any, Optional[str]], Awaitable[None]]
+
+
+def dump_model(data: Any) -> Any:
+    """
+    Dump a message payload to JSON-compatible values, the same on every backend.
+
+    Pydantic models become dictionaries, datetimes ISO 8601 strings and
+    other values unknown to JSON (ObjectIds...) strings, so subscribers see
+    the same types whether a message was relayed or delivered in-process.
+
+    Args:
+        data: A Pydantic model or an already dumped value
+
+    Returns:
+        Any: The dumped value
+    """
+    return to_jsonable_python(data, by_alias=True, fallback=str)
+
+
+class BroadcastBackend(ABC):
+    """
+    Interface for propagating published SSE messages to every worker.
+
+    A backend receives messages from `publish` and hands each of them, in
+    the same order on every worker, to the handler registered in `start`.
+
+    Attributes:
+        is_hub: Whether this worker runs the background tasks one worker is enough for
+    """
+
+    is_hub = True
+
+    @abstractmethod
+    async def start(self, on_message: MessageHandler) -> None:
+        """
+        Start delivering messages to a handler.
+
+        Args:
+            on_message: Coroutine called for every published message
+        """
+
+    @abstractmethod
+    async def publish(self, topic: str, data: Any, event: Optional[str] = None) -> None:
+        """
+        Publish a message to every worker.
+
+        Args:
+            topic: The topic of the message
+            data: A state (model or dictionary) or a notification payload
+            event: SSE event name for notifications, None for state updates
+        """
+
+    async def stop(self) -> None:
+        """
+        Stop the backend and release its resources.
+        """
+
+
+class InProcessBackend(BroadcastBackend):
+    """
+    Backend delivering messages within the current process only.
+
+    Messages are handed over as-is, so models are never dumped for topics
+    nobody watches. Every worker is its own hub, since it knows of no other.
+    """
+
+    def __init__(self):
+        """
+        Initialize the in-process backend.
+        """
+        self.on_message: Optional[MessageHandler] = None
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self.on_message = on_message
+
+    async def publish(self, topic: str, data: Any, event: Optional[str] = None) -> None:
+        if self.on_message:
+            await self.on_message(topic, data, event)
+
+
+class UnixSocketRelayBackend(BroadcastBackend):
+    """
+    Backend relaying messages between the workers of one host over a Unix-domain socket.
+
+    The worker holding an exclusive lock on `<socket_path>.lock` serves the
+    socket and acts as the hub; every other worker connects to it. Messages
+    are newline-delimited JSON. The hub re-broadcasts every message to all
+    workers, itself and the sender included, so all workers see the same
+    order. When the hub exits, its lock is released and the remaining workers
+    elect a new one. A worker that stops reading holds back the hub for at
+    most PEER_DRAIN_TIMEOUT seconds once PEER_BUFFER_LIMIT bytes are queued
+    for it, and is then disconnected, so the hub's buffers stay bounded.
+
+    Attributes:
+        socket_path: Path of the relay socket
+        is_hub: Whether this worker currently serves the socket
+    """
+
+    RECONNECT_DELAY = 0.2
+    PEER_BUFFER_LIMIT = 64 * 1024
+    PEER_DRAIN_TIMEOUT = 5.0
+
+    def __init__(self, socket_path: str):
+        """
+        Initialize the relay backend.
+
+        Args:
+            socket_path: Path of the relay socket
+        """
+        self.socket_path = socket_path
+        self.is_hub = False
+        self.on_message: Optional[MessageHandler] = None
+
+        self._lock_file = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._hub_writer: Optional[asyncio.StreamWriter] = None
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    async def start(self, on_message: MessageHandler) -> None:
+        self.on_message = on_message
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=5)
+        except asyncio.TimeoutError:
+            self.logger.error(f"Could not join SSE relay at {self.socket_path}")
+
+    async def publish(self, topic: str, data: Any, event: Optional[str] = None) -> None:
+        line = self._encode(topic, data, event)
+        if self.is_hub:
+            await self._broadcast(line)
+        elif self._hub_writer is not None:
+            try:
+                self._hub_writer.write(line)
+                await self._hub_writer.drain()
+            except (ConnectionError, RuntimeError) as e:
+                self.logger.warning(f"Dropped SSE message for {topic}, relay unavailable: {e}")
+        else:
+            self.logger.warning(f"Dropped SSE message for {topic}, relay unavailable")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        for writer in list(self._peers):
+            writer.close()
+        if self._hub_writer is not None:
+            self._hub_writer.close()
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.socket_path):
+                os.unlink(self.socket_path)
+        if self._lock_file is not None:
+            self._lock_file.close()
+
+    async def _run(self) -> None:
+        """
+        Keep this worker attached to the relay, as hub or as client.
+        """
+        while True:
+            try:
+                if self._acquire_hub_lock():
+                    await self._serve()
+                    return
+                await self._follow()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.logger.warning(f"SSE relay connection lost: {e}")
+            self._connected.clear()
+            await asyncio.sleep(self.RECONNECT_DELAY)
+
+    def _acquire_hub_lock(self) -> bool:
+        """
+        Try to become the hub.
+
+        Returns:
+            bool: True if this worker now holds the hub lock
+        """
+        lock_file = open(f"{self.socket_path}.lock", "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file = lock_file
+        return True
+
+    async def _serve(self) -> None:
+        """
+        Serve the relay socket as hub.
+        """
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+        self._server = await asyncio.start_unix_server(self._handle_peer, path=self.socket_path)
+        self.is_hub = True
+        self._connected.set()
+        self.logger.info(f"Serving SSE relay at {self.socket_path}")
+
+    async def _follow(self) -> None:
+        """
+        Connect to the hub and deliver every message it relays, until the connection drops.
+        """
+        reader, writer = await asyncio.open_unix_connection(self.socket_path)
+        try:
+            # Wait for the hub to register this worker, so no message is missed
+            if not await reader.readline():
+                return
+            self._hub_writer = writer
+            self._connected.set()
+            while line := await reader.readline():
+                await self._deliver(line)
+        finally:
+            self._hub_writer = None
+            writer.close()
+
+    async def _handle_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Relay every message a worker sends to all workers.
+
+        Args:
+            reader: Stream reading from the worker
+            writer: Stream writing to the worker
+        """
+        self._peers.add(writer)
+        try:
+            writer.write(b"\n")
+            while line := await reader.readline():
+                await self._broadcast(line)
+        except (ConnectionError, asyncio.CancelledError):
+            # Cancelled on shutdown; the stream callback would log it as an error
+            pass
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    async def _broadcast(self, line: bytes) -> None:
+        """
+        Send a message to every connected worker and deliver it locally.
+
+        Args:
+            line: The encoded message
+        """
+        stalled = []
+        for writer in list(self._peers):
+            try:
+                writer.write(line)
+            except (ConnectionError, RuntimeError):
+                self._peers.discard(writer)
+                continue
+            if writer.transport.get_write_buffer_size() > self.PEER_BUFFER_LIMIT:
+                stalled.append(writer)
+        if stalled:
+            # Holds back the sender until the slow workers catch up, or are dropped
+            await asyncio.gather(*(self._drain_peer(writer) for writer in stalled))
+        await self._deliver(line)
+
+    async def _drain_peer(self, writer: asyncio.StreamWriter) -> None:
+        """
+        Wait for a worker to read the messages buffered for it, disconnecting it if it does not in time.
+
+        A disconnected worker reconnects on its own; the messages relayed
+        in the meantime do not reach it.
+
+        Args:
+            writer: Stream writing to the worker
+        """
+        try:
+            await asyncio.wait_for(writer.drain(), timeout=self.PEER_DRAIN_TIMEOUT)
+        except (asyncio.TimeoutError, ConnectionError, RuntimeError):
+            self.logger.warning(
+                f"Disconnecting SSE relay peer holding {writer.transport.get_write_buffer_size()} unread bytes"
+            )
+            self._peers.discard(writer)
+            writer.transport.abort()
+
+    async def _deliver(self, line: bytes) -> None:
+        """
+        Decode a relayed message and hand it to the handler.
+
+        Args:
+            line: The encoded message
+        """
+        try:
+            message = json.loads(line)
+            await self.on_message(message["topic"], message["data"], message.get("event"))
+        except Exception as e:
+            self.logger.error(f"Error delivering relayed SSE message: {e}")
+
+    @staticmethod
+    def _encode(topic: str, data: Any, event: Optional[str]) -> bytes:
+        """
+        Encode a message as a relay line.
+
+        Args:
+            topic: The topic of the message
+            data: The message payload
+            event: SSE event name for notifications, None for state updates
+
+        Returns:
+            bytes: The newline-terminated JSON message
+        """
+        message = {"topic": topic, "event": event, "data": dump_model(data)}
+        return json.dumps(message).encode() + b"\n"
+
+
+def create_broadcast_backend() -> BroadcastBackend:
+    """
+    Build the broadcast backend selected by SSE_BROADCAST_BACKEND.
+
+    Returns:
+        BroadcastBackend: "memory" for a single worker, "unix" to relay between workers
+    """
+    if settings.SSE_BROADCAST_BACKEND == "unix":
+        return UnixSocketRelayBackend(settings.SSE_BROADCAST_SOCKET)
+    return InProcessBackend()
@@ -1,9 +1,10 @@
 import logging
-from datetime import datetime, UTC
-from typing import Optional, List
+from datetime import datetime, timedelta, UTC
+from typing import Optional, List, AsyncIterator, Tuple
 
 from bson import ObjectId
 
+from app.core.config import settings
 from app.core.exceptions import (
     DatabaseException,
     NotFoundException,
@@ -14,10 +15,16 @@ from app.schemas.game import (
     GameBase, GameDBInput, GameDBOutput, GameUpdate,
     BuyIn, CashOut, GameStatusEnum, Duration
 )
+from app.schemas.ledger import LedgerEntryDBOutput
 from app.schemas.table import PlayerStatusEnum
 from app.schemas.user import UserResponse
 from app.services.base import BaseService
 
+# Fields of a player kept by the writes of the ledger
+PLAYER_LEDGER_FIELDS = {"buy_ins", "buy_in_total", "cash_out", "net_profit"}
+# Reads and conditional writes of a game update before giving up on a game whose ledger keeps moving
+UPDATE_GAME_ATTEMPTS = 5
+
 
 class GameService(BaseService[GameDBInput, GameDBOutput]):
     """
@@ -65,6 +72,47 @@ class GameService(BaseService[GameDBInput, GameDBOutput]):
             self.logger.error(f"Error creating game: {e}")
             raise DatabaseException(detail="Game creation failed")
 
+    async def get_ledger(
+            self,
+            game_id: str,
+            after_seq: int = 0,
+            limit: int = 100
+    ) -> Tuple[List[LedgerEntryDBOutput], Optional[int]]:
+        """
+        Get a page of the buy-ins and cash-outs of a game, in the order they were recorded.
+
+        Args:
+            game_id: The ID of the game
+            after_seq: The `seq` of the last entry of the previous page, 0 for the first page
+            limit: Maximum number of entries to return
+
+        Returns:
+            Tuple[List[LedgerEntryDBOutput], Optional[int]]: The entries, and the `after_seq` of the next page
+
+        Raises:
+            DatabaseException: If there's an error fetching the entries
+        """
+        try:
+            return await self.repository.ledger.list_for_game(game_id, after_seq, limit)
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to get game ledger: {str(e)}")
+
+    async def reconcile_ledger(self) -> int:
+        """
+        Write to the ledger the buy-ins and cash-outs left pending on their game past the grace period.
+
+        Returns:
+            int: The number of entries written
+
+        Raises:
+            DatabaseException: If there's an error reconciling the ledger
+        """
+        older_than = datetime.now(UTC) - timedelta(seconds=settings.LEDGER_PENDING_GRACE_SECONDS)
+        written = await self.repository.reconcile_pending_ledger(older_than)
+        if written:
+            self.logger.warning(f"Recorded {written} pending ledger entries")
+        return written
+
     async def get_games_for_player(
             self,
             current_user: UserResponse,
@@ -100,6 +148,68 @@ class GameService(BaseService[GameDBInput, GameDBOutput]):
         except Exception as e:
             raise DatabaseException(detail=f"Failed to get games for player: {str(e)}")
 
+    async def get_games_page_for_player(
+            self,
+            current_user: UserResponse,
+            table_id: Optional[str] = None,
+            game_status: Optional[str] = None,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[GameDBOutput], Optional[str]]:
+        """
+        Get a page of a player's games, newest first, with optional filtering.
+        
+        Args:
+            current_user: The user to get games for
+            table_id: Optional table ID to filter by
+            game_status: Optional game status to filter by
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            cursor: The `next_cursor` of the previous page
+            
+        Returns:
+            Tuple[List[GameDBOutput], Optional[str]]: The games, and the cursor of the next page
+            
+        Raises:
+            ValidationException: If the cursor is malformed
+            DatabaseException: If there's an error fetching games
+        """
+        try:
+            return await self.repository.page_for_player(
+                str(current_user.id),
+                table_id=table_id,
+                status=game_status,
+                skip=skip,
+                limit=limit,
+                cursor=cursor
+            )
+        except ValidationException:
+            raise
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to get games for player: {str(e)}")
+
+    async def stream_games_for_player(
+            self,
+            current_user: UserResponse,
+            batch_size: int = 100
+    ) -> AsyncIterator[List[GameDBOutput]]:
+        """
+        Iterate over every game of a player, oldest first, one batch at a time.
+        
+        Args:
+            current_user: The user to get games for
+            batch_size: Number of games per batch
+            
+        Yields:
+            List[GameDBOutput]: The next batch of games
+            
+        Raises:
+            DatabaseException: If there's an error reading games
+        """
+        async for games in self.repository.stream_for_player(str(current_user.id), batch_size):
+            yield games
+
     async def count_games_for_player(self, current_user: UserResponse) -> int:
         """
         Count total games for a player.
@@ -188,25 +298,9 @@ class GameService(BaseService[GameDBInput, GameDBOutput]):
             DatabaseException: If there's an error updating the buy-in
         """
         try:
-            game = await self.get_by_id(game_id)
-            if not game:
-                raise NotFoundException(detail="Game not found")
-
-            player_entries = [p for p in game.players if str(p.user_id) == str(current_user.id)]
-            if not player_entries:
-                raise NotFoundException(detail="Player not in game")
-
-            current_pot = game.total_pot
-            current_available = game.available_cash_out
-            updated = await self.repository.push_player_buyin(
-                game_id,
-                str(current_user.id),
-                buyin,
-                current_pot,
-                current_available
-            )
-
+            updated = await self.repository.push_player_buyin(game_id, str(current_user.id), buyin)
             if not updated:
+                await self._raise_not_in_game(game_id, current_user)
                 raise DatabaseException(detail="Failed to update buy-in")
             return updated
         except NotFoundException:
@@ -232,39 +326,34 @@ class GameService(BaseService[GameDBInput, GameDBOutput]):
             DatabaseException: If there's an error updating the cash-out
         """
         try:
-            game = await self.get_by_id(game_id)
-            if not game:
-                raise NotFoundException(detail="Game not found")
-
-            player_entries = [p for p in game.players if str(p.user_id) == str(current_user.id)]
-            if not player_entries:
-                raise NotFoundException(detail="Player not in game")
-
-            current_available = game.available_cash_out
-            if cashout.amount > current_available:
-                raise ValidationException(detail="Invalid cash out amount")
-
-            player = player_entries[0]
-            total_buyins = sum(b.amount for b in player.buy_ins)
-            new_cashout = cashout.amount + player.cash_out
-            net_profit = cashout.amount - total_buyins
-
-            updated = await self.repository.set_player_cashout(
-                game_id,
-                str(current_user.id),
-                new_cashout,
-                net_profit,
-                current_available
-            )
-
+            updated = await self.repository.set_player_cashout(game_id, str(current_user.id), cashout)
             if not updated:
-                raise DatabaseException(detail="Failed to update cash out")
+                await self._raise_not_in_game(game_id, current_user)
+                # The game and the player exist: available_cash_out does not cover the amount
+                raise ValidationException(detail="Invalid cash out amount")
             return updated
         except (NotFoundException, ValidationException):
             raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to update cash out: {str(e)}")
 
+    async def _raise_not_in_game(self, game_id: str, current_user: UserResponse) -> None:
+        """
+        Explain why an update of a player of a game matched nothing, when it is the game or the player.
+
+        Args:
+            game_id: The ID of the game
+            current_user: The player
+
+        Raises:
+            NotFoundException: If game not found or player not in game
+        """
+        game = await self.get_by_id(game_id)
+        if not game:
+            raise NotFoundException(detail="Game not found")
+        if not any(str(p.user_id) == str(current_user.id) for p in game.players):
+            raise NotFoundException(detail="Player not in game")
+
     async def update_game(
             self,
             game_id: str,
@@ -272,6 +361,11 @@ class GameService(BaseService[GameDBInput, GameDBOutput]):
     ) -> Optional[GameDBOutput]:
         """
         Update game fields and handle completion logic.
+
+        Players keep the buy-ins and cash-outs stored on the game. The write
+        only applies while the game's `ledger_seq` is the one read, so a
+        buy-in or cash-out recorded in between is never overwritten: the
+        game is read again and the update retried.
         
         Args:
             game_id: The ID of the game
@@ -285,21 +379,29 @@ class GameService(BaseService[GameDBInput, GameDBOutput]):
             DatabaseException: If there's an error updating the game
         """
         try:
-            game = await self.get_by_id(game_id)
-            if not game:
-                raise NotFoundException(detail="Game not found")
-
-            update_data = {k: v for k, v in game_update.model_dump(exclude_unset=True).items() if v is not None}
-            if not update_data:
-                return None
-
-            update_data["updated_at"] = datetime.now(UTC)
-            updated = await self.update(game_id, update_data)
-
-            if not updated:
-                raise DatabaseException(detail="Failed to update game")
-            return updated
-        except NotFoundException:
+            for attempt in range(UPDATE_GAME_ATTEMPTS):
+                game = await self.get_by_id(game_id)
+                if not game:
+                    raise NotFoundException(detail="Game not found")
+
+                update_data = {k: v for k, v in game_update.model_dump(exclude_unset=True).items() if v is not None}
+                if not update_data:
+                    return None
+                if "players" in update_data:
+                    # Buy-ins and cash-outs only change through the ledger: players keep their stored accounting
+                    stored = {str(p.user_id): p.model_dump(include=PLAYER_LEDGER_FIELDS) for p in game.players}
+                    for player in update_data["players"]:
+                        player.update(stored.get(player["user_id"]) or {
+                            "buy_ins": [], "buy_in_total": 0, "cash_out": 0, "net_profit": 0
+                        })
+
+                update_data["updated_at"] = datetime.now(UTC)
+                updated = await self.repository.update_at_ledger_seq(game_id, game.ledger_seq, update_data)
+                if updated:
+                    return updated
+                self.logger.info(f"Ledger of game {game_id} moved on during update, attempt {attempt + 1}")
+            raise DatabaseException(detail="Failed to update game: buy-ins and cash-outs kept changing it")
+        except (NotFoundException, DatabaseException):
             raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to update game: {str(e)}")
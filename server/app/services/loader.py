@@ -0,0 +1,95 @@
+import asyncio
+import logging
+from typing import Dict, Generic, List, Optional, Set, TypeVar
+
+from pydantic import BaseModel
+
+from app.services.base import BaseService
+
+TRead = TypeVar("TRead", bound=BaseModel)
+
+
+class EntityLoader(Generic[TRead]):
+    """
+    Request-scoped batching loader for documents fetched by ID.
+
+    Every `load` made in the same event-loop tick is collected and fetched
+    with a single `get_many_by_ids` query, so code awaiting lookups for many
+    IDs concurrently (e.g. under `asyncio.gather`) costs one round trip
+    instead of one per ID. Results are memoized for the lifetime of the
+    loader, which should therefore not outlive a request.
+
+    Type Parameters:
+        TRead: Pydantic model class of the loaded documents
+    """
+
+    def __init__(self, service: BaseService):
+        """
+        Initialize the loader.
+
+        Args:
+            service: The service whose documents are loaded
+        """
+        self.service = service
+        self._loaded: Dict[str, asyncio.Future] = {}
+        self._queue: List[str] = []
+        self._fetches: Set[asyncio.Task] = set()
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def load(self, id_str: str) -> "asyncio.Future[Optional[TRead]]":
+        """
+        Schedule a document to be fetched with the other loads of this tick.
+
+        Args:
+            id_str: The string representation of the document's _id
+
+        Returns:
+            asyncio.Future[Optional[TRead]]: Resolves to the document, or None if not found
+        """
+        future = self._loaded.get(id_str)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._loaded[id_str] = future
+            if not self._queue:
+                loop.call_soon(self._dispatch)
+            self._queue.append(id_str)
+        return future
+
+    async def load_many(self, id_strs: List[str]) -> List[Optional[TRead]]:
+        """
+        Fetch several documents in one batch.
+
+        Args:
+            id_strs: The string representations of the documents' _id
+
+        Returns:
+            List[Optional[TRead]]: The documents in the order of the IDs, None for those not found
+        """
+        return list(await asyncio.gather(*(self.load(id_str) for id_str in id_strs)))
+
+    def _dispatch(self) -> None:
+        """
+        Start fetching the IDs queued during the current tick.
+        """
+        batch, self._queue = self._queue, []
+        task = asyncio.create_task(self._fetch(batch))
+        self._fetches.add(task)
+        task.add_done_callback(self._fetches.discard)
+
+    async def _fetch(self, batch: List[str]) -> None:
+        """
+        Fetch a batch of IDs and resolve their futures.
+
+        Args:
+            batch: The IDs to fetch
+        """
+        try:
+            found = await self.service.get_many_by_ids(batch)
+        except Exception as e:
+            self.logger.error(f"Error loading batch of {len(batch)} documents: {e}")
+            for id_str in batch:
+                self._loaded.pop(id_str).set_exception(e)
+            return
+        for id_str in batch:
+            self._loaded[id_str].set_result(found.get(id_str))
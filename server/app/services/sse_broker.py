@@ -0,0 +1,219 @@
+import asyncio
+import itertools
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Set
+
+
+class SlowConsumerError(Exception):
+    """Raised by a subscription that was disconnected for falling too far behind."""
+
+
+class Subscription:
+    """
+    A single client's subscription to one or more broker topics.
+
+    Each subscription owns its own bounded set of pending messages, so
+    publishing to a topic only wakes the clients that are actually subscribed
+    to it, and a stalled client cannot make memory grow without limit.
+    Coalescable messages replace the pending message of the same topic, so
+    a slow client skips intermediate states instead of queueing them.
+
+    Attributes:
+        topics: The topics this subscription listens to
+        pending: Pending messages keyed by topic (coalesced) or by a unique key
+        max_pending: Maximum number of pending messages
+        max_lag: Maximum age, in seconds, of the oldest pending message
+        closed: Whether the subscription was disconnected for being too slow
+    """
+
+    QUEUED = "queued"
+    COALESCED = "coalesced"
+    OVERFLOW = "overflow"
+
+    _keys = itertools.count()
+
+    def __init__(self, max_pending: int = 64, max_lag: float = 30.0):
+        """
+        Initialize the subscription.
+
+        Args:
+            max_pending: Maximum number of pending messages
+            max_lag: Maximum age, in seconds, of the oldest pending message
+        """
+        self.topics: Set[str] = set()
+        self.pending: OrderedDict[Hashable, tuple] = OrderedDict()
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def offer(self, topic: str, message: Any, coalesce: bool = False) -> str:
+        """
+        Add a message to the pending messages.
+
+        Args:
+            topic: The topic the message was published to
+            message: The message to deliver
+            coalesce: Whether the message replaces a pending message of the same topic
+
+        Returns:
+            str: QUEUED, COALESCED, or OVERFLOW if the subscriber is too far behind
+        """
+        if self.pending:
+            _, enqueued_at = next(iter(self.pending.values()))
+            if time.monotonic() - enqueued_at > self.max_lag:
+                return self.OVERFLOW
+        key = topic if coalesce else next(self._keys)
+        if key in self.pending:
+            _, enqueued_at = self.pending[key]
+            self.pending[key] = (message, enqueued_at)
+            return self.COALESCED
+        if len(self.pending) >= self.max_pending:
+            return self.OVERFLOW
+        self.pending[key] = (message, time.monotonic())
+        self._ready.set()
+        return self.QUEUED
+
+    def close(self) -> int:
+        """
+        Disconnect the subscription, discarding its pending messages.
+
+        Returns:
+            int: Number of pending messages discarded
+        """
+        discarded = len(self.pending)
+        self.pending.clear()
+        self.closed = True
+        self._ready.set()
+        return discarded
+
+    async def get(self) -> Any:
+        """
+        Wait for the next published message.
+
+        Returns:
+            Any: The next message published to any of the subscribed topics
+
+        Raises:
+            SlowConsumerError: If the subscription was disconnected
+        """
+        while not self.pending:
+            if self.closed:
+                raise SlowConsumerError()
+            self._ready.clear()
+            await self._ready.wait()
+        _, (message, _) = self.pending.popitem(last=False)
+        return message
+
+
+class SSEBroker:
+    """
+    In-process publish/subscribe broker built on asyncio primitives.
+
+    Subscribers block on their own pending messages instead of polling, so an
+    idle topic costs nothing, and a publish wakes only the subscribers of
+    that topic. Subscribers that fall behind past their bounds are closed.
+
+    Attributes:
+        topics: Dictionary mapping topic names to their active subscriptions
+        max_pending: Maximum number of pending messages per subscription
+        max_lag: Maximum age, in seconds, of a subscription's oldest pending message
+        metrics: Counters of published, coalesced and dropped messages and disconnected subscribers
+    """
+
+    def __init__(self, max_pending: int = 64, max_lag: float = 30.0):
+        """
+        Initialize the broker.
+
+        Args:
+            max_pending: Maximum number of pending messages per subscription
+            max_lag: Maximum age, in seconds, of a subscription's oldest pending message
+        """
+        self.topics: Dict[str, Set[Subscription]] = {}
+        self.max_pending = max_pending
+        self.max_lag = max_lag
+        self.metrics: Dict[str, int] = {"published": 0, "coalesced": 0, "dropped": 0, "disconnected": 0}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def subscribe(self, topic: str, subscription: Optional[Subscription] = None) -> Subscription:
+        """
+        Subscribe to a topic.
+
+        Args:
+            topic: The topic to subscribe to
+            subscription: Existing subscription to attach the topic to, or None for a new one
+
+        Returns:
+            Subscription: The subscription
+        """
+        subscription = subscription or Subscription(self.max_pending, self.max_lag)
+        subscription.topics.add(topic)
+        self.topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> List[str]:
+        """
+        Remove a subscription from all of its topics.
+
+        Args:
+            subscription: The subscription to remove
+
+        Returns:
+            List[str]: The topics left without subscribers
+        """
+        emptied = []
+        for topic in subscription.topics:
+            subscribers = self.topics.get(topic)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self.topics[topic]
+                emptied.append(topic)
+        subscription.topics.clear()
+        return emptied
+
+    def publish(self, topic: str, message: Any, coalesce: bool = False) -> int:
+        """
+        Deliver a message to every subscriber of a topic.
+
+        Args:
+            topic: The topic to publish to
+            message: The message to deliver
+            coalesce: Whether the message supersedes a pending message of the same topic
+
+        Returns:
+            int: Number of subscribers the message was delivered to
+        """
+        subscribers = self.topics.get(topic)
+        if not subscribers:
+            return 0
+        self.metrics["published"] += 1
+        delivered = 0
+        for subscription in subscribers:
+            if subscription.closed:
+                continue
+            outcome = subscription.offer(topic, message, coalesce)
+            if outcome == Subscription.OVERFLOW:
+                self.metrics["dropped"] += subscription.close() + 1
+                self.metrics["disconnected"] += 1
+                self.logger.warning(f"Disconnected slow subscriber of {topic}")
+                continue
+            if outcome == Subscription.COALESCED:
+                self.metrics["coalesced"] += 1
+            delivered += 1
+        return delivered
+
+    def has_subscribers(self, topic: str) -> bool:
+        """
+        Check whether a topic has any subscribers.
+
+        Args:
+            topic: The topic to check
+
+        Returns:
+            bool: True if at least one client is subscribed
+        """
+        return bool(self.topics.get(topic))
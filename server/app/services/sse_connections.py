@@ -0,0 +1,134 @@
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.core.exceptions import TooManyConnectionsException
+from app.services.sse_broker import Subscription
+
+
+@dataclass
+class Connection:
+    """
+    A live SSE connection.
+
+    Attributes:
+        id: Unique connection id
+        owner: The user (or client address) the connection counts against
+        subscription: The broker subscription feeding the connection
+        opened_at: Monotonic time the connection was opened
+        last_sent_at: Monotonic time a message or keepalive was last sent
+    """
+    id: str
+    owner: str
+    subscription: Optional[Subscription] = None
+    opened_at: float = field(default_factory=time.monotonic)
+    last_sent_at: float = field(default_factory=time.monotonic)
+
+    def touch(self) -> None:
+        """
+        Record that the client accepted a message.
+        """
+        self.last_sent_at = time.monotonic()
+
+
+class ConnectionRegistry:
+    """
+    Registry of the live SSE connections of this worker.
+
+    Enforces per-owner and global connection caps, and reaps connections
+    that stopped accepting messages (keepalives included) for too long.
+
+    Attributes:
+        connections: Dictionary mapping connection ids to live connections
+        max_connections: Maximum number of live connections
+        max_per_owner: Maximum number of live connections per owner
+        idle_timeout: Seconds without a successful send after which a connection is reaped
+    """
+
+    def __init__(self, max_connections: int, max_per_owner: int, idle_timeout: float):
+        """
+        Initialize the registry.
+
+        Args:
+            max_connections: Maximum number of live connections
+            max_per_owner: Maximum number of live connections per owner
+            idle_timeout: Seconds without a successful send after which a connection is reaped
+        """
+        self.connections: Dict[str, Connection] = {}
+        self.max_connections = max_connections
+        self.max_per_owner = max_per_owner
+        self.idle_timeout = idle_timeout
+        self._per_owner: Dict[str, int] = {}
+        self.logger = logging.getLogger(self.__class__.__name__)
+
+    def open(self, owner: str) -> Connection:
+        """
+        Register a new connection.
+
+        Args:
+            owner: The user (or client address) the connection counts against
+
+        Returns:
+            Connection: The registered connection
+
+        Raises:
+            TooManyConnectionsException: If the owner or the worker is at its connection cap
+        """
+        if len(self.connections) >= self.max_connections:
+            raise TooManyConnectionsException(detail="Server is at its event stream limit")
+        if self._per_owner.get(owner, 0) >= self.max_per_owner:
+            raise TooManyConnectionsException(detail="Too many open event streams")
+        connection = Connection(id=uuid.uuid4().hex, owner=owner)
+        self.connections[connection.id] = connection
+        self._per_owner[owner] = self._per_owner.get(owner, 0) + 1
+        return connection
+
+    def close(self, connection: Connection) -> bool:
+        """
+        Unregister a connection. Closing an already closed connection does nothing.
+
+        Args:
+            connection: The connection to unregister
+
+        Returns:
+            bool: True if the connection was registered
+        """
+        if self.connections.pop(connection.id, None) is None:
+            return False
+        remaining = self._per_owner[connection.owner] - 1
+        if remaining:
+            self._per_owner[connection.owner] = remaining
+        else:
+            del self._per_owner[connection.owner]
+        return True
+
+    def reap(self) -> List[Connection]:
+        """
+        Unregister the connections that have not accepted a message within the idle timeout.
+
+        Returns:
+            List[Connection]: The reaped connections
+        """
+        deadline = time.monotonic() - self.idle_timeout
+        reaped = [connection for connection in self.connections.values() if connection.last_sent_at < deadline]
+        for connection in reaped:
+            self.close(connection)
+            self.logger.warning(f"Reaped dead SSE connection {connection.id} of {connection.owner}")
+        return reaped
+
+    def count_by_topic(self) -> Dict[str, int]:
+        """
+        Count the live connections per topic.
+
+        Returns:
+            Dict[str, int]: Dictionary mapping topics to their number of live connections
+        """
+        counts: Dict[str, int] = {}
+        for connection in self.connections.values():
+            if connection.subscription is None:
+                continue
+            for topic in connection.subscription.topics:
+                counts[topic] = counts.get(topic, 0) + 1
+        return counts
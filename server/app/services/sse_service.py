@@ -1,32 +1,350 @@
 import asyncio
 import json
 import logging
-from dataclasses import dataclass
-from typing import Dict, Set
+import secrets
+from collections import deque
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
-from starlette.requests import Request
+import jsonpatch
+import msgpack
+from pydantic import BaseModel
+from starlette.requests import HTTPConnection, Request
 from starlette.responses import StreamingResponse
+from starlette.websockets import WebSocket, WebSocketDisconnect
 
+from app.core.config import settings
 from app.core.exceptions import (
     NotFoundException,
-    StreamException
+    StreamException,
+    TooManyConnectionsException
 )
-from app.schemas.game import GameDBOutput
-from app.schemas.table import TableDBOutput
+from app.schemas.events import ConnectionsResponse, StreamMetricsResponse, StreamModeEnum
+from app.schemas.game import GameDBOutput, GameStatusEnum
+from app.schemas.table import TableDBOutput, PlayerStatusEnum
+from app.schemas.user import UserResponse
 from app.services.base import BaseService
+from app.repositories.base import BaseRepository
+from app.services.broadcast import BroadcastBackend, InProcessBackend, dump_model
+from app.services.sse_broker import SlowConsumerError, SSEBroker, Subscription
+from app.services.sse_connections import Connection, ConnectionRegistry
+
+
+TABLE_TOPIC = "tables:{}"
+GAME_TOPIC = "games:{}"
+USER_TOPIC = "users:{}"
+# Carries repository cache invalidations between workers, never streamed to clients
+CACHE_TOPIC = "cache:{}"
+
+# SSE event names used on the per-user channel, by topic prefix
+TOPIC_EVENTS = {"tables": "table", "games": "game"}
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no"
+}
+
+# SSE comment frame sent on idle streams, so proxies do not drop them
+KEEPALIVE = b":keepalive\n\n"
+
+_json_dumps = partial(json.dumps, default=str)
+
+
+def _msgpack_default(value):
+    """Encode values unknown to MessagePack as `dump_model` does: datetimes as ISO 8601 strings, ObjectIds as strings."""
+    return dump_model(value)
+
+
+def encode_msgpack(payload) -> bytes:
+    """
+    Encode a payload as a MessagePack frame.
+
+    Args:
+        payload: The payload to encode
+
+    Returns:
+        bytes: The encoded frame
+    """
+    return msgpack.packb(payload, default=_msgpack_default, datetime=False)
+
+
+# MessagePack frame sent on idle WebSockets
+KEEPALIVE_FRAME = encode_msgpack({"type": "keepalive"})
+
+
+def encode_sse(payload, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """
+    Encode a payload as SSE wire bytes.
+
+    Args:
+        payload: JSON-serializable payload
+        event: Optional SSE event name
+        event_id: Optional SSE event id
+
+    Returns:
+        bytes: The encoded SSE message
+    """
+    return _frame(json.dumps(payload, default=str), event, event_id)
+
+
+def _frame(data: str, event: Optional[str] = None, event_id: Optional[str] = None) -> bytes:
+    """
+    Wrap already JSON-encoded data in SSE wire format.
+
+    Args:
+        data: The JSON-encoded data
+        event: Optional SSE event name
+        event_id: Optional SSE event id
+
+    Returns:
+        bytes: The encoded SSE message
+    """
+    lines = []
+    if event_id:
+        lines.append(f"id: {event_id}\n")
+    if event:
+        lines.append(f"event: {event}\n")
+    lines.append(f"data: {data}\n\n")
+    return "".join(lines).encode()
+
+
+def parse_event_id(event_id: Optional[str]) -> Optional[Tuple[str, int]]:
+    """
+    Split an SSE event id into its topic epoch and version.
+
+    Args:
+        event_id: The event id sent back by the client as Last-Event-ID
+
+    Returns:
+        Optional[Tuple[str, int]]: The epoch and version, or None if the id is malformed
+    """
+    if not event_id:
+        return None
+    epoch, _, version = event_id.strip().rpartition("-")
+    if not epoch or not version.isdigit():
+        return None
+    return epoch, int(version)
 
 
 @dataclass
-class States:
+class TopicState:
     """
-    Data class to track state changes for SSE streams.
-    
+    Data class holding one version of a topic's state.
+
+    Every SSE message of a version is encoded at most once and the same bytes
+    object is shared by every subscriber of the topic.
+
     Attributes:
-        previous: The previous state of the object
-        current: The current state of the object
+        topic: The topic the state belongs to
+        payload: The state dumped to a dictionary
+        epoch: Identifier of the topic history the version belongs to
+        version: Version number of the state within its topic history
+        previous_payload: Payload of the previous version, used to compute the patch
     """
-    previous: object
-    current: object
+    topic: str
+    payload: dict
+    epoch: str
+    version: int = 1
+    previous_payload: Optional[dict] = field(default=None, repr=False)
+    _messages: Dict[str, Optional[bytes]] = field(default_factory=dict, repr=False)
+
+    @classmethod
+    def from_data(
+            cls,
+            topic: str,
+            data: Any,
+            epoch: str,
+            previous: Optional["TopicState"] = None
+    ) -> "TopicState":
+        """
+        Build the next topic state.
+
+        Args:
+            topic: The topic the state belongs to
+            data: The state, as a model or an already dumped dictionary
+            epoch: Identifier of the topic history
+            previous: The previous state of the topic, if any
+
+        Returns:
+            TopicState: The new state
+        """
+        payload = dump_model(data)
+        if previous is None:
+            return cls(topic=topic, payload=payload, epoch=epoch)
+        return cls(
+            topic=topic,
+            payload=payload,
+            epoch=epoch,
+            version=previous.version + 1,
+            previous_payload=previous.payload
+        )
+
+    @property
+    def event_id(self) -> str:
+        """The SSE id of this version, increasing monotonically within the epoch."""
+        return f"{self.epoch}-{self.version}"
+
+    @property
+    def payload_json(self) -> str:
+        """The state encoded as JSON."""
+        if "json" not in self._messages:
+            self._messages["json"] = _json_dumps(self.payload)
+        return self._messages["json"]
+
+    @property
+    def message(self) -> bytes:
+        """The full state as an unnamed SSE message."""
+        if "full" not in self._messages:
+            self._messages["full"] = _frame(self.payload_json, event_id=self.event_id)
+        return self._messages["full"]
+
+    @property
+    def tagged_message(self) -> bytes:
+        """The full state as a `table`/`game` SSE event tagged with its id, for the per-user channel."""
+        if "tagged" not in self._messages:
+            prefix, _, entity_id = self.topic.partition(":")
+            data = f'{{"id": {json.dumps(entity_id)}, "data": {self.payload_json}}}'
+            self._messages["tagged"] = _frame(data, event=TOPIC_EVENTS.get(prefix, prefix))
+        return self._messages["tagged"]
+
+    @property
+    def msgpack_message(self) -> bytes:
+        """The full state as a MessagePack frame, for WebSocket clients."""
+        if "msgpack" not in self._messages:
+            self._messages["msgpack"] = encode_msgpack(
+                {"type": "state", "id": self.event_id, "topic": self.topic, "data": self.payload}
+            )
+        return self._messages["msgpack"]
+
+    @property
+    def snapshot_message(self) -> bytes:
+        """The full state as a `snapshot` SSE event."""
+        if "snapshot" not in self._messages:
+            self._messages["snapshot"] = _frame(self.payload_json, event="snapshot", event_id=self.event_id)
+        return self._messages["snapshot"]
+
+    @property
+    def patch_message(self) -> Optional[bytes]:
+        """The RFC 6902 patch from the previous version as a `patch` SSE event, if known."""
+        if "patch" not in self._messages:
+            if self.previous_payload is None:
+                self._messages["patch"] = None
+            else:
+                patch = jsonpatch.JsonPatch.from_diff(self.previous_payload, self.payload, dumps=_json_dumps)
+                self._messages["patch"] = encode_sse(patch.patch, event="patch", event_id=self.event_id)
+                self.previous_payload = None
+        return self._messages["patch"]
+
+
+@dataclass
+class TopicHistory:
+    """
+    Data class holding the recent versions of a topic.
+
+    The history is a bounded ring buffer, so a reconnecting client can be sent
+    only the versions it missed. It outlives its last subscriber for
+    SSE_TOPIC_RETENTION_SECONDS so short reconnects do not hit the database.
+
+    Attributes:
+        epoch: Random identifier of this history, part of every event id
+        states: The most recent versions of the topic, oldest first
+        expiry: Timer dropping the history once nobody watches the topic
+    """
+    epoch: str
+    states: Deque[TopicState]
+    expiry: Optional[asyncio.TimerHandle] = None
+
+    @classmethod
+    def start(cls, topic: str, data: Any) -> "TopicHistory":
+        """
+        Start a new history from an initial state.
+
+        Args:
+            topic: The topic the history belongs to
+            data: The initial state object
+
+        Returns:
+            TopicHistory: The new history
+        """
+        history = cls(epoch=secrets.token_hex(4), states=deque(maxlen=settings.SSE_REPLAY_BUFFER_SIZE))
+        history.states.append(TopicState.from_data(topic, data, history.epoch))
+        return history
+
+    @property
+    def latest(self) -> TopicState:
+        """The most recent version of the topic."""
+        return self.states[-1]
+
+    def append(self, data: Any) -> TopicState:
+        """
+        Record a new version of the topic.
+
+        Args:
+            data: The new state object
+
+        Returns:
+            TopicState: The recorded state
+        """
+        state = TopicState.from_data(self.latest.topic, data, self.epoch, previous=self.latest)
+        self.states.append(state)
+        return state
+
+    def missed_since(self, version: int) -> Optional[List[TopicState]]:
+        """
+        Get the versions published after a given one.
+
+        Args:
+            version: The last version the client received
+
+        Returns:
+            Optional[List[TopicState]]: The missed versions, or None if some were evicted
+        """
+        if version > self.latest.version or version < self.states[0].version - 1:
+            return None
+        return [state for state in self.states if state.version > version]
+
+
+@dataclass
+class StreamCursor:
+    """
+    Data class tracking what a single client has received on a topic.
+
+    Attributes:
+        mode: The client's stream mode
+        version: The last version sent to the client
+        patches_sent: Number of patches sent since the last snapshot
+    """
+    mode: StreamModeEnum = StreamModeEnum.FULL
+    version: int = 0
+    patches_sent: int = 0
+
+    def next_message(self, state: TopicState) -> Optional[bytes]:
+        """
+        Pick the message to send a client for a new state.
+
+        Args:
+            state: The new topic state
+
+        Returns:
+            Optional[bytes]: The message, or None if the client already has this version
+        """
+        if state.version <= self.version:
+            return None
+        if self.mode == StreamModeEnum.FULL:
+            message = state.message
+        else:
+            message = None
+            if state.version == self.version + 1 and self.patches_sent < settings.SSE_PATCH_RESYNC_INTERVAL:
+                message = state.patch_message
+            if message is None:
+                message = state.snapshot_message
+                self.patches_sent = 0
+            else:
+                self.patches_sent += 1
+        self.version = state.version
+        return message
 
 
 class SSEService:
@@ -34,242 +352,805 @@ class SSEService:
     Service for managing Server-Sent Events (SSE) for tables and games.
     
     This service handles real-time updates for tables and games using SSE:
-    - Manages client connections and disconnections
-    - Tracks state changes for tables and games
-    - Sends updates to connected clients
+    - Subscribes clients to per-table and per-game broker topics
+    - Multiplexes every table, game and invite of a user on a single channel
+    - Keeps the latest state of every watched table and game
+    - Publishes updates to the subscribers of the changed topic only
+    - Propagates updates to the other workers through a broadcast backend
+    - Propagates repository cache invalidations to the other workers
+    - Streams the same states as MessagePack frames over WebSockets
+    - Sends keepalives on idle streams and reaps dead connections
     - Handles cleanup of disconnected clients
     
     Attributes:
-        table_connections: Dictionary mapping table IDs to sets of client IDs
-        table_states: Dictionary mapping table IDs to their state objects
-        game_connections: Dictionary mapping game IDs to sets of client IDs
-        game_states: Dictionary mapping game IDs to their state objects
+        backend: The broadcast backend carrying updates between workers
+        broker: The publish/subscribe broker fanning out updates
+        connections: Registry of the live connections, enforcing the connection caps
+        topics: Dictionary mapping watched topics to their recent history
+        user_channels: Dictionary mapping user IDs to their per-user channel subscriptions
     """
 
-    def __init__(self, table_service: BaseService, game_service: BaseService):
+    def __init__(
+            self,
+            table_service: BaseService,
+            game_service: BaseService,
+            backend: Optional[BroadcastBackend] = None
+    ):
         """
         Initialize the SSE service.
         
         Args:
             table_service: Service for table operations
             game_service: Service for game operations
+            backend: Broadcast backend, defaults to delivering within this process only
         """
-        self.table_connections: Dict[str, Set[int]] = {}
-        self.table_states: Dict[str, States] = {}
-        self.game_connections: Dict[str, Set[int]] = {}
-        self.game_states: Dict[str, States] = {}
+        self.backend = backend or InProcessBackend()
+        self.broker = SSEBroker(
+            max_pending=settings.SSE_SUBSCRIBER_QUEUE_SIZE,
+            max_lag=settings.SSE_SUBSCRIBER_MAX_LAG_SECONDS
+        )
+        self.connections = ConnectionRegistry(
+            max_connections=settings.SSE_MAX_CONNECTIONS,
+            max_per_owner=settings.SSE_MAX_CONNECTIONS_PER_USER,
+            idle_timeout=settings.SSE_CONNECTION_TIMEOUT_SECONDS
+        )
+        self.topics: Dict[str, TopicHistory] = {}
+        self.user_channels: Dict[str, Set[Subscription]] = {}
+        self._reaper: Optional[asyncio.Task] = None
+        # Tells this worker's own cache invalidations apart once relayed back
+        self._origin = secrets.token_hex(8)
 
         self.table_service = table_service
         self.game_service = game_service
         self.logger = logging.getLogger(self.__class__.__name__)
 
+    async def start(self) -> None:
+        """
+        Start receiving updates from the broadcast backend, and reaping dead connections.
+        """
+        await self.backend.start(self._deliver)
+        if not isinstance(self.backend, InProcessBackend):
+            BaseRepository.set_invalidation_publisher(self._publish_invalidation)
+        self._reaper = asyncio.create_task(self._reap_connections())
+
+    async def stop(self) -> None:
+        """
+        Stop reaping connections and stop the broadcast backend.
+        """
+        if self._reaper:
+            self._reaper.cancel()
+            await asyncio.gather(self._reaper, return_exceptions=True)
+        if BaseRepository._invalidation_publisher == self._publish_invalidation:
+            BaseRepository.set_invalidation_publisher(None)
+        await self.backend.stop()
+
+    def get_connections(self) -> ConnectionsResponse:
+        """
+        Get the live connections of this worker.
+
+        Returns:
+            ConnectionsResponse: Total live connections, and live connections per topic
+        """
+        return ConnectionsResponse(
+            total=len(self.connections.connections),
+            topics=self.connections.count_by_topic()
+        )
+
+    def get_metrics(self) -> StreamMetricsResponse:
+        """
+        Get the delivery metrics of this worker's streams.
+
+        Returns:
+            StreamMetricsResponse: Subscriber and topic counts, and message counters
+        """
+        subscriptions = set().union(*self.broker.topics.values())
+        return StreamMetricsResponse(
+            subscribers=len(subscriptions),
+            topics=len(self.broker.topics),
+            **self.broker.metrics
+        )
+
     async def send_table_update(self, table_id: str, data: TableDBOutput) -> None:
         """
-        Update the state for a table and prepare for SSE broadcast.
+        Publish a new table state to the clients watching the table.
         
         Args:
             table_id: The ID of the table to update
             data: The new table data
             
         Raises:
-            StreamException: If there's an error updating the table state
+            StreamException: If there's an error publishing the table state
         """
         try:
-            if table_id in self.table_connections:
-                if table_id not in self.table_states:
-                    self.table_states[table_id] = States(previous=None, current=data)
-                else:
-                    self.table_states[table_id].current = data
+            await self.backend.publish(TABLE_TOPIC.format(table_id), data)
         except Exception as e:
             self.logger.error(f"Error sending table update: {e}")
             raise StreamException(detail="Failed to send table update")
 
     async def send_game_update(self, game_id: str, data: GameDBOutput) -> None:
         """
-        Update the state for a game and prepare for SSE broadcast.
+        Publish a new game state to the clients watching the game.
         
         Args:
             game_id: The ID of the game to update
             data: The new game data
             
         Raises:
-            StreamException: If there's an error updating the game state
+            StreamException: If there's an error publishing the game state
         """
         try:
-            if game_id in self.game_connections:
-                if game_id not in self.game_states:
-                    self.game_states[game_id] = States(previous=None, current=data)
-                else:
-                    self.game_states[game_id].current = data
+            await self.backend.publish(GAME_TOPIC.format(game_id), data)
         except Exception as e:
             self.logger.error(f"Error sending game update: {e}")
             raise StreamException(detail="Failed to send game update")
 
-    async def table_event_stream(self, request: Request, table_id: str) -> StreamingResponse:
+    async def send_table_invites(self, table: TableDBOutput, user_ids: List[str]) -> None:
         """
-        Create an SSE stream for table updates.
-        
+        Notify invited users on their per-user channel.
+
+        Args:
+            table: The table the users were invited to
+            user_ids: The IDs of the invited users
+
+        Raises:
+            StreamException: If there's an error sending the invites
+        """
+        try:
+            invited = {
+                str(player.user_id) for player in table.players
+                if player.status == PlayerStatusEnum.INVITED
+            }
+            payload = None
+            for user_id in map(str, user_ids):
+                if user_id not in invited:
+                    continue
+                if payload is None:
+                    payload = {"id": str(table.id), "data": dump_model(table)}
+                await self.backend.publish(USER_TOPIC.format(user_id), payload, event="invite")
+        except Exception as e:
+            self.logger.error(f"Error sending table invites: {e}")
+            raise StreamException(detail="Failed to send table invites")
+
+    async def user_event_stream(self, request: Request, user: UserResponse) -> StreamingResponse:
+        """
+        Create a single SSE stream for every table and game of a user.
+
+        Table and game states are sent as `table`/`game` events tagged with the
+        entity id, invitations as `invite` events. Tables and games the user
+        joins while connected are picked up as they are published.
+
         Args:
             request: The client request
-            table_id: The ID of the table to stream
-            
+            user: The user to stream events for
+
         Returns:
             StreamingResponse: The SSE stream response
-            
+
         Raises:
-            NotFoundException: If table not found
+            TooManyConnectionsException: If the user has too many open streams
             StreamException: If there's an error creating the stream
         """
+        user_id = str(user.id)
+        connection = self.connections.open(user_id)
         try:
-            client_id = id(request)
-            # Register connection
-            if table_id not in self.table_connections:
-                self.table_connections[table_id] = set()
-            self.table_connections[table_id].add(client_id)
-
-            # Initialize state if first connection
-            if table_id not in self.table_states:
-                # Fetch initial via TableService
-                initial: TableDBOutput = await self.table_service.get_by_id(table_id)
-                if not initial:
-                    raise NotFoundException(detail="Table not found")
-                # Store both previous and current so first yield is initial
-                self.table_states[table_id] = States(previous=initial, current=initial)
+            tables = await self.table_service.get_tables(user)
+            games = await self.game_service.get_games_for_player(user, game_status=GameStatusEnum.IN_PROGRESS.value)
+
+            subscription = connection.subscription = self.broker.subscribe(USER_TOPIC.format(user_id))
+            self.user_channels.setdefault(user_id, set()).add(subscription)
+            initial_states = []
+            seeds = [(TABLE_TOPIC.format(table.id), table) for table in tables]
+            seeds += [(GAME_TOPIC.format(game.id), game) for game in games]
+            for topic, data in seeds:
+                history = self._watch(topic, subscription, data)
+                initial_states.append(history.latest)
 
             async def generate():
+                versions = {state.topic: state.version for state in initial_states}
                 try:
-                    # Send initial state
-                    state_obj = self.table_states[table_id].current
-                    try:
-                        payload = state_obj.model_dump(by_alias=True)
-                    except Exception:
-                        payload = state_obj.dict(by_alias=True, exclude_unset=True)
-                    yield f"data: {json.dumps(payload, default=str)}\n\n"
+                    for state in initial_states:
+                        yield state.tagged_message
+                    connection.touch()
 
                     while True:
-                        if await request.is_disconnected():
-                            break
-                        states = self.table_states.get(table_id)
-                        if not states:
-                            break
-                        current = states.current
-                        prev = states.previous
-                        # If changed (or previous None), send update
-                        if prev is None or current != prev:
-                            try:
-                                payload = current.model_dump(by_alias=True)
-                            except Exception:
-                                payload = current.dict(by_alias=True, exclude_unset=True)
-                            yield f"data: {json.dumps(payload, default=str)}\n\n"
-                            states.previous = current
-                        await asyncio.sleep(0.5)
+                        message = await self._receive(connection)
+                        if isinstance(message, TopicState):
+                            if message.version <= versions.get(message.topic, 0):
+                                continue
+                            versions[message.topic] = message.version
+                            message = message.tagged_message
+                        yield message
+                        connection.touch()
                 except asyncio.CancelledError:
                     pass
+                except SlowConsumerError:
+                    self.logger.warning(f"Closed user event stream {connection.id} of {user_id}, client too slow")
                 except Exception as e:
-                    self.logger.error(f"Error in table event stream: {e}")
-                    raise StreamException(detail="Error in table event stream")
+                    self.logger.error(f"Error in user event stream: {e}")
+                    raise StreamException(detail="Error in event stream")
                 finally:
-                    # Cleanup connection
-                    conns = self.table_connections.get(table_id)
-                    if conns and client_id in conns:
-                        conns.remove(client_id)
-                        if not conns:
-                            del self.table_connections[table_id]
-                            if table_id in self.table_states:
-                                del self.table_states[table_id]
-
-            return StreamingResponse(
-                generate(),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "X-Accel-Buffering": "no"
-                }
+                    self._close(connection)
+
+            return self._response(generate(), connection)
+        except Exception as e:
+            self._close(connection)
+            self.logger.error(f"Error creating user event stream: {e}")
+            raise StreamException(detail="Failed to create user event stream")
+
+    async def table_event_stream(
+            self,
+            request: Request,
+            table_id: str,
+            mode: StreamModeEnum = StreamModeEnum.FULL,
+            last_event_id: Optional[str] = None,
+            user: Optional[UserResponse] = None
+    ) -> StreamingResponse:
+        """
+        Create an SSE stream for table updates.
+        
+        Args:
+            request: The client request
+            table_id: The ID of the table to stream
+            mode: Send full states, or a snapshot followed by JSON patches
+            last_event_id: The last event id the client received, when reconnecting
+            user: The authenticated user, if any; anonymous streams count against the client address
+            
+        Returns:
+            StreamingResponse: The SSE stream response
+            
+        Raises:
+            NotFoundException: If table not found
+            TooManyConnectionsException: If the client has too many open streams
+            StreamException: If there's an error creating the stream
+        """
+        try:
+            return await self._event_stream(
+                TABLE_TOPIC.format(table_id),
+                lambda: self.table_service.get_by_id(table_id),
+                not_found_detail="Table not found",
+                mode=mode,
+                last_event_id=last_event_id,
+                owner=self._owner(request, user)
             )
-        except NotFoundException:
+        except (NotFoundException, TooManyConnectionsException):
             raise
         except Exception as e:
             self.logger.error(f"Error creating table event stream: {e}")
             raise StreamException(detail="Failed to create table event stream")
 
-    async def game_event_stream(self, request: Request, game_id: str) -> StreamingResponse:
+    async def game_event_stream(
+            self,
+            request: Request,
+            game_id: str,
+            mode: StreamModeEnum = StreamModeEnum.FULL,
+            last_event_id: Optional[str] = None,
+            user: Optional[UserResponse] = None
+    ) -> StreamingResponse:
         """
         Create an SSE stream for game updates.
         
         Args:
             request: The client request
             game_id: The ID of the game to stream
+            mode: Send full states, or a snapshot followed by JSON patches
+            last_event_id: The last event id the client received, when reconnecting
+            user: The authenticated user, if any; anonymous streams count against the client address
             
         Returns:
             StreamingResponse: The SSE stream response
             
         Raises:
             NotFoundException: If game not found
+            TooManyConnectionsException: If the client has too many open streams
             StreamException: If there's an error creating the stream
         """
         try:
-            client_id = id(request)
-            if game_id not in self.game_connections:
-                self.game_connections[game_id] = set()
-            self.game_connections[game_id].add(client_id)
+            return await self._event_stream(
+                GAME_TOPIC.format(game_id),
+                lambda: self.game_service.get_by_id(game_id),
+                not_found_detail="Game not found",
+                mode=mode,
+                last_event_id=last_event_id,
+                owner=self._owner(request, user)
+            )
+        except (NotFoundException, TooManyConnectionsException):
+            raise
+        except Exception as e:
+            self.logger.error(f"Error creating game event stream: {e}")
+            raise StreamException(detail="Failed to create game event stream")
 
-            if game_id not in self.game_states:
-                initial: GameDBOutput = await self.game_service.get_by_id(game_id)
-                if not initial:
-                    raise NotFoundException(detail="Game not found")
-                self.game_states[game_id] = States(previous=initial, current=initial)
+    async def table_socket(
+            self,
+            websocket: WebSocket,
+            table_id: str,
+            acks: bool = False,
+            user: Optional[UserResponse] = None
+    ) -> None:
+        """
+        Stream table updates as MessagePack frames over a WebSocket, until the client disconnects.
 
-            async def generate():
+        Args:
+            websocket: The client WebSocket, not accepted yet
+            table_id: The ID of the table to stream
+            acks: Whether the client acknowledges every state
+            user: The authenticated user, if any; anonymous sockets count against the client address
+
+        Raises:
+            NotFoundException: If table not found
+            TooManyConnectionsException: If the client has too many open streams
+        """
+        await self._socket_stream(
+            websocket,
+            TABLE_TOPIC.format(table_id),
+            lambda: self.table_service.get_by_id(table_id),
+            not_found_detail="Table not found",
+            owner=self._owner(websocket, user),
+            acks=acks
+        )
+
+    async def game_socket(
+            self,
+            websocket: WebSocket,
+            game_id: str,
+            acks: bool = False,
+            user: Optional[UserResponse] = None
+    ) -> None:
+        """
+        Stream game updates as MessagePack frames over a WebSocket, until the client disconnects.
+
+        Args:
+            websocket: The client WebSocket, not accepted yet
+            game_id: The ID of the game to stream
+            acks: Whether the client acknowledges every state
+            user: The authenticated user, if any; anonymous sockets count against the client address
+
+        Raises:
+            NotFoundException: If game not found
+            TooManyConnectionsException: If the client has too many open streams
+        """
+        await self._socket_stream(
+            websocket,
+            GAME_TOPIC.format(game_id),
+            lambda: self.game_service.get_by_id(game_id),
+            not_found_detail="Game not found",
+            owner=self._owner(websocket, user),
+            acks=acks
+        )
+
+    async def _deliver(self, topic: str, data: Any, event: Optional[str]) -> None:
+        """
+        Handle a message published by any worker.
+
+        Args:
+            topic: The topic of the message
+            data: A state (model or dictionary) or a notification payload
+            event: SSE event name for notifications, None for state updates
+        """
+        if topic.startswith(CACHE_TOPIC.format("")):
+            if data["origin"] != self._origin:
+                BaseRepository.apply_invalidation(topic.split(":", 1)[1], data["id"])
+            return
+        if event:
+            if self.broker.has_subscribers(topic):
+                self.broker.publish(topic, encode_sse(data, event=event))
+            return
+        players = data.get("players", []) if isinstance(data, dict) else getattr(data, "players", [])
+        self._attach_user_channels(
+            topic,
+            (player["user_id"] if isinstance(player, dict) else player.user_id for player in players)
+        )
+        self._publish(topic, data)
+
+    async def _publish_invalidation(self, collection: str, id_str: Optional[str]) -> None:
+        """
+        Tell the other workers to drop a document from their repository caches.
+
+        Args:
+            collection: The cache key of the collection
+            id_str: The ID of the written document, or None for every document of the collection
+        """
+        await self.backend.publish(
+            CACHE_TOPIC.format(collection),
+            {"origin": self._origin, "id": id_str},
+            event="invalidate"
+        )
+
+    def _publish(self, topic: str, data: Any) -> None:
+        """
+        Record the latest state of a topic and wake its subscribers.
+
+        Topics nobody is watching (or recently watched) on this worker are
+        ignored, so updates cost nothing until a client subscribes.
+
+        Args:
+            topic: The topic that changed
+            data: The new state, as a model or an already dumped dictionary
+        """
+        history = self.topics.get(topic)
+        if history is None:
+            if not self.broker.has_subscribers(topic):
+                return
+            history = self.topics[topic] = TopicHistory.start(topic, data)
+            state = history.latest
+        else:
+            state = history.append(data)
+        # A subscriber still holding an older state of this topic gets this one instead
+        self.broker.publish(topic, state, coalesce=True)
+
+    async def _event_stream(
+            self,
+            topic: str,
+            load_initial: Callable[[], Awaitable[Optional[BaseModel]]],
+            not_found_detail: str,
+            mode: StreamModeEnum,
+            last_event_id: Optional[str],
+            owner: str
+    ) -> StreamingResponse:
+        """
+        Subscribe to a topic and stream its states as SSE messages.
+
+        The first message is the latest known state (fetched from the database
+        only when the topic has no history); after that the generator sleeps
+        on its subscription until a new state is published. In patch mode,
+        later states are sent as JSON patches with a periodic snapshot.
+        A client resuming with a Last-Event-ID still in the topic history is
+        sent only the versions it missed instead of a snapshot.
+
+        Args:
+            topic: The topic to subscribe to
+            load_initial: Coroutine factory fetching the initial state
+            not_found_detail: Error detail used when the initial state is missing
+            mode: The client's stream mode
+            last_event_id: The last event id the client received, if resuming
+            owner: The user (or client address) the connection counts against
+
+        Returns:
+            StreamingResponse: The SSE stream response
+
+        Raises:
+            NotFoundException: If the initial state does not exist
+            TooManyConnectionsException: If the owner or the worker is at its connection cap
+        """
+        connection, history = await self._open_topic(topic, load_initial, not_found_detail, owner)
+        cursor = StreamCursor(mode=mode)
+        initial_messages = self._resume(history, cursor, last_event_id)
+
+        async def generate():
+            try:
+                for message in initial_messages:
+                    yield message
+                connection.touch()
+
+                while True:
+                    state = await self._receive(connection)
+                    message = state if state is KEEPALIVE else cursor.next_message(state)
+                    if message:
+                        yield message
+                        connection.touch()
+            except asyncio.CancelledError:
+                pass
+            except SlowConsumerError:
+                # The client reconnects with its Last-Event-ID and resumes from the history
+                self.logger.warning(f"Closed {topic} event stream {connection.id}, client too slow")
+            except Exception as e:
+                self.logger.error(f"Error in {topic} event stream: {e}")
+                raise StreamException(detail="Error in event stream")
+            finally:
+                self._close(connection)
+
+        return self._response(generate(), connection)
+
+    async def _socket_stream(
+            self,
+            websocket: WebSocket,
+            topic: str,
+            load_initial: Callable[[], Awaitable[Optional[BaseModel]]],
+            not_found_detail: str,
+            owner: str,
+            acks: bool
+    ) -> None:
+        """
+        Subscribe to a topic and stream its states as MessagePack frames over a WebSocket.
+
+        Each frame is a map with `type` ("state" or "keepalive"), and for states
+        the `id`, `topic` and `data` of the version. With acks enabled, the next
+        state is sent only once the client acknowledged the previous one with a
+        `{"ack": <id>}` frame; states published in the meantime are coalesced,
+        so the client always receives the latest one.
+
+        Args:
+            websocket: The client WebSocket, not accepted yet
+            topic: The topic to subscribe to
+            load_initial: Coroutine factory fetching the initial state
+            not_found_detail: Error detail used when the initial state is missing
+            owner: The user (or client address) the connection counts against
+            acks: Whether the client acknowledges every state
+
+        Raises:
+            NotFoundException: If the initial state does not exist
+            TooManyConnectionsException: If the owner or the worker is at its connection cap
+        """
+        connection, history = await self._open_topic(topic, load_initial, not_found_detail, owner)
+        acked = asyncio.Event()
+        acked.set()
+        unacked_id: Optional[str] = None
+
+        async def receive_acks():
+            nonlocal unacked_id
+            while True:
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    return
                 try:
-                    state_obj = self.game_states[game_id].current
+                    ack = msgpack.unpackb(frame["bytes"]).get("ack")
+                except Exception:
+                    continue
+                if ack is not None and ack == unacked_id:
+                    unacked_id = None
+                    acked.set()
+
+        async def send_states():
+            nonlocal unacked_id
+            version = 0
+            state = history.latest
+            while True:
+                if state is KEEPALIVE:
+                    await websocket.send_bytes(KEEPALIVE_FRAME)
+                    connection.touch()
+                elif state.version > version:
+                    version = state.version
+                    if acks:
+                        unacked_id = state.event_id
+                        acked.clear()
+                    await websocket.send_bytes(state.msgpack_message)
+                    connection.touch()
+                while not acked.is_set():
                     try:
-                        payload = state_obj.model_dump(by_alias=True)
-                    except Exception:
-                        payload = state_obj.dict(by_alias=True, exclude_unset=True)
-                    yield f"data: {json.dumps(payload, default=str)}\n\n"
+                        await asyncio.wait_for(acked.wait(), settings.SSE_HEARTBEAT_SECONDS)
+                    except asyncio.TimeoutError:
+                        await websocket.send_bytes(KEEPALIVE_FRAME)
+                        connection.touch()
+                state = await self._receive(connection)
 
-                    while True:
-                        if await request.is_disconnected():
-                            break
-                        states = self.game_states.get(game_id)
-                        if not states:
-                            break
-                        current = states.current
-                        prev = states.previous
-                        if prev is None or current != prev:
-                            try:
-                                payload = current.model_dump(by_alias=True)
-                            except Exception:
-                                payload = current.dict(by_alias=True, exclude_unset=True)
-                            yield f"data: {json.dumps(payload, default=str)}\n\n"
-                            states.previous = current
-                        await asyncio.sleep(0.5)
-                except asyncio.CancelledError:
-                    pass
-                except Exception as e:
-                    self.logger.error(f"Error in game event stream: {e}")
-                    raise StreamException(detail="Error in game event stream")
-                finally:
-                    conns = self.game_connections.get(game_id)
-                    if conns and client_id in conns:
-                        conns.remove(client_id)
-                        if not conns:
-                            del self.game_connections[game_id]
-                            if game_id in self.game_states:
-                                del self.game_states[game_id]
-
-            return StreamingResponse(
-                generate(),
-                media_type="text/event-stream",
-                headers={
-                    "Cache-Control": "no-cache",
-                    "Connection": "keep-alive",
-                    "X-Accel-Buffering": "no"
-                }
-            )
-        except NotFoundException:
-            raise
+        try:
+            await websocket.accept()
+            tasks = [asyncio.create_task(receive_acks()), asyncio.create_task(send_states())]
+            try:
+                done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+            for task in done:
+                task.result()
+        except (WebSocketDisconnect, asyncio.CancelledError):
+            pass
+        except SlowConsumerError:
+            self.logger.warning(f"Closed {topic} socket {connection.id}, client too slow")
+            await websocket.close(code=1013)
         except Exception as e:
-            self.logger.error(f"Error creating game event stream: {e}")
-            raise StreamException(detail="Failed to create game event stream")
+            self.logger.error(f"Error in {topic} socket: {e}")
+        finally:
+            self._close(connection)
+
+    async def _open_topic(
+            self,
+            topic: str,
+            load_initial: Callable[[], Awaitable[Optional[BaseModel]]],
+            not_found_detail: str,
+            owner: str
+    ) -> Tuple[Connection, TopicHistory]:
+        """
+        Register a connection subscribed to a topic, and get the topic history.
+
+        Args:
+            topic: The topic to subscribe to
+            load_initial: Coroutine factory fetching the initial state
+            not_found_detail: Error detail used when the initial state is missing
+            owner: The user (or client address) the connection counts against
+
+        Returns:
+            Tuple[Connection, TopicHistory]: The connection, and the history to start from
+
+        Raises:
+            NotFoundException: If the initial state does not exist
+            TooManyConnectionsException: If the owner or the worker is at its connection cap
+        """
+        connection = self.connections.open(owner)
+        connection.subscription = self.broker.subscribe(topic)
+        try:
+            history = self.topics.get(topic)
+            if history is None:
+                initial = await load_initial()
+                if not initial:
+                    raise NotFoundException(detail=not_found_detail)
+                # A publish may have raced the fetch; keep the newer history
+                history = self.topics.setdefault(topic, TopicHistory.start(topic, initial))
+            self._keep(history)
+        except Exception:
+            self._close(connection)
+            raise
+        return connection, history
+
+    def _attach_user_channels(self, topic: str, user_ids: Iterable) -> None:
+        """
+        Subscribe the per-user channels of the given users to a topic they are not watching yet.
+
+        Args:
+            topic: The topic that changed
+            user_ids: The IDs of the users involved in the topic
+        """
+        for user_id in user_ids:
+            for subscription in self.user_channels.get(str(user_id), ()):
+                if topic not in subscription.topics:
+                    self.broker.subscribe(topic, subscription)
+
+    def _watch(self, topic: str, subscription: Subscription, data: BaseModel) -> TopicHistory:
+        """
+        Subscribe to a topic whose current state is already known.
+
+        Args:
+            topic: The topic to subscribe to
+            subscription: The subscription to attach the topic to
+            data: The known state, used if the topic has no history yet
+
+        Returns:
+            TopicHistory: The topic history
+        """
+        self.broker.subscribe(topic, subscription)
+        history = self.topics.get(topic)
+        if history is None:
+            history = self.topics[topic] = TopicHistory.start(topic, data)
+        self._keep(history)
+        return history
+
+    @staticmethod
+    def _keep(history: TopicHistory) -> None:
+        """
+        Cancel a pending expiry of a topic history that is watched again.
+
+        Args:
+            history: The topic history
+        """
+        if history.expiry:
+            history.expiry.cancel()
+            history.expiry = None
+
+    @staticmethod
+    def _resume(history: TopicHistory, cursor: StreamCursor, last_event_id: Optional[str]) -> List[bytes]:
+        """
+        Build the first messages of a stream.
+
+        Args:
+            history: The topic history
+            cursor: The client's stream cursor
+            last_event_id: The last event id the client received, if resuming
+
+        Returns:
+            List[bytes]: The missed versions if they are still buffered, a snapshot otherwise
+        """
+        parsed = parse_event_id(last_event_id)
+        missed = None
+        if parsed and parsed[0] == history.epoch:
+            missed = history.missed_since(parsed[1])
+        if missed is None:
+            return [cursor.next_message(history.latest)]
+
+        cursor.version = parsed[1]
+        if cursor.mode == StreamModeEnum.FULL:
+            # Every full message carries the whole state, so the newest one is enough
+            missed = missed[-1:]
+        return [message for message in map(cursor.next_message, missed) if message]
+
+    @staticmethod
+    def _owner(request: Optional[HTTPConnection], user: Optional[UserResponse]) -> str:
+        """
+        Get the key a connection counts against for the per-user cap.
+
+        Args:
+            request: The client request or WebSocket
+            user: The authenticated user, if any
+
+        Returns:
+            str: The user ID, or the client address for anonymous streams
+        """
+        if user is not None:
+            return str(user.id)
+        client = request.client if request is not None else None
+        return f"client:{client.host if client else 'unknown'}"
+
+    @staticmethod
+    def _response(body, connection: Connection) -> StreamingResponse:
+        """
+        Wrap a message generator in an SSE response.
+
+        Args:
+            body: Async generator of SSE messages
+            connection: The connection the response is served on
+
+        Returns:
+            StreamingResponse: The SSE stream response
+        """
+        headers = {**SSE_HEADERS, "X-Connection-Id": connection.id}
+        return StreamingResponse(body, media_type="text/event-stream", headers=headers)
+
+    @staticmethod
+    async def _receive(connection: Connection):
+        """
+        Wait for the next message of a connection.
+
+        Args:
+            connection: The connection to receive for
+
+        Returns:
+            The next published message, or KEEPALIVE if none arrived within the heartbeat interval
+
+        Raises:
+            SlowConsumerError: If the connection's subscription was closed
+        """
+        try:
+            return await asyncio.wait_for(connection.subscription.get(), settings.SSE_HEARTBEAT_SECONDS)
+        except asyncio.TimeoutError:
+            return KEEPALIVE
+
+    def _close(self, connection: Connection) -> None:
+        """
+        Unregister a connection and release its subscription. Safe to call more than once.
+
+        Args:
+            connection: The connection to close
+        """
+        self.connections.close(connection)
+        subscription = connection.subscription
+        if subscription is None:
+            return
+        channels = self.user_channels.get(connection.owner)
+        if channels is not None:
+            channels.discard(subscription)
+            if not channels:
+                del self.user_channels[connection.owner]
+        subscription.close()
+        self._unsubscribe(subscription)
+
+    async def _reap_connections(self) -> None:
+        """
+        Periodically close the connections that stopped accepting messages.
+
+        A client that went away without closing its socket stops accepting
+        keepalives; its connection is unregistered and its subscription closed,
+        so it no longer counts against the caps nor buffers messages.
+        """
+        while True:
+            await asyncio.sleep(settings.SSE_HEARTBEAT_SECONDS)
+            for connection in self.connections.reap():
+                self._close(connection)
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Remove a subscription, and schedule dropping topic histories once nobody watches them.
+
+        Args:
+            subscription: The subscription to remove
+        """
+        for topic in self.broker.unsubscribe(subscription):
+            history = self.topics.get(topic)
+            if history is None:
+                continue
+            if settings.SSE_TOPIC_RETENTION_SECONDS <= 0:
+                self._expire_topic(topic)
+            else:
+                history.expiry = asyncio.get_running_loop().call_later(
+                    settings.SSE_TOPIC_RETENTION_SECONDS,
+                    self._expire_topic,
+                    topic
+                )
+
+    def _expire_topic(self, topic: str) -> None:
+        """
+        Drop a topic history unless a client subscribed again.
+
+        Args:
+            topic: The topic to drop
+        """
+        if not self.broker.has_subscribers(topic):
+            self.topics.pop(topic, None)
@@ -1,15 +1,13 @@
 import logging
 from datetime import datetime, UTC, timedelta
-from typing import Optional, List
+from typing import Optional
 
 from app.core.exceptions import ValidationException, DatabaseException
 from app.repositories.statistics_repository import StatisticsRepository
 from app.schemas.game import GameDBOutput
 from app.schemas.py_object_id import PyObjectId
-from app.schemas.statistics import MonthlyChangesStats, RecentGameStats, MonthlyStats, StatisticsDBOutput, Stats, \
-    StatisticsBase
+from app.schemas.statistics import MonthlyChangesStats, RecentGameStats, MonthlyStats, StatisticsDBOutput, StatisticsBase
 from app.schemas.table import TableDBOutput, PlayerStatusEnum
-from app.schemas.user import UserDBOutput
 from app.services.base import BaseService
 
 
@@ -60,91 +58,25 @@ class StatisticsService(BaseService[StatisticsBase, StatisticsDBOutput]):
         except Exception as e:
             raise DatabaseException(detail=f"Unexpected error getting monthly stats: {str(e)}")
 
-    async def update_user_stats(self, user_id: str, user_inc: Stats) -> Optional[StatisticsDBOutput]:
+    async def apply_game_results(self, game: GameDBOutput) -> int:
         """
-        Update a user's statistics.
+        Add the results of a completed game to the statistics of its players.
 
         Args:
-            user_id: The ID of the user to update
-            user_inc: The statistics to increment
+            game: The completed game
 
         Returns:
-            Optional[UserDBOutput]: The updated user if successful, None otherwise
+            int: Number of players whose statistics were updated, 0 if the game was already applied
 
         Raises:
             DatabaseException: If there's an error updating the stats
         """
         try:
-            return await self.repository.increment_user_stats(user_id, user_inc)
+            return await self.repository.apply_game_results(game)
         except DatabaseException as e:
-            raise DatabaseException(detail=f"Failed to update user stats: {str(e)}")
+            raise DatabaseException(detail=f"Failed to apply game results: {str(e)}")
         except Exception as e:
-            raise DatabaseException(detail=f"Unexpected error during stats update: {str(e)}")
-
-    async def update_win_rate(self, user_id: str, stats: dict) -> None:
-        """
-        Update a user's overall win rate.
-
-        Args:
-            user_id: The ID of the user
-            stats: Dictionary containing wins and total_games
-
-        Raises:
-            DatabaseException: If there's an error updating the win rate
-        """
-        try:
-            total_games = stats.get("total_games", 0)
-            win_rate = (stats["wins"] / total_games) * 100 if total_games > 0 else 0.0
-            await self.update(user_id, {"stats.win_rate": win_rate})
-        except Exception as e:
-            raise DatabaseException(detail=f"Failed to update win rate: {str(e)}")
-
-    async def update_monthly_win_rates(self, user_id: str, stats: List[dict]) -> None:
-        """
-        Update a user's monthly win rates.
-
-        Args:
-            user_id: The ID of the user
-            stats: List of dictionaries containing monthly statistics
-
-        Raises:
-            DatabaseException: If there's an error updating the win rates
-        """
-        try:
-            for month_data in stats:
-                month_str = month_data["_id"]
-                wins = month_data.get("wins", 0)
-                total = month_data.get("total_games", 0)
-                month_win_rate = (wins / total) * 100 if total > 0 else 0.0
-                await self.repository.update_monthly_stats(user_id, month_str, month_win_rate)
-        except Exception as e:
-            raise DatabaseException(detail=f"Failed to update monthly win rates: {str(e)}")
-
-    async def update_user_monthly_stats(self, user_id: str, month: str, user_inc: MonthlyStats) -> Optional[
-        StatisticsDBOutput]:
-        """
-        Update a user's monthly statistics.
-
-        Args:
-            user_id: The ID of the user
-            month: The month to update stats for
-            user_inc: The statistics to update
-
-        Returns:
-            Optional[UserDBOutput]: The updated user if successful, None otherwise
-
-        Raises:
-            DatabaseException: If there's an error updating the stats
-        """
-        try:
-            ok = await self.repository.upsert_monthly_stats(user_id, month, user_inc)
-            if not ok:
-                raise DatabaseException(detail="Failed to update monthly stats")
-            return ok
-        except DatabaseException as e:
-            raise DatabaseException(detail=f"Failed to update monthly stats: {str(e)}")
-        except Exception as e:
-            raise DatabaseException(detail=f"Unexpected error updating monthly stats: {str(e)}")
+            raise DatabaseException(detail=f"Unexpected error applying game results: {str(e)}")
 
     def get_user_monthly_change_stats(self, user_stats: StatisticsDBOutput) -> MonthlyChangesStats:
         """
@@ -240,7 +172,7 @@ class StatisticsService(BaseService[StatisticsBase, StatisticsDBOutput]):
                 players=player_count,
                 duration=f"{game.duration.hours}h {game.duration.minutes}m",
                 profit_loss=player_data.net_profit,
-                total_buy_in=sum([buyin.amount for buyin in player_data.buy_ins]),
+                total_buy_in=player_data.buy_in_total,
                 total_pot=game.total_pot,
                 status=game.status,
             )
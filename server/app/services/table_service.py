@@ -1,11 +1,12 @@
 import logging
 from datetime import datetime, UTC
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 
 from app.core.exceptions import (
     DatabaseException,
     NotFoundException,
-    PermissionDeniedException
+    PermissionDeniedException,
+    ValidationException
 )
 from app.repositories.table_repository import TableRepository
 from app.schemas.table import TableBase, TableDBInput, TableDBOutput, PlayerStatusEnum, PlayerStatus, TableCountResponse
@@ -104,12 +105,51 @@ class TableService(BaseService[TableDBInput, TableDBOutput]):
         except Exception as e:
             raise DatabaseException(detail=f"Failed to get tables: {str(e)}")
 
+    async def get_tables_page(
+            self,
+            current_user: UserResponse,
+            table_status: Optional[str] = None,
+            skip: int = 0,
+            limit: int = 100,
+            cursor: Optional[str] = None
+    ) -> Tuple[List[TableDBOutput], Optional[str]]:
+        """
+        Get a page of the tables where the current user is a player.
+        
+        Args:
+            current_user: The user to get tables for
+            table_status: Optional status to filter by
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            cursor: The `next_cursor` of the previous page
+            
+        Returns:
+            Tuple[List[TableDBOutput], Optional[str]]: The tables, and the cursor of the next page
+            
+        Raises:
+            ValidationException: If the cursor is malformed
+            DatabaseException: If there's an error fetching tables
+        """
+        try:
+            return await self.repository.page_for_user(
+                str(current_user.id),
+                status=table_status,
+                skip=skip,
+                limit=limit,
+                cursor=cursor
+            )
+        except ValidationException:
+            raise
+        except Exception as e:
+            raise DatabaseException(detail=f"Failed to get tables: {str(e)}")
+
     async def get_created_tables(
             self,
             current_user: UserResponse,
             table_status: Optional[str] = None,
             skip: int = 0,
-            limit: int = 100
+            limit: int = 100,
+            cursor: Optional[str] = None
     ) -> TableCountResponse:
         """
         Get created tables where the current user is a player.
@@ -119,11 +159,13 @@ class TableService(BaseService[TableDBInput, TableDBOutput]):
             table_status: Optional status to filter by
             skip: Number of records to skip
             limit: Maximum number of records to return
+            cursor: The `next_cursor` of the previous page
 
         Returns:
             List[TableDBOutput]: List of tables matching the criteria
 
         Raises:
+            ValidationException: If the cursor is malformed
             DatabaseException: If there's an error fetching tables
         """
         try:
@@ -131,8 +173,11 @@ class TableService(BaseService[TableDBInput, TableDBOutput]):
                 str(current_user.id),
                 status=table_status,
                 skip=skip,
-                limit=limit
+                limit=limit,
+                cursor=cursor
             )
+        except ValidationException:
+            raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to get tables: {str(e)}")
 
@@ -141,7 +186,8 @@ class TableService(BaseService[TableDBInput, TableDBOutput]):
             current_user: UserResponse,
             table_status: Optional[str] = None,
             skip: int = 0,
-            limit: int = 100
+            limit: int = 100,
+            cursor: Optional[str] = None
     ) -> TableCountResponse:
         """
         Get tables where the current user is a player.
@@ -151,11 +197,13 @@ class TableService(BaseService[TableDBInput, TableDBOutput]):
             table_status: Optional status to filter by
             skip: Number of records to skip
             limit: Maximum number of records to return
+            cursor: The `next_cursor` of the previous page
 
         Returns:
             List[TableDBOutput]: List of tables matching the criteria
 
         Raises:
+            ValidationException: If the cursor is malformed
             DatabaseException: If there's an error fetching tables
         """
         try:
@@ -163,8 +211,11 @@ class TableService(BaseService[TableDBInput, TableDBOutput]):
                 str(current_user.id),
                 status=table_status,
                 skip=skip,
-                limit=limit
+                limit=limit,
+                cursor=cursor
             )
+        except ValidationException:
+            raise
         except Exception as e:
             raise DatabaseException(detail=f"Failed to get tables: {str(e)}")
 
@@ -0,0 +1,195 @@
+"""
+Checks the buy-in and cash-out accounting of a game under concurrent requests.
+
+Seeds a database with `app.mock_data`, resets the accounting of the game
+with the most players, then fires --requests buy-ins at once through
+`GameService`, spread over its players, and checks that every one of them
+is counted in total_pot, available_cash_out and the player's buy_in_total,
+and appended to the ledger with its own sequence number.
+It then fires as many cash-outs at once, asking for more than the game
+holds in total, and checks that the accepted ones never overdraw
+available_cash_out, that every player's cash_out and net_profit match, and
+that the ledger holds every accepted event once, numbered without gaps,
+with none left pending on the game.
+Finally the rest is cashed out and the game ended, which only succeeds if
+the totals balance. The check fails, with exit status 1, on any mismatch.
+
+By default the check runs on an in-memory Motor stand-in (requires the
+optional `mongomock-motor` package), which applies the requests one at a
+time. Pass --mongo-url to run it against a local mongod, where they
+interleave (the --db-name database is wiped and re-seeded).
+
+Usage (from the server directory):
+    python -m benchmarks.buyin_stress_check --mongo-url mongodb://localhost:27017 --requests 100
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+from collections import defaultdict
+from typing import Dict, List
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings the app reads at import time; existing values win."""
+    os.environ.setdefault("SECRET_KEY", "buyin-stress-check")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("CORS_ORIGINS", "[]")
+    os.environ.setdefault("MONGODB_URL", args.mongo_url or "mongodb://in-memory")
+    os.environ.setdefault("MONGODB_DB_NAME", args.db_name)
+
+
+async def seed(db) -> Dict:
+    from app.mock_data import generate_data
+    from app.schemas.game import GameStatusEnum
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = generate_data()
+        while not data["games"]:
+            data = generate_data()
+    for collection, documents in data.items():
+        await db[collection].delete_many({})
+        await db[collection].insert_many(documents)
+
+    game = max(data["games"], key=lambda g: len(g["players"]))
+    players = [
+        {**player, "buy_ins": [], "buy_in_total": 0, "cash_out": 0, "net_profit": 0} for player in game["players"]
+    ]
+    await db.games.update_one({"_id": game["_id"]}, {"$set": {
+        "status": GameStatusEnum.IN_PROGRESS.value,
+        "total_pot": 0,
+        "available_cash_out": 0,
+        "ledger_seq": 0,
+        "players": players,
+    }})
+    await db.game_ledger.delete_many({})
+    return game
+
+
+def check(failures: List[str], label: str, actual, expected) -> None:
+    if actual != expected:
+        failures.append(f"{label}: {actual}, expected {expected}")
+
+
+async def main(args: argparse.Namespace) -> int:
+    from app.core.config import settings
+    from app.core.exceptions import ValidationException
+    from app.repositories.game_repository import GameRepository
+    from app.schemas.game import BuyIn, CashOut
+    from app.schemas.user import UserResponse
+    from app.services.game_service import GameService
+
+    if args.mongo_url is None:
+        from tests.mongomock_shims import in_memory_client
+        client = in_memory_client()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url, tz_aware=True)
+    db = client[settings.MONGODB_DB_NAME]
+    game = await seed(db)
+    game_id = str(game["_id"])
+    users = {str(u["_id"]): u for u in await db.users.find().to_list(length=None)}
+    players = [
+        UserResponse(_id=p["user_id"], username=p["username"], email=users[str(p["user_id"])]["email"])
+        for p in game["players"]
+    ]
+    rng = random.Random(args.seed)
+    failures: List[str] = []
+
+    def service() -> GameService:
+        # A service per request, as the API builds them
+        return GameService(GameRepository(db))
+
+    # Whole amounts keep the sums exact
+    buy_ins = [(players[i % len(players)], rng.randint(1, 100)) for i in range(args.requests)]
+    await asyncio.gather(*(
+        service().update_player_buyin(game_id, player, BuyIn(amount=amount)) for player, amount in buy_ins
+    ))
+    bought: Dict[str, float] = defaultdict(float)
+    counts: Dict[str, int] = defaultdict(int)
+    for player, amount in buy_ins:
+        bought[str(player.id)] += amount
+        counts[str(player.id)] += 1
+    pot = sum(bought.values())
+
+    doc = await db.games.find_one({"_id": game["_id"]})
+    check(failures, "total_pot after buy-ins", doc["total_pot"], pot)
+    check(failures, "available_cash_out after buy-ins", doc["available_cash_out"], pot)
+    for player in doc["players"]:
+        check(failures, f"{player['username']} buy_in_total", player["buy_in_total"], bought[player["user_id"]])
+    served: Dict[str, int] = defaultdict(int)
+    after_seq = 0
+    while after_seq is not None:
+        entries, after_seq = await service().get_ledger(game_id, after_seq, limit=25)
+        for entry in entries:
+            served[entry.user_id] += 1
+    for player in doc["players"]:
+        check(failures, f"{player['username']} buy-ins served", served[player["user_id"]], counts[player["user_id"]])
+
+    # Twice the pot is asked for in total, so some cash-outs must be refused
+    cash_outs = [(players[i % len(players)], rng.randint(1, int(4 * pot / args.requests) + 1))
+                 for i in range(args.requests)]
+
+    async def cash_out(player: UserResponse, amount: int) -> float:
+        try:
+            await service().update_player_cashout(game_id, player, CashOut(amount=amount))
+            return amount
+        except ValidationException:
+            return 0
+
+    accepted = await asyncio.gather(*(cash_out(player, amount) for player, amount in cash_outs))
+    cashed: Dict[str, float] = defaultdict(float)
+    for (player, _), amount in zip(cash_outs, accepted):
+        cashed[str(player.id)] += amount
+    refused = sum(1 for amount in accepted if not amount)
+
+    doc = await db.games.find_one({"_id": game["_id"]})
+    entries = await db.game_ledger.find({"game_id": game_id}).sort("seq", 1).to_list(length=None)
+    check(failures, "ledger sequence", [e["seq"] for e in entries], list(range(1, doc["ledger_seq"] + 1)))
+    check(failures, "ledger entries", len(entries), len(buy_ins) + len(accepted) - refused)
+    check(failures, "entries left pending", len(doc.get("ledger_pending", [])), 0)
+    for kind, expected in (("buy_in", pot), ("cash_out", sum(cashed.values()))):
+        check(failures, f"ledger {kind} total", sum(e["amount"] for e in entries if e["type"] == kind), expected)
+    if doc["available_cash_out"] < 0:
+        failures.append(f"available_cash_out overdrawn: {doc['available_cash_out']}")
+    check(failures, "available_cash_out after cash-outs", doc["available_cash_out"], pot - sum(cashed.values()))
+    for player in doc["players"]:
+        check(failures, f"{player['username']} cash_out", player["cash_out"], cashed[player["user_id"]])
+        check(failures, f"{player['username']} net_profit", player["net_profit"],
+              cashed[player["user_id"]] - bought[player["user_id"]])
+
+    if doc["available_cash_out"] > 0:
+        await service().update_player_cashout(game_id, players[0], CashOut(amount=doc["available_cash_out"]))
+    try:
+        await service().end_game(game_id)
+    except ValidationException as e:
+        failures.append(f"end_game refused: {e.detail}")
+    client.close()
+
+    print(f"{args.requests} concurrent buy-ins over {len(players)} players, pot {pot:g}; "
+          f"{args.requests} concurrent cash-outs, {refused} refused")
+    for failure in failures:
+        print(f"  FAIL {failure}")
+    print("accounting consistent" if not failures else f"{len(failures)} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=None, help="local mongod to use instead of the in-memory stand-in")
+    parser.add_argument("--db-name", default="PokerTrackerStressCheck")
+    parser.add_argument("--requests", type=int, default=100, help="concurrent buy-ins, then cash-outs, per game")
+    parser.add_argument("--seed", type=int, default=0)
+    arguments = parser.parse_args()
+
+    configure_environment(arguments)
+    shims = contextlib.nullcontext()
+    if arguments.mongo_url is None:
+        from tests.mongomock_shims import mongomock_shims
+        shims = mongomock_shims()
+    with shims:
+        sys.exit(asyncio.run(main(arguments)))
@@ -0,0 +1,256 @@
+"""
+Checks that every repository query is served by an index.
+
+Seeds a database with `app.mock_data`, reconciles the indexes the
+repositories declare, then calls the repository methods behind the API
+while recording each query they send. Every recorded query is run through
+`explain` and the check fails, with exit status 1, if any winning plan
+scans a whole collection (a COLLSCAN stage).
+
+`explain` needs a real server: pass --mongo-url for a local mongod (the
+--db-name database is wiped and re-seeded). Without it, the queries are
+recorded against the in-memory stand-in (requires the optional
+`mongomock-motor` package) and listed, without being explained.
+
+The test suite runs the same check when MONGO_TEST_URL is set
+(tests/test_indexes.py).
+
+Usage (from the server directory):
+    python -m benchmarks.index_usage_check --mongo-url mongodb://localhost:27017
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+from datetime import datetime, UTC
+from typing import Any, Dict, Iterator, List
+
+from bson import SON
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings the app reads at import time; existing values win."""
+    os.environ.setdefault("SECRET_KEY", "index-usage-check")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("CORS_ORIGINS", "[]")
+    os.environ.setdefault("MONGODB_URL", args.mongo_url or "mongodb://in-memory")
+    os.environ.setdefault("MONGODB_DB_NAME", args.db_name)
+
+
+class RecordingCursor:
+    """Wraps a Motor cursor, recording the sort and limit applied to the query."""
+
+    def __init__(self, cursor, command: Dict[str, Any]):
+        self._cursor = cursor
+        self._command = command
+
+    def sort(self, key_or_list, direction=None):
+        keys = [(key_or_list, direction)] if isinstance(key_or_list, str) else list(key_or_list)
+        self._command["sort"] = SON(keys)
+        self._cursor = self._cursor.sort(key_or_list, direction)
+        return self
+
+    def skip(self, skip: int):
+        self._command["skip"] = skip
+        self._cursor = self._cursor.skip(skip)
+        return self
+
+    def limit(self, limit: int):
+        self._command["limit"] = limit
+        self._cursor = self._cursor.limit(limit)
+        return self
+
+    def __aiter__(self):
+        return self._cursor.__aiter__()
+
+    def __getattr__(self, name: str):
+        return getattr(self._cursor, name)
+
+
+class RecordingCollection:
+    """Wraps a Motor collection, recording every query as the command `explain` takes."""
+
+    def __init__(self, collection, queries: List[Dict[str, Any]]):
+        self._collection = collection
+        self._queries = queries
+
+    def _record(self, command: Dict[str, Any]) -> Dict[str, Any]:
+        self._queries.append(command)
+        return command
+
+    def find(self, filter_=None, projection=None, *args, **kwargs):
+        command = self._record(SON([("find", self._collection.name), ("filter", filter_ or {})]))
+        return RecordingCursor(self._collection.find(filter_, projection, *args, **kwargs), command)
+
+    async def find_one(self, filter_=None, *args, **kwargs):
+        self._record(SON([("find", self._collection.name), ("filter", filter_ or {}), ("limit", 1)]))
+        return await self._collection.find_one(filter_, *args, **kwargs)
+
+    async def count_documents(self, filter_, *args, **kwargs):
+        self._record(SON([("count", self._collection.name), ("query", filter_)]))
+        return await self._collection.count_documents(filter_, *args, **kwargs)
+
+    async def find_one_and_update(self, filter_, update, *args, **kwargs):
+        self._record(SON([("findAndModify", self._collection.name), ("query", filter_), ("update", update)]))
+        return await self._collection.find_one_and_update(filter_, update, *args, **kwargs)
+
+    async def update_one(self, filter_, update, *args, **kwargs):
+        self._record(SON([("update", self._collection.name), ("updates", [{"q": filter_, "u": update}])]))
+        return await self._collection.update_one(filter_, update, *args, **kwargs)
+
+    async def bulk_write(self, requests, *args, **kwargs):
+        for request in requests:
+            # pymongo exposes the filter and update of a write model only as private attributes
+            self._record(SON([("update", self._collection.name), ("updates", [{"q": request._filter, "u": request._doc}])]))
+        return await self._collection.bulk_write(requests, *args, **kwargs)
+
+    def aggregate(self, pipeline, *args, **kwargs):
+        self._record(SON([("aggregate", self._collection.name), ("pipeline", pipeline), ("cursor", {})]))
+        return self._collection.aggregate(pipeline, *args, **kwargs)
+
+    def __getattr__(self, name: str):
+        return getattr(self._collection, name)
+
+
+class RecordingDatabase:
+    """Hands out query recording collections."""
+
+    def __init__(self, db, queries: List[Dict[str, Any]]):
+        self._db = db
+        self._queries = queries
+
+    def __getattr__(self, name: str) -> RecordingCollection:
+        return RecordingCollection(self._db[name], self._queries)
+
+
+async def seed(db) -> Dict:
+    from app.mock_data import generate_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = generate_data()
+        while not data["games"]:
+            data = generate_data()
+    for collection, documents in data.items():
+        await db[collection].delete_many({})
+        await db[collection].insert_many(documents)
+    return data
+
+
+async def run_repository_queries(db, data: Dict) -> None:
+    """Call the repository methods behind the API, with IDs of the seeded documents."""
+    from app.repositories.game_repository import GameRepository
+    from app.repositories.statistics_repository import StatisticsRepository
+    from app.repositories.table_repository import TableRepository
+    from app.repositories.user_repository import UserRepository
+    from app.schemas.game import GameDBOutput
+
+    users, tables, games = UserRepository(db), TableRepository(db), GameRepository(db)
+    statistics = StatisticsRepository(db)
+    game = data["games"][0]
+    player_id = game["players"][0]["user_id"]
+    user = next(u for u in data["users"] if str(u["_id"]) == str(player_id))
+    user_id, table_id = str(user["_id"]), str(game["table_id"])
+
+    await users.get_auth_user(user["username"])
+    await users.get_by_email(user["email"])
+    await users.get_user_friends(user_id)
+    await users.get_user_invited_friends(user_id)
+    await users.search_users(user_id, user["username"][:3])
+
+    _, cursor = await tables.page_for_user(user_id, limit=1)
+    await tables.page_for_user(user_id, status=game["status"], limit=1, cursor=cursor)
+    created = await tables.list_created(user_id, limit=1)
+    await tables.list_created(user_id, status=game["status"], limit=1, cursor=created.next_cursor)
+    await tables.list_invited(user_id, limit=1)
+
+    _, cursor = await games.page_for_player(user_id, limit=1)
+    await games.page_for_player(user_id, table_id=table_id, status=game["status"], limit=1, cursor=cursor)
+    async for _ in games.stream_for_player(user_id):
+        pass
+    await games.count_for_player(user_id)
+    await games.count_for_table(table_id)
+    await games.list_recent_for_player(user_id)
+    await games.get_user_stats_rate(user_id)
+    await games.get_user_monthly_stats_rates(user_id)
+    await games.ledger.list_for_game(str(game["_id"]))
+    await games.reconcile_pending_ledger(datetime.now(UTC))
+
+    await statistics.get_all_user_stats(user_id)
+    await statistics.apply_game_results(GameDBOutput.model_validate(game))
+
+
+def winning_plans(explain: Any) -> Iterator[Any]:
+    """Every winning plan of an explain output, including those of the stages of a pipeline."""
+    if isinstance(explain, dict):
+        for key, value in explain.items():
+            if key == "winningPlan":
+                yield value
+            else:
+                yield from winning_plans(value)
+    elif isinstance(explain, list):
+        for item in explain:
+            yield from winning_plans(item)
+
+
+def scans_collection(plan: Any) -> bool:
+    if isinstance(plan, dict):
+        return plan.get("stage") == "COLLSCAN" or any(scans_collection(value) for value in plan.values())
+    if isinstance(plan, list):
+        return any(scans_collection(item) for item in plan)
+    return False
+
+
+async def main(args: argparse.Namespace) -> int:
+    from app.core.config import settings
+    from app.db.indexes import reconcile_indexes
+
+    in_memory = args.mongo_url is None
+    if in_memory:
+        from tests.mongomock_shims import in_memory_client
+        client = in_memory_client()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url, tz_aware=True)
+    db = client[settings.MONGODB_DB_NAME]
+    data = await seed(db)
+    await reconcile_indexes(db)
+
+    queries: List[Dict[str, Any]] = []
+    await run_repository_queries(RecordingDatabase(db, queries), data)
+
+    failures = 0
+    for command in queries:
+        summary = f"{next(iter(command))} {command[next(iter(command))]}: " + str(
+            {key: value for key, value in command.items() if key in ("filter", "query", "sort", "pipeline", "updates")}
+        )
+        if in_memory:
+            print(f"{'-':>8}  {summary}")
+            continue
+        explain = await db.command(SON([("explain", command), ("verbosity", "queryPlanner")]))
+        collscan = any(scans_collection(plan) for plan in winning_plans(explain))
+        failures += collscan
+        print(f"{'COLLSCAN' if collscan else 'ok':>8}  {summary}")
+
+    if in_memory:
+        print(f"{len(queries)} queries recorded; pass --mongo-url to explain them")
+        return 0
+    print(f"{len(queries)} queries, {failures} not backed by an index")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mongo-url", default=None, help="local mongod to explain the queries on")
+    parser.add_argument("--db-name", default="PokerTrackerIndexCheck")
+    arguments = parser.parse_args()
+
+    configure_environment(arguments)
+    shims = contextlib.nullcontext()
+    if arguments.mongo_url is None:
+        from tests.mongomock_shims import mongomock_shims
+        shims = mongomock_shims()
+    with shims:
+        sys.exit(asyncio.run(main(arguments)))
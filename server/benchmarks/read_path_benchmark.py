@@ -0,0 +1,122 @@
+"""
+Microbenchmark for building game read models from stored documents.
+
+Compares, for batches of 100, 1k and 10k game documents shaped like the
+ones in the games collection:
+- validate: `GameDBOutput.model_validate(doc)` per document, as the
+  repositories do
+- construct: `model_construct` applied recursively to the nested models,
+  skipping validation altogether
+
+Run with --no-gc to leave the cyclic garbage collector out of the timings;
+with it enabled, large batches mostly measure collections of the young
+objects the models are made of.
+
+Usage (from the server directory):
+    python -m benchmarks.read_path_benchmark --sizes 100 1000 10000 --players 8
+"""
+import argparse
+import gc
+import sys
+import time
+from datetime import datetime, timedelta, UTC
+from typing import Callable, Dict
+
+from bson import ObjectId
+
+from app.schemas.game import BuyIn, Duration, GameDBOutput, GamePlayer, GameStatusEnum, NotableHand
+
+
+def make_game(players: int, buy_ins: int) -> Dict:
+    """A completed game document as the repositories store it, its buy-ins totalled from the ledger."""
+    date = datetime.now(UTC) - timedelta(days=3)
+    return {
+        "_id": ObjectId(),
+        "table_id": str(ObjectId()),
+        "date": date,
+        "venue": "Home Game",
+        "status": "completed",
+        "duration": {"hours": 4, "minutes": 30},
+        "creator_id": str(ObjectId()),
+        "total_pot": 100.0 * players * buy_ins,
+        "available_cash_out": 0.0,
+        # One ledger entry per buy-in, plus one cash-out per player
+        "ledger_seq": players * (buy_ins + 1),
+        "created_at": date,
+        "updated_at": date,
+        "players": [
+            {
+                "user_id": str(ObjectId()),
+                "username": f"user_{i}",
+                "buy_ins": [],
+                "buy_in_total": 100.0 * buy_ins,
+                "cash_out": 120.0 * buy_ins,
+                "net_profit": 20.0 * buy_ins,
+                "notable_hands": [{"hand_id": f"hand_{i}", "description": "Rivered a flush", "amount_won": 80.0}],
+            }
+            for i in range(players)
+        ],
+    }
+
+
+def construct_game(doc: Dict) -> GameDBOutput:
+    """Build a game without validation; nested models must be constructed by hand."""
+    players = [
+        GamePlayer.model_construct(
+            user_id=player["user_id"],
+            username=player["username"],
+            buy_ins=[BuyIn.model_construct(**buy_in) for buy_in in player["buy_ins"]],
+            buy_in_total=player["buy_in_total"],
+            cash_out=player["cash_out"],
+            net_profit=player["net_profit"],
+            notable_hands=[NotableHand.model_construct(**hand) for hand in player["notable_hands"]],
+        )
+        for player in doc["players"]
+    ]
+    return GameDBOutput.model_construct(
+        **{**doc, "_id": str(doc["_id"]), "status": GameStatusEnum(doc["status"]),
+           "duration": Duration.model_construct(**doc["duration"]), "players": players}
+    )
+
+
+def best_of(repeat: int, run: Callable[[], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--buy-ins", type=int, default=3)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--no-gc", action="store_true", help="disable the garbage collector while timing")
+    args = parser.parse_args()
+    if args.no_gc:
+        gc.disable()
+
+    paths = {
+        "validate": lambda docs: [GameDBOutput.model_validate(doc) for doc in docs],
+        "construct": lambda docs: [construct_game(doc) for doc in docs],
+    }
+
+    sample = make_game(args.players, args.buy_ins)
+    assert paths["construct"]([sample])[0] == paths["validate"]([sample])[0], "construction diverged"
+
+    print(f"{args.players} players x {args.buy_ins} buy-ins per game, best of {args.repeat}, "
+          f"gc {'off' if args.no_gc else 'on'}, documents/s")
+    print(f"{'games':>7} | " + " | ".join(f"{name:>10}" for name in paths) + f" | {'speedup':>7}")
+    for size in args.sizes:
+        docs = [make_game(args.players, args.buy_ins) for _ in range(size)]
+        rates = {name: size / best_of(args.repeat, lambda: path(docs)) for name, path in paths.items()}
+        print(f"{size:>7} | " + " | ".join(f"{rate:>10.0f}" for rate in rates.values())
+              + f" | {rates['construct'] / rates['validate']:>6.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
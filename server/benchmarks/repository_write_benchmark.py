@@ -0,0 +1,212 @@
+"""
+Latency benchmark for the write endpoints of games and tables.
+
+Calls the service method behind each write endpoint against a database
+seeded with `app.mock_data`, and reports the database round trips and the
+latency per request. Every mutation is timed twice: with the single round
+trip `find_one_and_update` the repositories use, and with the previous
+`update_one` followed by a `get_by_id`, for comparison.
+
+Each collection call can be delayed by --rtt-ms to emulate the network
+round trip to a remote database. By default the database is an in-memory
+Motor stand-in (requires the optional `mongomock-motor` package); pass
+--mongo-url to run against a local mongod instead (the --db-name database
+is wiped and re-seeded).
+
+Usage (from the server directory):
+    python -m benchmarks.repository_write_benchmark --requests 200 --rtt-ms 1
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import statistics
+import sys
+import time
+from typing import Awaitable, Callable, Dict, List
+
+ROUND_TRIP_METHODS = {
+    "find_one", "find_one_and_update", "update_one", "insert_one", "delete_one", "count_documents"
+}
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings the app reads at import time; existing values win."""
+    os.environ.setdefault("SECRET_KEY", "repository-write-benchmark")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("CORS_ORIGINS", "[]")
+    os.environ.setdefault("MONGODB_URL", args.mongo_url or "mongodb://in-memory")
+    os.environ.setdefault("MONGODB_DB_NAME", args.db_name)
+
+
+class RoundTripCollection:
+    """Wraps a Motor collection, counting (and optionally delaying) every call that reaches the server."""
+
+    def __init__(self, collection, counter: Dict[str, int], rtt: float):
+        self._collection = collection
+        self._counter = counter
+        self._rtt = rtt
+
+    def __getattr__(self, name: str):
+        attribute = getattr(self._collection, name)
+        if name not in ROUND_TRIP_METHODS:
+            return attribute
+
+        async def call(*args, **kwargs):
+            self._counter["round_trips"] += 1
+            if self._rtt:
+                await asyncio.sleep(self._rtt)
+            return await attribute(*args, **kwargs)
+
+        return call
+
+
+class RoundTripDatabase:
+    """Hands out round-trip counting collections."""
+
+    def __init__(self, db, counter: Dict[str, int], rtt: float):
+        self._db = db
+        self._counter = counter
+        self._rtt = rtt
+
+    def __getattr__(self, name: str) -> RoundTripCollection:
+        return RoundTripCollection(self._db[name], self._counter, self._rtt)
+
+
+async def update_then_read(self, filter_: dict, update: dict):
+    """The mutation pattern the repositories used before: write, then read the document back by ID."""
+    await self.collection.update_one(filter_, update)
+    id_str = str(filter_["_id"])
+    await self._invalidate(id_str)
+    return await self.get_by_id(id_str)
+
+
+async def seed(db) -> Dict:
+    from app.mock_data import generate_data
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = generate_data()
+        while not data["games"]:
+            data = generate_data()
+    for collection, documents in data.items():
+        await db[collection].delete_many({})
+        await db[collection].insert_many(documents)
+
+    game = max(data["games"], key=lambda g: len(g["players"]))
+    # Enough chips in play for every cash-out the benchmark fires
+    await db.games.update_one({"_id": game["_id"]}, {"$set": {"available_cash_out": 10 ** 9}})
+    users = {str(user["_id"]): user for user in data["users"]}
+    for table in data["tables"]:
+        seated = {p["user_id"] for p in table["players"]}
+        outsiders = [u for u in data["users"] if str(u["_id"]) not in seated]
+        if seated and outsiders:
+            return {"game": game, "table": table, "users": users, "outsider": outsiders[0]}
+    raise RuntimeError("no table with both players and uninvited users, run again")
+
+
+def build_endpoints(seeded: Dict, game_service, table_service) -> Dict[str, Callable[[], Awaitable]]:
+    from app.schemas.game import BuyIn, CashOut, GameUpdate
+    from app.schemas.table import PlayerStatusEnum
+    from app.schemas.user import UserResponse
+
+    def user(user_id: str) -> UserResponse:
+        found = seeded["users"][user_id]
+        return UserResponse(_id=found["_id"], username=found["username"], email=found["email"])
+
+    game_id, table_id = str(seeded["game"]["_id"]), str(seeded["table"]["_id"])
+    player = user(seeded["game"]["players"][0]["user_id"])
+    creator = user(seeded["table"]["creator_id"])
+    invitee = seeded["table"]["players"][0]["user_id"]
+    outsider = {"user_id": str(seeded["outsider"]["_id"]), "username": seeded["outsider"]["username"]}
+
+    endpoints = {
+        "PUT /games/{id}/buyin": lambda: game_service.update_player_buyin(game_id, player, BuyIn(amount=10)),
+        "PUT /games/{id}/cashout": lambda: game_service.update_player_cashout(game_id, player, CashOut(amount=1)),
+        "PUT /games/{id}": lambda: game_service.update_game(game_id, GameUpdate(venue="Benchmark Room")),
+        "PUT /tables/{id}": lambda: table_service.update_table(table_id, {"description": "benchmark"}),
+        "PUT /tables/{id}/invite": lambda: table_service.invite_players(table_id, creator, [outsider]),
+        "PUT /tables/{id}/{player_status}": lambda: table_service.respond_to_invite(
+            table_id, invitee, PlayerStatusEnum.CONFIRMED
+        ),
+    }
+    return endpoints
+
+
+async def measure(call: Callable[[], Awaitable], counter: Dict[str, int], requests: int) -> Dict[str, float]:
+    await call()  # warm up the caches the way a live worker would
+    counter["round_trips"] = 0
+    latencies: List[float] = []
+    for _ in range(requests):
+        started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - started)
+    return {
+        "round_trips": counter["round_trips"] / requests,
+        "p50": statistics.median(latencies) * 1000,
+        "mean": statistics.fmean(latencies) * 1000,
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    from app.core.config import settings
+    from app.repositories.base import BaseRepository
+    from app.repositories.game_repository import GameRepository
+    from app.repositories.table_repository import TableRepository
+    from app.services.game_service import GameService
+    from app.services.table_service import TableService
+
+    in_memory = args.mongo_url is None
+    if in_memory:
+        from tests.mongomock_shims import in_memory_client
+        client = in_memory_client()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        client = AsyncIOMotorClient(args.mongo_url, tz_aware=True)
+    db = client[settings.MONGODB_DB_NAME]
+    seeded = await seed(db)
+
+    counter = {"round_trips": 0}
+    counted = RoundTripDatabase(db, counter, args.rtt_ms / 1000)
+    game_service = GameService(GameRepository(counted))
+    table_service = TableService(TableRepository(counted))
+    endpoints = build_endpoints(seeded, game_service, table_service)
+
+    single_round_trip = BaseRepository._find_one_and_update
+    results: Dict[str, Dict[str, Dict[str, float]]] = {}
+    for mode, implementation in (("before", update_then_read), ("after", single_round_trip)):
+        BaseRepository._find_one_and_update = implementation
+        for cache in BaseRepository._caches.values():
+            cache.clear()
+        for name, call in endpoints.items():
+            results.setdefault(name, {})[mode] = await measure(call, counter, args.requests)
+    BaseRepository._find_one_and_update = single_round_trip
+
+    print(f"{args.requests} requests per endpoint, {args.rtt_ms} ms emulated round trip, "
+          f"{'in-memory stand-in' if in_memory else args.mongo_url}")
+    print(f"{'endpoint':<34} | {'trips before':>12} | {'trips after':>11} | "
+          f"{'p50 before ms':>13} | {'p50 after ms':>12} | {'drop':>6}")
+    for name, result in results.items():
+        before, after = result["before"], result["after"]
+        drop = (1 - after["p50"] / before["p50"]) * 100 if before["p50"] else float("nan")
+        print(f"{name:<34} | {before['round_trips']:>12.1f} | {after['round_trips']:>11.1f} | "
+              f"{before['p50']:>13.3f} | {after['p50']:>12.3f} | {drop:>5.1f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--rtt-ms", type=float, default=1.0, help="delay added to every database call")
+    parser.add_argument("--mongo-url", default=None, help="local mongod to use instead of the in-memory stand-in")
+    parser.add_argument("--db-name", default="PokerTrackerBenchmark")
+    arguments = parser.parse_args()
+
+    configure_environment(arguments)
+    shims = contextlib.nullcontext()
+    if arguments.mongo_url is None:
+        from tests.mongomock_shims import mongomock_shims
+        shims = mongomock_shims()
+    with shims:
+        asyncio.run(main(arguments))
+        sys.exit(0)
@@ -0,0 +1,121 @@
+"""
+Benchmark for the SSE broker.
+
+Compares idle CPU usage of the push-based broker with the previous 0.5s
+polling loop, and measures publish-to-delivery fan-out latency.
+
+Usage (from the server directory):
+    python -m benchmarks.sse_broker_benchmark --subscribers 1000 10000 --idle-seconds 5
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from datetime import datetime, UTC
+from typing import List
+
+from app.schemas.game import GameDBOutput, GamePlayer
+from app.services.sse_broker import SSEBroker
+
+POLL_INTERVAL = 0.5
+
+
+def make_game() -> GameDBOutput:
+    players = [GamePlayer(user_id="0" * 23 + str(i), username=f"user_{i}") for i in range(9)]
+    return GameDBOutput(
+        table_id="f" * 24,
+        date=datetime.now(UTC),
+        venue="Home Game",
+        players=players,
+        creator_id="e" * 24
+    )
+
+
+async def idle_cpu_polling(subscribers: int, seconds: float) -> float:
+    """CPU seconds burnt by the legacy loop while nothing changes."""
+    state = {"previous": make_game(), "current": make_game()}
+
+    async def client():
+        while True:
+            if state["previous"] != state["current"]:
+                state["previous"] = state["current"]
+            await asyncio.sleep(POLL_INTERVAL)
+
+    tasks = [asyncio.create_task(client()) for _ in range(subscribers)]
+    await asyncio.sleep(0)
+    start = time.process_time()
+    await asyncio.sleep(seconds)
+    used = time.process_time() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return used
+
+
+async def idle_cpu_broker(subscribers: int, seconds: float) -> float:
+    """CPU seconds burnt by broker subscribers while nothing is published."""
+    broker = SSEBroker()
+    subscriptions = [broker.subscribe("games:bench") for _ in range(subscribers)]
+    tasks = [asyncio.create_task(subscription.get()) for subscription in subscriptions]
+    await asyncio.sleep(0)
+    start = time.process_time()
+    await asyncio.sleep(seconds)
+    used = time.process_time() - start
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return used
+
+
+async def fan_out_latency(subscribers: int, rounds: int) -> List[float]:
+    """Latencies (seconds) between a publish and each subscriber waking up."""
+    broker = SSEBroker()
+    latencies: List[float] = []
+    drained = asyncio.Event()
+
+    async def client(subscription):
+        for _ in range(rounds):
+            published_at = await subscription.get()
+            latencies.append(time.perf_counter() - published_at)
+            if len(latencies) % subscribers == 0:
+                drained.set()
+
+    subscriptions = [broker.subscribe("games:bench") for _ in range(subscribers)]
+    tasks = [asyncio.create_task(client(subscription)) for subscription in subscriptions]
+    await asyncio.sleep(0)
+    for _ in range(rounds):
+        drained.clear()
+        broker.publish("games:bench", time.perf_counter())
+        # Let every subscriber drain before the next round
+        await drained.wait()
+    await asyncio.gather(*tasks)
+    return latencies
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def main(subscriber_counts: List[int], idle_seconds: float, rounds: int) -> None:
+    print(f"{'subscribers':>11} | {'poll idle cpu':>13} | {'broker idle cpu':>15} | "
+          f"{'p50 ms':>8} | {'p99 ms':>8} | {'max ms':>8}")
+    for count in subscriber_counts:
+        polling = await idle_cpu_polling(count, idle_seconds)
+        broker = await idle_cpu_broker(count, idle_seconds)
+        latencies = await fan_out_latency(count, rounds)
+        print(f"{count:>11} | {polling / idle_seconds * 100:>12.1f}% | {broker / idle_seconds * 100:>14.1f}% | "
+              f"{percentile(latencies, 50) * 1000:>8.2f} | {percentile(latencies, 99) * 1000:>8.2f} | "
+              f"{max(latencies) * 1000:>8.2f}")
+    print(f"(idle window {idle_seconds}s, {rounds} publish rounds, mean of all deliveries: "
+          f"{statistics.mean(latencies) * 1000:.2f} ms for the last run)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SSE broker idle CPU and fan-out latency benchmark")
+    parser.add_argument("--subscribers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--idle-seconds", type=float, default=5.0)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.subscribers, args.idle_seconds, args.rounds))
@@ -0,0 +1,280 @@
+"""
+Load test for the SSE game stream.
+
+Starts the API with uvicorn in a child process, seeded with `app.mock_data`,
+opens N concurrent SSE clients on /api/events/games/{id}, fires buy-ins
+through PUT /api/games/{id}/buyin and reports end-to-end propagation latency
+percentiles, plus the server's CPU time and peak RSS (from `resource`).
+
+By default the server runs on an in-memory Motor stand-in (requires the
+optional `mongomock-motor` package). Pass --mongo-url to run against a
+local mongod instead; the --db-name database is wiped and re-seeded.
+--mutation cashout updates the game through PUT /api/games/{id}/cashout
+instead.
+
+Usage (from the server directory):
+    python -m benchmarks.sse_load_test --watchers 1000 10000 --buyins 20
+"""
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import resource
+import socket
+import statistics
+import sys
+import time
+import urllib.request
+from typing import Dict, List, Optional
+
+HOST = "127.0.0.1"
+
+
+def configure_environment(args: argparse.Namespace) -> None:
+    """Settings the server reads at import time; existing values win except for the test database."""
+    os.environ.setdefault("SECRET_KEY", "sse-load-test")
+    os.environ.setdefault("ALGORITHM", "HS256")
+    os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+    os.environ.setdefault("CORS_ORIGINS", "[]")
+    os.environ["MONGODB_URL"] = args.mongo_url or "mongodb://in-memory"
+    os.environ["MONGODB_DB_NAME"] = args.db_name
+    # Every watcher connects from the same address, which the per-client cap would otherwise reject
+    os.environ["SSE_MAX_CONNECTIONS"] = str(max(args.watchers) + 100)
+    os.environ["SSE_MAX_CONNECTIONS_PER_USER"] = str(max(args.watchers) + 100)
+
+
+def raise_fd_limit() -> None:
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def server_usage() -> Dict[str, float]:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return {"cpu": usage.ru_utime + usage.ru_stime, "max_rss_mb": usage.ru_maxrss / 1024}
+
+
+async def seed(in_memory: bool) -> Dict[str, str]:
+    """Install the database client, load mock data and pick the game to watch."""
+    from app.core.config import settings
+    from app.core.security import create_access_token
+    from app.db.mongo_client import MongoDB
+    from app.mock_data import generate_data
+
+    if in_memory:
+        from tests.mongomock_shims import in_memory_client
+        MongoDB.client = in_memory_client()
+    else:
+        from motor.motor_asyncio import AsyncIOMotorClient
+        MongoDB.client = AsyncIOMotorClient(settings.MONGODB_URL, tz_aware=True)
+    db = MongoDB.client[settings.MONGODB_DB_NAME]
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        data = generate_data()
+        while not data["games"]:
+            data = generate_data()
+    for collection, documents in data.items():
+        await db[collection].delete_many({})
+        await db[collection].insert_many(documents)
+
+    game = max(data["games"], key=lambda g: len(g["players"]))
+    # Enough chips in play for every cash-out the test may fire
+    await db.games.update_one({"_id": game["_id"]}, {"$set": {"available_cash_out": 10 ** 9}})
+    player_id = game["players"][0]["user_id"]
+    return {"game_id": str(game["_id"]), "token": create_access_token({"sub": player_id})}
+
+
+def run_server(port: int, in_memory: bool, control) -> None:
+    """Child process: serve the app until the harness asks to stop, answering usage queries."""
+    import uvicorn
+
+    async def main():
+        seeded = await seed(in_memory)
+        from app.main import app
+
+        server = uvicorn.Server(uvicorn.Config(app, host=HOST, port=port, log_level="warning", backlog=16384))
+        serving = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+        control.send(seeded)
+        while True:
+            command = await asyncio.to_thread(control.recv)
+            if command == "stop":
+                break
+            control.send(server_usage())
+        server.should_exit = True
+        await serving
+
+    raise_fd_limit()
+    shims = contextlib.nullcontext()
+    if in_memory:
+        from tests.mongomock_shims import mongomock_shims
+        shims = mongomock_shims()
+    with shims:
+        asyncio.run(main())
+
+
+class Watcher:
+    """A raw HTTP/1.1 SSE client recording when each game version arrives."""
+
+    def __init__(self):
+        self.received: Dict[int, float] = {}
+        self.initial_version: Optional[int] = None
+        self.ready = asyncio.Event()
+
+    async def run(self, port: int, path: str) -> None:
+        reader, writer = await asyncio.open_connection(HOST, port)
+        writer.write(f"GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAccept: text/event-stream\r\n\r\n".encode())
+        await writer.drain()
+        status = await reader.readline()
+        if b" 200 " not in status:
+            raise RuntimeError(f"stream refused: {status.decode().strip()}")
+        while await reader.readline() not in (b"\r\n", b""):
+            pass
+        buffer = b""
+        try:
+            while True:
+                size = int((await reader.readline()).strip() or b"0", 16)
+                if size == 0:
+                    return
+                buffer += (await reader.readexactly(size + 2))[:-2]
+                *messages, buffer = buffer.split(b"\n\n")
+                for message in messages:
+                    self.on_message(message)
+        finally:
+            writer.close()
+
+    def on_message(self, message: bytes) -> None:
+        if not message.startswith(b"id: "):
+            return  # keepalive
+        version = int(message[4:message.index(b"\n")].rsplit(b"-", 1)[1])
+        if self.initial_version is None:
+            self.initial_version = version
+            self.ready.set()
+        else:
+            self.received[version - self.initial_version] = time.perf_counter()
+
+
+def put_mutation(port: int, mutation: str, game_id: str, token: str, amount: float) -> None:
+    request = urllib.request.Request(
+        f"http://{HOST}:{port}/api/games/{game_id}/{mutation}",
+        data=json.dumps({"amount": amount}).encode(),
+        headers={"Content-Type": "application/json", "Authorization": f"Bearer {token}"},
+        method="PUT"
+    )
+    with urllib.request.urlopen(request) as response:
+        response.read()
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def load_test(watchers: int, args: argparse.Namespace) -> Dict[str, float]:
+    context = multiprocessing.get_context("spawn")
+    control, child_control = context.Pipe()
+    port = free_port()
+    server = context.Process(target=run_server, args=(port, args.mongo_url is None, child_control))
+    server.start()
+    try:
+        def receive():
+            if not control.poll(args.timeout):
+                raise RuntimeError("server did not answer, see its traceback above")
+            return control.recv()
+
+        seeded = await asyncio.to_thread(receive)
+        path = f"/api/events/games/{seeded['game_id']}"
+
+        clients = [Watcher() for _ in range(watchers)]
+        tasks = []
+        connect_started = time.perf_counter()
+        for start in range(0, watchers, args.batch):
+            batch = clients[start:start + args.batch]
+            tasks += [asyncio.create_task(client.run(port, path)) for client in batch]
+            await asyncio.wait_for(asyncio.gather(*(client.ready.wait() for client in batch)), args.timeout)
+        connect_seconds = time.perf_counter() - connect_started
+
+        def usage() -> Dict[str, float]:
+            control.send("usage")
+            return receive()
+
+        before = await asyncio.to_thread(usage)
+        sent: Dict[int, float] = {}
+        started = time.perf_counter()
+        for round_number in range(1, args.buyins + 1):
+            sent[round_number] = time.perf_counter()
+            await asyncio.to_thread(put_mutation, port, args.mutation, seeded["game_id"], seeded["token"], 10)
+            await asyncio.sleep(args.interval)
+        deadline = time.perf_counter() + args.timeout
+        while time.perf_counter() < deadline and any(len(c.received) < args.buyins for c in clients):
+            await asyncio.sleep(0.05)
+        elapsed = time.perf_counter() - started
+        after = await asyncio.to_thread(usage)
+
+        latencies = [
+            received_at - sent[round_number]
+            for client in clients
+            for round_number, received_at in client.received.items()
+            if round_number in sent
+        ]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        control.send("stop")
+    finally:
+        server.join(10)
+        if server.is_alive():
+            server.kill()
+
+    cpu = after["cpu"] - before["cpu"]
+    return {
+        "watchers": watchers,
+        "connect_s": connect_seconds,
+        "delivered": len(latencies) / (watchers * args.buyins) * 100,
+        "p50": percentile(latencies, 50) * 1000 if latencies else float("nan"),
+        "p95": percentile(latencies, 95) * 1000 if latencies else float("nan"),
+        "p99": percentile(latencies, 99) * 1000 if latencies else float("nan"),
+        "max": max(latencies) * 1000 if latencies else float("nan"),
+        "mean": statistics.fmean(latencies) * 1000 if latencies else float("nan"),
+        "cpu": cpu / elapsed * 100,
+        "rss": after["max_rss_mb"],
+    }
+
+
+async def main(args: argparse.Namespace) -> None:
+    print(f"{'watchers':>8} | {'connect s':>9} | {'delivered':>9} | {'p50 ms':>8} | {'p95 ms':>8} | "
+          f"{'p99 ms':>8} | {'max ms':>8} | {'server cpu':>10} | {'peak rss':>9}")
+    for watchers in args.watchers:
+        r = await load_test(watchers, args)
+        print(f"{r['watchers']:>8} | {r['connect_s']:>9.2f} | {r['delivered']:>8.1f}% | {r['p50']:>8.2f} | "
+              f"{r['p95']:>8.2f} | {r['p99']:>8.2f} | {r['max']:>8.2f} | {r['cpu']:>9.1f}% | "
+              f"{r['rss']:>6.0f} MB")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--watchers", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--buyins", type=int, default=20)
+    parser.add_argument("--interval", type=float, default=0.5, help="seconds between buy-ins")
+    parser.add_argument("--batch", type=int, default=500, help="watchers connecting concurrently")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--mongo-url", default=None, help="local mongod to use instead of the in-memory stand-in")
+    parser.add_argument("--db-name", default="PokerTrackerLoadTest")
+    parser.add_argument("--mutation", choices=["buyin", "cashout"], default="buyin", help="endpoint updating the game")
+    arguments = parser.parse_args()
+
+    configure_environment(arguments)
+    raise_fd_limit()
+    asyncio.run(main(arguments))
+    sys.exit(0)
@@ -0,0 +1,147 @@
+import os
+
+# Settings the app reads at import time; existing values win
+os.environ.setdefault("SECRET_KEY", "tests")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "60")
+os.environ.setdefault("CORS_ORIGINS", "[]")
+os.environ.setdefault("MONGODB_URL", "mongodb://in-memory")
+os.environ.setdefault("MONGODB_DB_NAME", "PokerTrackerTests")
+# Every request made through `client` must stay within the query budget of its route
+os.environ.setdefault("QUERY_BUDGET_MODE", "raise")
+
+import itertools
+import uuid
+from contextvars import ContextVar
+from functools import wraps
+from types import SimpleNamespace
+
+import pytest
+from mongomock.collection import Collection
+
+from app.core.config import settings
+from app.db.query_profiler import query_profiler
+from app.repositories.base import BaseRepository
+from tests.mongomock_shims import SHIMS, in_memory_client
+
+# The command each mongomock method stands for, as the profiler sees it on a real server
+MOCK_COMMANDS = {
+    "find": "find",
+    "find_one": "find",
+    "count_documents": "aggregate",
+    "aggregate": "aggregate",
+    "distinct": "distinct",
+    "insert_one": "insert",
+    "insert_many": "insert",
+    "update_one": "update",
+    "update_many": "update",
+    "replace_one": "update",
+    "bulk_write": "update",
+    "delete_one": "delete",
+    "delete_many": "delete",
+    "find_one_and_update": "findAndModify",
+    "find_one_and_replace": "findAndModify",
+    "find_one_and_delete": "findAndModify",
+}
+
+_mock_call_depth: ContextVar[int] = ContextVar("mock_call_depth", default=0)
+_request_ids = itertools.count()
+
+
+def _recorded(method_name: str, method):
+    """Report a mongomock call to the query profiler, as pymongo's command monitoring would."""
+    command_name = MOCK_COMMANDS[method_name]
+
+    @wraps(method)
+    def call(self, *args, **kwargs):
+        # mongomock implements some methods on top of others: only the outermost call is a command
+        if _mock_call_depth.get():
+            return method(self, *args, **kwargs)
+        query = args[0] if args else kwargs.get("filter", {})
+        if command_name == "aggregate":
+            command = {command_name: self.name, "pipeline": query if isinstance(query, list) else [{"$match": query}]}
+        else:
+            command = {command_name: self.name, "filter": query, "query": query, "updates": [{"q": query}]}
+        event = SimpleNamespace(request_id=next(_request_ids), command_name=command_name, command=command,
+                                duration_micros=0)
+        query_profiler.started(event)
+        token = _mock_call_depth.set(1)
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            _mock_call_depth.reset(token)
+            query_profiler.succeeded(event)
+
+    return call
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+@pytest.fixture
+def mongomock_shims(monkeypatch):
+    """mongomock behaving as MongoDB where the code relies on it, restored after the test."""
+    for owner, name, replacement in SHIMS:
+        monkeypatch.setattr(owner, name, replacement)
+
+
+@pytest.fixture
+def db(mongomock_shims):
+    """An empty in-memory database; the repository caches, shared per collection, start empty too."""
+    BaseRepository._caches.clear()
+    BaseRepository._count_caches.clear()
+    return in_memory_client()[settings.MONGODB_DB_NAME]
+
+
+@pytest.fixture
+async def mongo_db():
+    """
+    A fresh database on the mongod at MONGO_TEST_URL, dropped afterwards; skips the test when unset.
+
+    For the checks only a real server can make, such as query plans.
+    """
+    url = os.environ.get("MONGO_TEST_URL")
+    if not url:
+        pytest.skip("MONGO_TEST_URL is not set")
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    BaseRepository._caches.clear()
+    BaseRepository._count_caches.clear()
+    mongo_client = AsyncIOMotorClient(url, tz_aware=True)
+    database = mongo_client[f"{settings.MONGODB_DB_NAME}_{uuid.uuid4().hex[:12]}"]
+    try:
+        yield database
+    finally:
+        await mongo_client.drop_database(database.name)
+        mongo_client.close()
+
+
+@pytest.fixture
+def client(db, monkeypatch):
+    """The API served on the in-memory database, with its queries reported to the profiler."""
+    from fastapi.testclient import TestClient
+
+    from app.db.mongo_client import MongoDB
+    from app.main import app
+
+    for method_name in MOCK_COMMANDS:
+        monkeypatch.setattr(Collection, method_name, _recorded(method_name, getattr(Collection, method_name)))
+    # Kept by connect_to_mongo, as for the load test
+    MongoDB.client = db.client
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture
+def signup(client):
+    """Sign up a user, returning the headers authenticating as them."""
+    def signup_user(username: str) -> dict:
+        response = client.post(
+            "/api/auth/signup",
+            json={"username": username, "email": f"{username}@example.com", "password": "secret"}
+        )
+        assert response.status_code == 201, response.text
+        return {"Authorization": f"Bearer {response.json()['access_token']}"}
+    return signup_user
@@ -0,0 +1,91 @@
+"""
+The in-memory Motor stand-in the tests and benchmarks run on without a mongod.
+
+Requires the optional `mongomock` and `mongomock-motor` packages (see
+requirements-dev.txt). mongomock's `find_one_and_update` finds the
+document, then applies the update to `{"_id": ...}` alone: a positional
+`players.$` then always targets the first player, where MongoDB targets
+the player the filter matched. Its `bulk_write` also rejects the
+`sort` that recent pymongo versions pass for every update. Its
+expressions, in aggregations and update pipelines, leave array literals
+unevaluated and lack `$mergeObjects`. The shims apply the update with
+the original filter, as MongoDB does, accept updates without a sort, and
+evaluate both expressions; `mongomock_shims` restores mongomock on exit.
+"""
+from contextlib import contextmanager
+from typing import Iterator
+
+from mongomock.aggregate import _Parser
+from mongomock.collection import BulkOperationBuilder, Collection
+from pymongo import ReturnDocument
+
+_find_and_modify = Collection._find_and_modify
+_add_update = BulkOperationBuilder.add_update
+_parse = _Parser.parse
+
+
+def _find_and_modify_positional(self, query, projection=None, update=None, upsert=False, sort=None,
+                                return_document=ReturnDocument.BEFORE, session=None, **kwargs):
+    """`_find_and_modify`, applying the updates returning the new document with their filter."""
+    plain_update = isinstance(update, dict) and not upsert and not kwargs.get("remove")
+    if not plain_update or return_document is not ReturnDocument.AFTER:
+        return _find_and_modify(self, query, projection, update, upsert, sort, return_document, session, **kwargs)
+    old = self.find_one(query, sort=sort)
+    if old is None:
+        return None
+    by_id = {"_id": old["_id"]}
+    self._update({**query, **by_id}, update, upsert)
+    return self.find_one(by_id, projection)
+
+
+def _add_update_unsorted(self, selector, doc, multi=False, upsert=False, collation=None, array_filters=None,
+                         hint=None, sort=None):
+    """`add_update`, accepting the `sort` pymongo passes as long as it is unset."""
+    if sort is not None:
+        raise NotImplementedError("Sorted updates are not implemented in mongomock")
+    return _add_update(self, selector, doc, multi, upsert, collation, array_filters, hint)
+
+
+def _parse_arrays_and_merges(self, expression):
+    """`_Parser.parse`, evaluating the items of array literals and `$mergeObjects`."""
+    if isinstance(expression, list):
+        return [self.parse(item) for item in expression]
+    if isinstance(expression, dict) and list(expression) == ["$mergeObjects"]:
+        merged = {}
+        for value in self.parse_many(expression["$mergeObjects"]):
+            merged.update(value or {})
+        return merged
+    return _parse(self, expression)
+
+
+# (class, attribute, replacement) of every patch
+SHIMS = [
+    (Collection, "_find_and_modify", _find_and_modify_positional),
+    (BulkOperationBuilder, "add_update", _add_update_unsorted),
+    (_Parser, "parse", _parse_arrays_and_merges),
+]
+
+
+@contextmanager
+def mongomock_shims() -> Iterator[None]:
+    """Apply the shims to mongomock until exit."""
+    originals = [(owner, name, getattr(owner, name)) for owner, name, _ in SHIMS]
+    for owner, name, replacement in SHIMS:
+        setattr(owner, name, replacement)
+    try:
+        yield
+    finally:
+        for owner, name, original in originals:
+            setattr(owner, name, original)
+
+
+def in_memory_client():
+    """
+    Build an in-memory Motor client; use it within `mongomock_shims`.
+
+    Returns:
+        AsyncMongoMockClient: A client whose databases start empty
+    """
+    from mongomock_motor import AsyncMongoMockClient
+
+    return AsyncMongoMockClient(tz_aware=True)
@@ -0,0 +1,136 @@
+import asyncio
+import json
+from datetime import datetime, UTC
+
+import msgpack
+import pytest
+from bson import ObjectId
+
+from app.repositories.base import EntityCache
+from app.repositories.game_repository import GameRepository
+from app.repositories.table_repository import TableRepository
+from app.schemas.game import GameBase, GamePlayer, GameUpdate
+from app.services.broadcast import BroadcastBackend, InProcessBackend, UnixSocketRelayBackend
+from app.services.game_service import GameService
+from app.services.sse_service import SSEService, TopicState
+from app.services.table_service import TableService
+
+pytestmark = pytest.mark.anyio
+
+
+async def start_worker(db, socket_path: str) -> SSEService:
+    """An SSE service as a worker builds it, relaying through the socket."""
+    service = SSEService(
+        table_service=TableService(TableRepository(db)),
+        game_service=GameService(GameRepository(db)),
+        backend=UnixSocketRelayBackend(socket_path)
+    )
+    await service.start()
+    return service
+
+
+async def create_game(db) -> str:
+    players = [GamePlayer(user_id=str(ObjectId()), username=f"user_{i}") for i in range(2)]
+    game = GameBase(table_id=str(ObjectId()), date=datetime.now(UTC), venue="Home Game", players=players)
+    created = await GameRepository(db).create_game(game, str(players[0].user_id))
+    return str(created.id)
+
+
+def event_data(message: bytes) -> dict:
+    return json.loads(message.decode().split("data: ", 1)[1])
+
+
+def test_backend_interface_is_abstract():
+    with pytest.raises(TypeError):
+        BroadcastBackend()
+
+
+@pytest.mark.parametrize("publisher_index", [0, 1], ids=["hub publishes", "follower publishes"])
+async def test_game_update_reaches_other_worker(db, tmp_path, publisher_index):
+    socket_path = str(tmp_path / "sse.sock")
+    game_id = await create_game(db)
+    workers = [await start_worker(db, socket_path) for _ in range(2)]
+    assert [worker.backend.is_hub for worker in workers] == [True, False]
+    publisher, subscriber = workers[publisher_index], workers[1 - publisher_index]
+
+    stream = (await subscriber.game_event_stream(None, game_id)).body_iterator
+    try:
+        assert event_data(await anext(stream))["venue"] == "Home Game"
+        updated = await publisher.game_service.update_game(game_id, GameUpdate(venue="Casino"))
+        await publisher.send_game_update(game_id, updated)
+        assert event_data(await asyncio.wait_for(anext(stream), timeout=5))["venue"] == "Casino"
+    finally:
+        await stream.aclose()
+        for worker in reversed(workers):
+            await worker.stop()
+
+
+async def test_hub_disconnects_peer_that_stops_reading(tmp_path):
+    hub = UnixSocketRelayBackend(str(tmp_path / "sse.sock"))
+    hub.PEER_DRAIN_TIMEOUT = 0.2
+    delivered = []
+
+    async def on_message(topic, data, event):
+        delivered.append(topic)
+
+    await hub.start(on_message)
+    reader, writer = await asyncio.open_unix_connection(hub.socket_path)
+    try:
+        assert await reader.readline() == b"\n"
+        # Nothing is read from here on: the peer's buffers fill up until the hub gives up on it
+        payload = {"blob": "x" * 256 * 1024}
+        for i in range(64):
+            await asyncio.wait_for(hub.publish(f"topic:{i}", payload), timeout=hub.PEER_DRAIN_TIMEOUT * 5)
+            if not hub._peers:
+                break
+        assert not hub._peers
+        assert len(delivered) == i + 1
+    finally:
+        writer.close()
+        await hub.stop()
+
+
+async def test_write_invalidates_other_worker_cache(db, tmp_path):
+    socket_path = str(tmp_path / "sse.sock")
+    game_id = await create_game(db)
+    workers = [await start_worker(db, socket_path) for _ in range(2)]
+    try:
+        reader, writer = (worker.game_service.repository for worker in workers)
+        # The writer drops its own entry from a separate cache, as in another process
+        writer.cache = EntityCache(16, 60)
+        assert (await reader.get_by_id(game_id)).venue == "Home Game"
+        await writer.update(game_id, {"venue": "Casino"})
+        for _ in range(50):
+            if reader.cache.get(game_id) is None:
+                break
+            await asyncio.sleep(0.01)
+        assert (await reader.get_by_id(game_id)).venue == "Casino"
+    finally:
+        for worker in reversed(workers):
+            await worker.stop()
+
+
+@pytest.mark.parametrize("backend_name", ["memory", "unix"])
+async def test_message_round_trips_with_the_same_types(tmp_path, backend_name):
+    backend = InProcessBackend() if backend_name == "memory" else UnixSocketRelayBackend(str(tmp_path / "sse.sock"))
+    delivered = asyncio.Queue()
+
+    async def on_message(topic, data, event):
+        await delivered.put(data)
+
+    game = GameBase(
+        table_id=str(ObjectId()),
+        date=datetime(2026, 3, 14, 20, tzinfo=UTC),
+        venue="Home Game",
+        players=[GamePlayer(user_id=str(ObjectId()), username="host")]
+    )
+    await backend.start(on_message)
+    try:
+        await backend.publish("games:1", game)
+        data = await asyncio.wait_for(delivered.get(), timeout=5)
+    finally:
+        await backend.stop()
+
+    frame = msgpack.unpackb(TopicState.from_data("games:1", data, epoch="e").msgpack_message)
+    assert frame["data"] == json.loads(game.model_dump_json(by_alias=True))
+    assert frame["data"]["date"] == "2026-03-14T20:00:00Z"
@@ -0,0 +1,17 @@
+import logging
+
+from app.db import pool_metrics
+from app.db.pool_metrics import available_compressors
+
+
+def test_missing_compressor_is_dropped_with_a_warning(monkeypatch, caplog):
+    find_spec = pool_metrics.importlib.util.find_spec
+    monkeypatch.setattr(
+        pool_metrics.importlib.util, "find_spec", lambda name: None if name == "snappy" else find_spec(name)
+    )
+
+    with caplog.at_level(logging.WARNING, logger=pool_metrics.logger.name):
+        assert available_compressors("snappy, zlib, lz4") == ["zlib"]
+
+    assert "needs the python-snappy package" in caplog.text
+    assert "Unknown MongoDB wire compressor lz4" in caplog.text
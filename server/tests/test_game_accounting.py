@@ -0,0 +1,231 @@
+import asyncio
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from bson import ObjectId
+
+from app.core.config import settings
+from app.core.exceptions import DatabaseException, NotFoundException, ValidationException
+from app.repositories.game_repository import GameRepository
+from app.repositories.ledger_repository import LedgerRepository
+from app.schemas.game import BuyIn, CashOut, GameBase, GamePlayer, GameUpdate
+from app.schemas.ledger import LedgerEntryTypeEnum
+from app.schemas.user import UserResponse
+from app.main import reconcile_ledger_periodically
+from app.services.broadcast import InProcessBackend, UnixSocketRelayBackend
+from app.services.game_service import GameService
+
+pytestmark = pytest.mark.anyio
+
+
+def user(username: str) -> UserResponse:
+    return UserResponse(_id=str(ObjectId()), username=username, email=f"{username}@example.com")
+
+
+async def start_game(db, players) -> str:
+    game = GameBase(
+        table_id=str(ObjectId()),
+        date=datetime.now(UTC),
+        venue="Home Game",
+        players=[GamePlayer(user_id=player.id, username=player.username) for player in players]
+    )
+    return str((await GameRepository(db).create_game(game, str(players[0].id))).id)
+
+
+async def test_concurrent_buy_ins_are_all_counted(db):
+    players = [user(f"player_{i}") for i in range(3)]
+    game_id = await start_game(db, players)
+
+    amounts = [(players[i % 3], 10 * (i + 1)) for i in range(9)]
+    await asyncio.gather(*(
+        GameService(GameRepository(db)).update_player_buyin(game_id, player, BuyIn(amount=amount))
+        for player, amount in amounts
+    ))
+
+    game = await db.games.find_one({"_id": ObjectId(game_id)})
+    pot = sum(amount for _, amount in amounts)
+    assert game["total_pot"] == game["available_cash_out"] == pot
+    assert game["ledger_seq"] == len(amounts)
+    for stored, player in zip(game["players"], players):
+        bought = sum(amount for owner, amount in amounts if owner is player)
+        assert stored["buy_in_total"] == bought
+        assert stored["net_profit"] == -bought
+    assert await db.game_ledger.count_documents({"game_id": game_id}) == len(amounts)
+
+
+async def test_cash_outs_never_overdraw_the_game(db):
+    players = [user("host"), user("guest")]
+    game_id = await start_game(db, players)
+    service = GameService(GameRepository(db))
+    await service.update_player_buyin(game_id, players[0], BuyIn(amount=100))
+    await service.update_player_buyin(game_id, players[1], BuyIn(amount=50))
+
+    async def cash_out(player: UserResponse, amount: float) -> float:
+        try:
+            await GameService(GameRepository(db)).update_player_cashout(game_id, player, CashOut(amount=amount))
+            return amount
+        except ValidationException:
+            return 0
+
+    requests = [(players[i % 2], 40) for i in range(6)]
+    accepted = await asyncio.gather(*(cash_out(player, amount) for player, amount in requests))
+
+    game = await db.games.find_one({"_id": ObjectId(game_id)})
+    assert sum(accepted) == 120
+    assert game["available_cash_out"] == 30
+    host, guest = game["players"]
+    assert guest["cash_out"] == 40 * sum(1 for (p, _), a in zip(requests, accepted) if a and p is players[1])
+    assert host["net_profit"] == host["cash_out"] - 100
+    assert guest["net_profit"] == guest["cash_out"] - 50
+
+
+async def test_buy_in_during_a_player_update_is_kept(db, monkeypatch):
+    players = [user("host"), user("guest")]
+    game_id = await start_game(db, players)
+    service = GameService(GameRepository(db))
+    await service.update_player_buyin(game_id, players[1], BuyIn(amount=20))
+
+    update_at_ledger_seq = GameRepository.update_at_ledger_seq
+    seqs = []
+
+    async def buy_in_first(self, game_id_, ledger_seq, update_data):
+        # The guest buys in again after the game was read for the update, before it is written
+        seqs.append(ledger_seq)
+        if len(seqs) == 1:
+            await GameService(GameRepository(db)).update_player_buyin(game_id, players[1], BuyIn(amount=30))
+        return await update_at_ledger_seq(self, game_id_, ledger_seq, update_data)
+
+    monkeypatch.setattr(GameRepository, "update_at_ledger_seq", buy_in_first)
+    renamed = [GamePlayer(user_id=player.id, username=f"{player.username}_renamed") for player in players]
+    updated = await service.update_game(game_id, GameUpdate(venue="Casino", players=renamed))
+
+    assert seqs == [1, 2]
+    assert updated.venue == "Casino"
+    game = await db.games.find_one({"_id": ObjectId(game_id)})
+    host, guest = game["players"]
+    assert guest["username"] == "guest_renamed"
+    assert guest["buy_in_total"] == 50 and guest["net_profit"] == -50
+    assert game["total_pot"] == 50 and game["ledger_seq"] == 2
+
+
+async def test_buy_in_of_player_not_in_game_is_refused(db):
+    game_id = await start_game(db, [user("host")])
+    with pytest.raises(NotFoundException):
+        await GameService(GameRepository(db)).update_player_buyin(game_id, user("stranger"), BuyIn(amount=10))
+
+
+async def test_player_stored_before_buy_in_total_is_backfilled(db):
+    players = [user("host"), user("guest")]
+    game_id = await start_game(db, players)
+    # As stored before buy_in_total: embedded buy-ins, net_profit only set by cash-outs
+    await db.games.update_one({"_id": ObjectId(game_id)}, {
+        "$set": {
+            "players.1.buy_ins": [{"amount": 30.0, "time": datetime.now(UTC)}, {"amount": 20.0, "time": datetime.now(UTC)}],
+            "players.1.cash_out": 10.0,
+            "total_pot": 50.0,
+            "available_cash_out": 40.0,
+        },
+        "$unset": {"players.1.buy_in_total": ""}
+    })
+
+    await GameService(GameRepository(db)).update_player_cashout(game_id, players[1], CashOut(amount=15))
+
+    guest = (await db.games.find_one({"_id": ObjectId(game_id)}))["players"][1]
+    assert guest["buy_in_total"] == 50
+    assert guest["cash_out"] == 25
+    assert guest["net_profit"] == -25
+
+
+async def test_ledger_history_is_paged_in_seq_order(db):
+    players = [user("host"), user("guest")]
+    game_id = await start_game(db, players)
+    service = GameService(GameRepository(db))
+    for amount in range(1, 6):
+        await service.update_player_buyin(game_id, players[amount % 2], BuyIn(amount=amount))
+
+    pages, after_seq = [], 0
+    while after_seq is not None:
+        entries, after_seq = await service.get_ledger(game_id, after_seq, limit=2)
+        pages.append([(entry.seq, entry.amount) for entry in entries])
+
+    assert pages == [[(1, 1), (2, 2)], [(3, 3), (4, 4)], [(5, 5)]]
+
+
+async def test_failed_ledger_write_is_reconciled(db, monkeypatch):
+    players = [user("host"), user("guest")]
+    game_id = await start_game(db, players)
+    service = GameService(GameRepository(db))
+    await service.update_player_buyin(game_id, players[0], BuyIn(amount=10))
+
+    record = LedgerRepository.record
+
+    async def unavailable(self, entry, pending_id):
+        raise DatabaseException(detail="Ledger unavailable")
+
+    monkeypatch.setattr(LedgerRepository, "record", unavailable)
+    await service.update_player_buyin(game_id, players[1], BuyIn(amount=20))
+    monkeypatch.setattr(LedgerRepository, "record", record)
+    await service.update_player_cashout(game_id, players[0], CashOut(amount=5))
+
+    game = await db.games.find_one({"_id": ObjectId(game_id)})
+    assert game["total_pot"] == 30 and game["ledger_seq"] == 3
+    assert [(entry["seq"], entry["amount"]) for entry in game["ledger_pending"]] == [(2, 20)]
+    repository = GameRepository(db)
+    # Entries within the grace period may still be written by their request
+    assert await repository.reconcile_pending_ledger(older_than=game["ledger_pending"][0]["recorded_at"]) == 0
+
+    assert await repository.reconcile_pending_ledger(older_than=datetime.now(UTC) + timedelta(seconds=1)) == 1
+
+    entries, _ = await service.get_ledger(game_id)
+    assert [(entry.seq, entry.user_id, entry.type, entry.amount) for entry in entries] == [
+        (1, players[0].id, LedgerEntryTypeEnum.BUY_IN, 10),
+        (2, players[1].id, LedgerEntryTypeEnum.BUY_IN, 20),
+        (3, players[0].id, LedgerEntryTypeEnum.CASH_OUT, 5),
+    ]
+    assert (await db.games.find_one({"_id": ObjectId(game_id)}))["ledger_pending"] == []
+    assert await repository.reconcile_pending_ledger(older_than=datetime.now(UTC) + timedelta(seconds=1)) == 0
+
+
+async def test_pending_entry_is_reconciled_under_its_own_seq(db, monkeypatch):
+    players = [user("host"), user("guest")]
+    game_id = await start_game(db, players)
+    service = GameService(GameRepository(db))
+    record = LedgerRepository.record
+
+    async def unavailable(self, entry, pending_id):
+        raise DatabaseException(detail="Ledger unavailable")
+
+    await service.update_player_buyin(game_id, players[0], BuyIn(amount=10))
+    monkeypatch.setattr(LedgerRepository, "record", unavailable)
+    await service.update_player_buyin(game_id, players[1], BuyIn(amount=20))
+    await service.update_player_buyin(game_id, players[0], BuyIn(amount=30))
+    monkeypatch.setattr(LedgerRepository, "record", record)
+    # The ledger loses seq 1 and the outbox seq 2: the gaps of the ledger no longer line up with the outbox
+    await db.game_ledger.delete_one({"game_id": game_id, "seq": 1})
+    await db.games.update_one({"_id": ObjectId(game_id)}, {"$pop": {"ledger_pending": -1}})
+
+    repository = GameRepository(db)
+    assert await repository.reconcile_pending_ledger(older_than=datetime.now(UTC) + timedelta(seconds=1)) == 1
+
+    entries, _ = await service.get_ledger(game_id)
+    assert [(entry.seq, entry.amount) for entry in entries] == [(3, 30)]
+    assert (await db.games.find_one({"_id": ObjectId(game_id)}))["ledger_pending"] == []
+
+
+@pytest.mark.parametrize("backend, reconciles", [
+    (InProcessBackend(), True),
+    (UnixSocketRelayBackend("/tmp/unused.sock"), False),
+])
+async def test_only_the_hub_reconciles_the_ledger(db, monkeypatch, backend, reconciles):
+    calls = []
+
+    async def reconcile_ledger(self):
+        calls.append(self)
+
+    monkeypatch.setattr(GameService, "reconcile_ledger", reconcile_ledger)
+    monkeypatch.setattr(settings, "LEDGER_RECONCILE_INTERVAL_SECONDS", 0.001)
+    task = asyncio.create_task(reconcile_ledger_periodically(GameService(GameRepository(db)), backend))
+    await asyncio.sleep(0.01)
+    task.cancel()
+
+    assert bool(calls) is reconciles
@@ -0,0 +1,100 @@
+import pytest
+from bson import ObjectId, SON
+from pymongo import ASCENDING
+from pymongo.errors import DuplicateKeyError
+
+from app.db.indexes import REPOSITORIES, reconcile_indexes
+from app.repositories.game_repository import GameRepository
+from app.repositories.table_repository import TableRepository
+from app.repositories.user_repository import UserRepository
+from benchmarks.index_usage_check import RecordingDatabase, run_repository_queries, scans_collection, seed, winning_plans
+
+pytestmark = pytest.mark.anyio
+
+
+def declared(repository_class) -> set:
+    return {index.document["name"] for index in repository_class.indexes}
+
+
+async def test_reconcile_creates_declared_indexes(db):
+    reports = await reconcile_indexes(db)
+
+    for repository_class in REPOSITORIES:
+        repository = repository_class(db)
+        report = reports[repository.collection.name]
+        assert set(report["created"]) == declared(repository_class)
+        assert declared(repository_class) <= set(await repository.collection.index_information())
+
+
+async def test_reconcile_is_idempotent(db):
+    await reconcile_indexes(db)
+    reports = await reconcile_indexes(db)
+    for report in reports.values():
+        assert report == {"created": [], "drifted": [], "failed": [], "undeclared": []}
+
+
+async def test_reconcile_reports_drift_without_rebuilding(db):
+    # Same keys as the declared unique index, but not unique
+    await db.users.create_index([("username", ASCENDING)], name="username_1")
+    await db.users.create_index([("nickname", ASCENDING)])
+
+    report = await UserRepository(db).ensure_indexes()
+
+    assert report["drifted"] == ["username_1"]
+    assert report["undeclared"] == ["nickname_1"]
+    assert "unique" not in (await db.users.index_information())["username_1"]
+
+
+async def test_unique_user_fields_are_enforced(db):
+    await reconcile_indexes(db)
+    await db.users.insert_one({"username": "alice", "email": "alice@example.com"})
+
+    with pytest.raises(DuplicateKeyError):
+        await db.users.insert_one({"username": "alice", "email": "other@example.com"})
+    with pytest.raises(DuplicateKeyError):
+        await db.users.insert_one({"username": "bob", "email": "alice@example.com"})
+
+
+async def test_listing_filters_lead_with_an_indexed_field(db, monkeypatch):
+    """The listings filter on the first key of one of the indexes of their collection."""
+    filters = []
+    collection_class = type(db.games)
+    for method in ("find", "aggregate"):
+        original = getattr(collection_class, method)
+
+        def record(self, query=None, *args, _original=original, **kwargs):
+            match = query[0]["$match"] if isinstance(query, list) else query
+            filters.append((self.name, match))
+            return _original(self, query, *args, **kwargs)
+
+        monkeypatch.setattr(collection_class, method, record)
+
+    user_id = str(ObjectId())
+    await GameRepository(db).page_for_player(user_id, limit=10)
+    await TableRepository(db).page_for_user(user_id, limit=10)
+    await TableRepository(db).list_created(user_id, limit=10)
+    await TableRepository(db).list_invited(user_id, limit=10)
+
+    leading = {
+        repository_class(db).collection.name: {next(iter(index.document["key"])) for index in repository_class.indexes}
+        for repository_class in (GameRepository, TableRepository)
+    }
+    assert len(filters) == 4
+    for name, match in filters:
+        assert leading[name] & set(match), f"{name} filter {match} does not use an index prefix"
+
+
+async def test_repository_queries_use_an_index(mongo_db):
+    """Every query of the repository methods behind the API has a winning plan without COLLSCAN."""
+    data = await seed(mongo_db)
+    await reconcile_indexes(mongo_db)
+    queries = []
+    await run_repository_queries(RecordingDatabase(mongo_db, queries), data)
+
+    collscans = []
+    for command in queries:
+        explain = await mongo_db.command(SON([("explain", command), ("verbosity", "queryPlanner")]))
+        if any(scans_collection(plan) for plan in winning_plans(explain)):
+            collscans.append(command)
+    assert queries
+    assert not collscans, f"{len(collscans)} of {len(queries)} queries scan a collection: {collscans}"
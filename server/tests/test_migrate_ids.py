@@ -0,0 +1,134 @@
+import pytest
+from bson import ObjectId
+from mongomock.collection import Collection
+
+from app.db.migrate_ids import MIGRATION_ID, REFERENCE_FIELDS, migrate_ids
+
+pytestmark = pytest.mark.anyio
+
+
+def legacy_user(friends) -> dict:
+    """A user stored before references were canonical: its friends as ObjectIds or uppercase strings."""
+    return {"_id": ObjectId(), "username": "player", "friends": friends}
+
+
+@pytest.fixture
+async def legacy(db):
+    """Documents of every migrated collection referring to each other in non-canonical forms."""
+    user_ids = [ObjectId() for _ in range(5)]
+    await db.users.insert_many([
+        legacy_user([user_ids[(i + 1) % 5], str(user_ids[(i + 2) % 5]).upper()]) for i in range(5)
+    ])
+    await db.statistics.insert_many([{"_id": ObjectId(), "user_id": user_id} for user_id in user_ids])
+    table_id = ObjectId()
+    await db.tables.insert_one({
+        "_id": table_id,
+        "creator_id": user_ids[0],
+        "players": [{"user_id": user_id, "status": "confirmed"} for user_id in user_ids[:3]],
+    })
+    await db.games.insert_one({
+        "_id": ObjectId(),
+        "table_id": str(table_id).upper(),
+        "creator_id": user_ids[0],
+        "players": [{"user_id": str(user_id).upper(), "username": "player"} for user_id in user_ids[:3]],
+    })
+    return user_ids
+
+
+def is_canonical(value) -> bool:
+    return isinstance(value, str) and value == value.lower()
+
+
+async def assert_canonical(db, collections=tuple(REFERENCE_FIELDS)) -> None:
+    """Assert every reference field of the given collections holds a canonical id."""
+    for name in collections:
+        async for doc in db[name].find():
+            for field in REFERENCE_FIELDS[name]:
+                top, *rest = field.split(".")
+                if top not in doc:
+                    continue
+                values = doc[top] if isinstance(doc[top], list) else [doc[top]]
+                if rest:
+                    values = [value[rest[0]] for value in values]
+                assert all(map(is_canonical, values)), (name, field, values)
+
+
+def failing_bulk_write(monkeypatch, fail_on_call: int):
+    """Make the n-th bulk write apply its first update only, then fail, as a crash in the middle of a batch."""
+    bulk_write = Collection.bulk_write
+    calls = []
+
+    def crash(self, requests, *args, **kwargs):
+        calls.append(self.name)
+        if len(calls) == fail_on_call:
+            bulk_write(self, requests[:1], *args, **kwargs)
+            raise ConnectionError("Connection lost")
+        return bulk_write(self, requests, *args, **kwargs)
+
+    monkeypatch.setattr(Collection, "bulk_write", crash)
+    return calls
+
+
+async def test_migration_canonicalizes_every_reference(db, legacy):
+    results = await migrate_ids(db, list(REFERENCE_FIELDS), batch_size=2)
+
+    await assert_canonical(db)
+    assert {name: counts["scanned"] for name, counts in results.items()} == {
+        "games": 1, "tables": 1, "users": 5, "statistics": 5
+    }
+    assert {name: counts["rewritten"] for name, counts in results.items()} == {
+        "games": 1, "tables": 1, "users": 5, "statistics": 5
+    }
+    users = await db.users.find().sort("_id", 1).to_list(length=None)
+    assert users[0]["friends"] == [str(legacy[1]), str(legacy[2])]
+
+
+async def test_migration_resumes_after_a_crash(db, legacy, monkeypatch):
+    bulk_write = Collection.bulk_write
+    calls = failing_bulk_write(monkeypatch, fail_on_call=2)
+    with pytest.raises(ConnectionError):
+        await migrate_ids(db, ["users"], batch_size=2)
+    assert calls == ["users", "users"]
+    checkpoint = await db.migrations.find_one({"_id": f"{MIGRATION_ID}:users"})
+    users = await db.users.find().sort("_id", 1).to_list(length=None)
+    assert checkpoint["last_id"] == users[1]["_id"]
+
+    monkeypatch.setattr(Collection, "bulk_write", bulk_write)
+    results = await migrate_ids(db, ["users"], batch_size=2)
+
+    await assert_canonical(db, ["users"])
+    # The first batch is not read again; of the interrupted one, a single user was left to rewrite
+    assert results["users"] == {"scanned": 3, "rewritten": 2, "retried": 0}
+
+
+async def test_documents_changed_during_a_batch_are_read_again(db, legacy, monkeypatch):
+    bulk_write = Collection.bulk_write
+    befriended = ObjectId()
+
+    def concurrent_write(self, requests, *args, **kwargs):
+        # Another request rewrites the first user's friends between the read and the write of its batch
+        if not concurrent_write.done:
+            concurrent_write.done = True
+            self.update_one({"_id": requests[0]._filter["_id"]}, {"$push": {"friends": befriended}})
+        return bulk_write(self, requests, *args, **kwargs)
+
+    concurrent_write.done = False
+    monkeypatch.setattr(Collection, "bulk_write", concurrent_write)
+    results = await migrate_ids(db, ["users"], batch_size=5)
+
+    assert results["users"] == {"scanned": 5, "rewritten": 5, "retried": 1}
+    first = await db.users.find_one(sort=[("_id", 1)])
+    assert first["friends"] == [str(legacy[1]), str(legacy[2]), str(befriended)]
+    await assert_canonical(db, ["users"])
+
+
+async def test_second_run_changes_nothing(db, legacy):
+    await migrate_ids(db, list(REFERENCE_FIELDS), batch_size=2)
+    migrated = {name: await db[name].find().to_list(length=None) for name in REFERENCE_FIELDS}
+
+    resumed = await migrate_ids(db, list(REFERENCE_FIELDS), batch_size=2)
+    restarted = await migrate_ids(db, list(REFERENCE_FIELDS), batch_size=2, restart=True)
+
+    assert all(counts == {"scanned": 0, "rewritten": 0, "retried": 0} for counts in resumed.values())
+    assert all(counts["rewritten"] == counts["retried"] == 0 for counts in restarted.values())
+    assert {name: await db[name].find().to_list(length=None) for name in REFERENCE_FIELDS} == migrated
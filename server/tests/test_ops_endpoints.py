@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.config import settings
+
+OPS_ENDPOINTS = [
+    "/api/events/metrics",
+    "/api/events/connections",
+    "/api/metrics/cache",
+    "/api/metrics/pool",
+    "/api/metrics/queries",
+]
+
+
+@pytest.fixture
+def operator(signup, monkeypatch):
+    headers = signup("operator")
+    monkeypatch.setattr(settings, "OPS_USER_EMAILS", ["operator@example.com"])
+    return headers
+
+
+@pytest.mark.parametrize("path", OPS_ENDPOINTS)
+def test_ops_endpoint_refuses_other_users(client, signup, operator, path):
+    assert client.get(path, headers=signup("player")).status_code == 403
+
+
+@pytest.mark.parametrize("path", OPS_ENDPOINTS)
+def test_ops_endpoint_requires_authentication(client, path):
+    assert client.get(path).status_code == 401
+
+
+@pytest.mark.parametrize("path", OPS_ENDPOINTS)
+def test_ops_endpoint_serves_operators(client, operator, path):
+    assert client.get(path, headers=operator).status_code == 200
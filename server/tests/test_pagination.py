@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, UTC
+
+import pytest
+from bson import ObjectId
+
+from app.core.exceptions import ValidationException
+from app.repositories.game_repository import GameRepository
+from app.repositories.table_repository import TableRepository
+from app.schemas.table import PlayerStatusEnum
+
+pytestmark = pytest.mark.anyio
+
+PLAYER_ID = str(ObjectId())
+START = datetime(2026, 1, 1, tzinfo=UTC)
+
+
+async def seed_games(db, count: int) -> list:
+    """Games of one player, every date shared by two games so pages break ties on _id."""
+    games = [
+        {
+            "_id": ObjectId(),
+            "table_id": str(ObjectId()),
+            "date": START + timedelta(days=i // 2),
+            "venue": "Home Game",
+            "status": "completed",
+            "creator_id": PLAYER_ID,
+            "players": [{"user_id": PLAYER_ID, "username": "player"}],
+            "created_at": START,
+            "updated_at": START,
+        }
+        for i in range(count)
+    ]
+    await db.games.insert_many(games)
+    newest_first = sorted(games, key=lambda game: (game["date"], game["_id"]), reverse=True)
+    return [str(game["_id"]) for game in newest_first]
+
+
+async def seed_tables(db, creator_id: str, count: int) -> list:
+    tables = [
+        {
+            "_id": ObjectId(),
+            "name": f"table_{i}",
+            "date": START,
+            "minimum_buy_in": 20.0,
+            "maximum_players": 9,
+            "game_type": "Texas Hold'em",
+            "blind_structure": "1/2",
+            "venue": "Home Game",
+            "creator_id": creator_id,
+            "status": "scheduled",
+            "players": [{"user_id": creator_id, "username": "creator", "status": PlayerStatusEnum.CONFIRMED.value}],
+            "created_at": START + timedelta(hours=i // 3),
+            "updated_at": START,
+        }
+        for i in range(count)
+    ]
+    await db.tables.insert_many(tables)
+    oldest_first = sorted(tables, key=lambda table: (table["created_at"], table["_id"]))
+    return [str(table["_id"]) for table in oldest_first]
+
+
+async def test_game_pages_follow_cursor_to_the_end(db):
+    expected = await seed_games(db, 7)
+    repository = GameRepository(db)
+
+    seen, cursor, pages = [], None, 0
+    while True:
+        games, cursor = await repository.page_for_player(PLAYER_ID, limit=3, cursor=cursor)
+        seen += [str(game.id) for game in games]
+        pages += 1
+        if cursor is None:
+            break
+    assert seen == expected
+    assert pages == 3
+
+
+async def test_game_page_ending_exactly_on_limit_has_no_cursor(db):
+    expected = await seed_games(db, 4)
+    games, cursor = await GameRepository(db).page_for_player(PLAYER_ID, limit=4)
+    assert [str(game.id) for game in games] == expected
+    assert cursor is None
+
+
+async def test_skip_applies_after_cursor(db):
+    expected = await seed_games(db, 8)
+    repository = GameRepository(db)
+    _, cursor = await repository.page_for_player(PLAYER_ID, limit=2)
+    games, _ = await repository.page_for_player(PLAYER_ID, skip=1, limit=2, cursor=cursor)
+    assert [str(game.id) for game in games] == expected[3:5]
+
+
+async def test_malformed_cursor_is_rejected(db):
+    await seed_games(db, 2)
+    with pytest.raises(ValidationException):
+        await GameRepository(db).page_for_player(PLAYER_ID, limit=1, cursor="not-a-cursor")
+
+
+async def test_table_pages_with_count(db):
+    creator_id = str(ObjectId())
+    expected = await seed_tables(db, creator_id, 7)
+    repository = TableRepository(db)
+
+    seen, cursor = [], None
+    while True:
+        page = await repository.list_created(creator_id, limit=3, cursor=cursor)
+        assert page.count == 7
+        seen += [str(table.id) for table in page.tables]
+        cursor = page.next_cursor
+        if cursor is None:
+            break
+    assert seen == expected
+
+
+async def test_table_page_is_bounded_by_the_cursor_and_counted_separately(db, monkeypatch):
+    creator_id = str(ObjectId())
+    expected = await seed_tables(db, creator_id, 7)
+    repository = TableRepository(db)
+    first = await repository.list_created(creator_id, limit=3)
+
+    finds, counts = [], []
+    collection_class = type(db.tables)
+    find, count_documents = collection_class.find, collection_class.count_documents
+
+    def record_find(self, query=None, *args, **kwargs):
+        finds.append(query)
+        return find(self, query, *args, **kwargs)
+
+    def record_count(self, query, *args, **kwargs):
+        counts.append(query)
+        return count_documents(self, query, *args, **kwargs)
+
+    monkeypatch.setattr(collection_class, "find", record_find)
+    monkeypatch.setattr(collection_class, "count_documents", record_count)
+    page = await repository.list_created(creator_id, limit=3, cursor=first.next_cursor)
+
+    assert [str(table.id) for table in page.tables] == expected[3:6] and page.count == 7
+    assert counts == [{"creator_id": creator_id}]
+    # The page reads from the cursor on, rather than every table of the creator
+    assert len(finds) == 1 and finds[0]["$and"][0] == {"creator_id": creator_id}
+
+
+@pytest.mark.parametrize("limit", [None, 0])
+async def test_table_page_with_count_needs_a_limit(db, limit):
+    with pytest.raises(ValidationException):
+        await TableRepository(db).list_created(str(ObjectId()), limit=limit)
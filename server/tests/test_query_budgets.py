@@ -0,0 +1,130 @@
+import re
+
+import pytest
+
+from app.api.views import games
+from app.core.exceptions import QueryBudgetExceededException
+from app.core.query_budget import QUERY_BUDGET_ATTRIBUTE
+from app.schemas.statistics import StatisticsBase
+
+TABLE = {
+    "name": "Friday Game",
+    "date": "2026-03-14T20:00:00Z",
+    "minimum_buy_in": 20.0,
+    "maximum_players": 9,
+    "game_type": "Texas Hold'em",
+    "blind_structure": "1/2",
+    "venue": "Home Game",
+}
+
+
+def queries(response) -> int:
+    """The number of queries the Server-Timing header of a response reports."""
+    return int(re.search(r'desc="(\d+) queries"', response.headers["Server-Timing"]).group(1))
+
+
+@pytest.fixture
+def game_night(client, signup, db):
+    """A host and a guest with statistics, the guest at the host's table, with a game in progress."""
+    host, guest = signup("host"), signup("guest")
+    guest_user = client.get("/api/users/me", headers=guest).json()
+    host_user = client.get("/api/users/me", headers=host).json()
+    statistics = [StatisticsBase(user_id=user["_id"]).model_dump() for user in (host_user, guest_user)]
+    client.portal.call(db.statistics.insert_many, statistics)
+
+    table = client.post("/api/tables/create", json=TABLE, headers=host).json()
+    invite = [{"user_id": guest_user["_id"], "username": guest_user["username"]}]
+    assert client.put(f"/api/tables/{table['_id']}/invite", json=invite, headers=host).status_code == 200
+    assert client.put(f"/api/tables/{table['_id']}/confirmed", headers=guest).status_code == 200
+
+    players = [
+        {"user_id": user["_id"], "username": user["username"]} for user in (host_user, guest_user)
+    ]
+    game = {"table_id": table["_id"], "date": TABLE["date"], "venue": TABLE["venue"], "players": players}
+    response = client.post("/api/games/", json=game, headers=host)
+    assert response.status_code == 201, response.text
+    return {"host": host, "guest": guest, "table_id": table["_id"], "game_id": response.json()["_id"]}
+
+
+@pytest.mark.parametrize("path", [
+    "/api/users/me",
+    "/api/friends/",
+    "/api/tables/",
+    "/api/tables/created",
+    "/api/tables/invited",
+    "/api/tables/{table_id}",
+    "/api/games/",
+    "/api/games/count",
+    "/api/games/{game_id}",
+    "/api/games/{game_id}/ledger",
+    "/api/statistics/",
+    "/api/statistics/dashboard",
+    "/api/trends/",
+])
+def test_read_routes_stay_within_budget(client, game_night, path):
+    # Over budget, the profiling middleware raises QueryBudgetExceededException
+    response = client.get(path.format(**game_night), headers=game_night["guest"])
+    assert response.status_code == 200, response.text
+    assert queries(response) > 0
+
+
+def settle_up(client, game_night) -> None:
+    """The guest wins 10 off the host, leaving nothing to cash out."""
+    game_path = f"/api/games/{game_night['game_id']}"
+    for path, amounts in (("buyin", {"host": 30, "guest": 50}), ("cashout", {"host": 20, "guest": 60})):
+        for player, amount in amounts.items():
+            response = client.put(f"{game_path}/{path}", json={"amount": amount}, headers=game_night[player])
+            assert response.status_code == 200, response.text
+
+
+def statistics(client, headers) -> dict:
+    return client.get("/api/statistics/", headers=headers).json()
+
+
+def test_game_update_stays_within_budget(client, game_night):
+    game_path = f"/api/games/{game_night['game_id']}"
+    assert client.put(game_path, json={"venue": "Casino"}, headers=game_night["host"]).status_code == 200
+
+
+def test_completing_game_update_settles_statistics_once(client, game_night):
+    settle_up(client, game_night)
+    game_path = f"/api/games/{game_night['game_id']}"
+
+    for _ in range(2):
+        response = client.put(game_path, json={"status": "completed"}, headers=game_night["host"])
+        assert response.status_code == 200, response.text
+
+    guest = statistics(client, game_night["guest"])
+    assert (guest["stats"]["total_profit"], guest["stats"]["games_won"]) == (10, 1)
+
+
+def test_ending_game_settles_statistics_once(client, game_night):
+    settle_up(client, game_night)
+    end_path = f"/api/games/{game_night['game_id']}/end"
+
+    response = client.post(end_path, headers=game_night["host"])
+    assert response.status_code == 200, response.text
+    settled = [statistics(client, game_night[player]) for player in ("host", "guest")]
+    # A retried end of game changes nothing
+    assert client.post(end_path, headers=game_night["host"]).status_code == 200
+
+    assert [statistics(client, game_night[player]) for player in ("host", "guest")] == settled
+    host, guest = settled
+    assert (host["stats"]["total_profit"], host["stats"]["games_lost"]) == (-10, 1)
+    assert (guest["stats"]["total_profit"], guest["stats"]["games_won"]) == (10, 1)
+
+
+def test_buy_in_and_cash_out_stay_within_budget(client, game_night):
+    game_path = f"/api/games/{game_night['game_id']}"
+    assert client.put(f"{game_path}/buyin", json={"amount": 50}, headers=game_night["guest"]).status_code == 200
+    response = client.put(f"{game_path}/cashout", json={"amount": 20}, headers=game_night["guest"])
+    assert response.status_code == 200, response.text
+    guest = next(player for player in response.json()["players"] if player["username"] == "guest")
+    assert (guest["cash_out"], guest["net_profit"]) == (20, -30)
+
+
+def test_route_over_budget_fails(client, game_night, monkeypatch):
+    monkeypatch.setattr(games.get_game, QUERY_BUDGET_ATTRIBUTE, 1)
+
+    with pytest.raises(QueryBudgetExceededException, match=r"GET /api/games/\{game_id\}"):
+        client.get(f"/api/games/{game_night['game_id']}", headers=game_night["guest"])
@@ -0,0 +1,78 @@
+from datetime import datetime, UTC
+
+import pytest
+from bson import ObjectId
+
+from app.repositories.statistics_repository import SETTLED_GAMES_KEPT, StatisticsRepository
+from app.schemas.game import GameDBOutput
+from app.schemas.statistics import StatisticsBase
+
+pytestmark = pytest.mark.anyio
+
+PLAYER_ID = str(ObjectId())
+
+
+def completed_game(net_profit: float, *player_ids: str) -> GameDBOutput:
+    return GameDBOutput.model_validate({
+        "_id": ObjectId(),
+        "table_id": str(ObjectId()),
+        "date": datetime(2026, 3, 14, tzinfo=UTC),
+        "venue": "Home Game",
+        "status": "completed",
+        "duration": {"hours": 2, "minutes": 30},
+        "creator_id": PLAYER_ID,
+        "players": [
+            {"user_id": player_id, "username": f"player_{i}", "net_profit": net_profit}
+            for i, player_id in enumerate(player_ids or [PLAYER_ID])
+        ],
+    })
+
+
+@pytest.fixture
+async def player_stats(db):
+    await db.statistics.insert_one({"user_id": PLAYER_ID, **StatisticsBase(user_id=PLAYER_ID).model_dump(exclude={"user_id"})})
+
+
+async def test_settling_a_game_twice_counts_it_once(db, player_stats):
+    repository = StatisticsRepository(db)
+    game = completed_game(40.0)
+
+    assert await repository.apply_game_results(game) == 1
+    settled = await db.statistics.find_one({"user_id": PLAYER_ID})
+    assert await repository.apply_game_results(game) == 0
+
+    stats = await db.statistics.find_one({"user_id": PLAYER_ID})
+    assert stats == settled
+    assert stats["stats"]["total_profit"] == 40.0
+    assert stats["stats"]["games_won"] == 1
+    assert [month["month"] for month in stats["monthly_stats"]] == ["Mar 2026"]
+    assert stats["monthly_stats"][0]["hours_played"] == 2.5
+
+
+async def test_players_without_statistics_get_them(db, player_stats):
+    newcomer = str(ObjectId())
+    repository = StatisticsRepository(db)
+    game = completed_game(-15.0, PLAYER_ID, newcomer)
+
+    assert await repository.apply_game_results(game) == 2
+    assert await repository.apply_game_results(game) == 0
+
+    stats = await db.statistics.find_one({"user_id": newcomer})
+    assert stats["stats"]["total_profit"] == -15.0
+    assert stats["stats"]["games_lost"] == 1
+    assert stats["settled_games"] == [str(game.id)]
+    assert await db.statistics.count_documents({}) == 2
+
+
+async def test_settled_games_keeps_only_the_latest(db, player_stats):
+    repository = StatisticsRepository(db)
+    games = [completed_game(-10.0) for _ in range(SETTLED_GAMES_KEPT + 5)]
+    for game in games:
+        await repository.apply_game_results(game)
+
+    stats = await db.statistics.find_one({"user_id": PLAYER_ID})
+    assert stats["settled_games"] == [str(game.id) for game in games[-SETTLED_GAMES_KEPT:]]
+    assert stats["stats"]["games_lost"] == len(games)
+    assert stats["monthly_stats"][0]["games_lost"] == len(games)
+    # A retry of the latest game is still recognized
+    assert await repository.apply_game_results(games[-1]) == 0